@@ -0,0 +1,8 @@
+"""
+Batch execution for AI Agents project.
+This package runs JSONL query workloads through the patterns with bounded concurrency.
+"""
+
+from batch.batch_runner import BatchRunner, BatchResult, BatchReport, percentile
+
+__all__ = ["BatchRunner", "BatchResult", "BatchReport", "percentile"]
@@ -0,0 +1,54 @@
+"""
+Run a JSONL file of queries through ReactPattern.
+
+Run from the repository root:
+    python -m batch queries.jsonl results.jsonl --concurrency 16
+"""
+
+import argparse
+import logging
+
+from batch.batch_runner import BatchRunner
+from config.env_manager import EnvManager
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m batch", description="Run a JSONL file of queries through ReactPattern.")
+    parser.add_argument("input", help="JSONL file with one {\"id\", \"query\"} object per line")
+    parser.add_argument("output", help="JSONL file results are appended to as they finish")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once (default: 8)")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread", help="Thread pool or asyncio (default: thread)")
+    parser.add_argument("--max-iterations", type=int, default=5, help="ReAct iterations per query (default: 5)")
+    parser.add_argument("--requests-per-minute", type=int, default=None, help="Provider request quota shared by all queries")
+    parser.add_argument("--tokens-per-minute", type=int, default=None, help="Provider token quota shared by all queries")
+    parser.add_argument("--native-tools", action="store_true", help="Use native function calling")
+    parser.add_argument("--token-budget", type=int, default=None, help="Stop a query once its model calls use more tokens than this")
+    parser.add_argument("--cost-budget", type=float, default=None, help="Stop a query once its model calls cost more than this many USD")
+    parser.add_argument("--warm-up", action="store_true", help="Open one provider connection per concurrent query before starting")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of skipping answered ids")
+    parser.add_argument("--progress", action="store_true", help="Print one line per finished query")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    runner = BatchRunner(
+        api_key=EnvManager().get_groq_api_key(raise_error=True),
+        concurrency=args.concurrency,
+        mode=args.mode,
+        max_iterations=args.max_iterations,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        pattern_kwargs={"native_tools": args.native_tools, "token_budget": args.token_budget, "cost_budget": args.cost_budget},
+        warm_up=args.warm_up
+    )
+    on_result = None
+    if args.progress:
+        on_result = lambda result: print(f"[{'error' if result.error else 'ok'}] {result.id} ({result.latency:.2f}s)")
+    report = runner.run(args.input, args.output, resume=not args.no_resume, on_result=on_result)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from react_pattern.react_pattern import ReactPattern
+from cache import CacheBase
+from model import Usage, ModelFactory, ModelType, ProviderType
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile between 0 and 100
+    
+    Returns:
+        The percentile, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one query, written as one JSONL line.
+    """
+    id: str
+    query: str
+    response: Optional[str] = None
+    error: Optional[str] = None
+    latency: float = 0.0
+    # Token usage and cost of the run, when the pattern reports it
+    usage: Optional[Dict[str, Any]] = None
+    
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+@dataclass
+class BatchReport:
+    """
+    Throughput and latency summary of a batch run.
+    """
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list, repr=False)
+    usage: Usage = field(default_factory=Usage)
+    
+    def record(self, result: BatchResult) -> None:
+        if result.error is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.latencies.append(result.latency)
+        if result.usage:
+            self.usage.add(Usage(**result.usage))
+    
+    @property
+    def throughput(self) -> float:
+        """
+        Queries finished per second, failures included.
+        """
+        return (self.completed + self.failed) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def latency_percentiles(self, percentiles: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+        return {f"p{pct:g}": percentile(ordered, pct) for pct in percentiles}
+    
+    def summary(self) -> str:
+        lines = [
+            f"completed: {self.completed}  failed: {self.failed}  skipped (already done): {self.skipped}",
+            f"elapsed: {self.elapsed:.2f}s  throughput: {self.throughput:.2f} queries/s",
+        ]
+        if self.latencies:
+            lines.append("latency: " + "  ".join(f"{name}={value:.2f}s" for name, value in self.latency_percentiles().items()))
+        if self.usage.calls:
+            lines.append(f"model calls: {self.usage.calls}  tokens: {self.usage.total_tokens} "
+                         f"({self.usage.prompt_tokens} prompt, {self.usage.completion_tokens} completion)  cost: ${self.usage.cost:.4f}")
+        return "\n".join(lines)
+
+
+@dataclass
+class BatchRunner:
+    """
+    Run a JSONL file of queries through ReactPattern with bounded concurrency.
+    
+    Each input line is an object with a "query" (or "question"/"prompt") and an
+    optional "id"; lines without an id are numbered from 0. Results are appended
+    to the output file as they finish, so an interrupted run can be resumed: ids
+    already answered in the output are skipped and failed ids are tried again.
+    
+    Queries run on a thread pool (mode="thread") or as tasks on one event loop
+    (mode="async", using ReactPattern.arun). Only `concurrency` queries are in
+    flight at a time, and the input is read lazily, so memory stays flat for
+    large files. Pass requests_per_minute/tokens_per_minute to share one quota
+    across every query. Every query's model shares one provider client, and
+    warm_up=True opens `concurrency` connections to it before the first query.
+    """
+    api_key: str
+    concurrency: int = 8
+    mode: str = "thread"
+    max_iterations: int = 5
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    response_cache: Optional[CacheBase] = None
+    pattern_kwargs: Dict[str, Any] = field(default_factory=dict)
+    pattern_factory: Optional[Callable[[str], ReactPattern]] = None
+    warm_up: bool = False
+    
+    def __post_init__(self):
+        if self.mode not in ("thread", "async"):
+            raise ValueError(f"Unknown batch mode '{self.mode}', expected 'thread' or 'async'")
+        if self.concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+    
+    @staticmethod
+    def read_queries(input_path: str) -> Iterator[Dict[str, str]]:
+        """
+        Lazily read queries from a JSONL file.
+        
+        Args:
+            input_path: Path of the JSONL input
+        
+        Returns:
+            Iterator of {"id", "query"} dicts; blank and malformed lines are skipped with a warning
+        """
+        with open(input_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping malformed input line {line_number + 1}")
+                    continue
+                if isinstance(item, str):
+                    item = {"query": item}
+                if not isinstance(item, dict):
+                    logging.warning(f"Skipping input line {line_number + 1} that is not an object or string")
+                    continue
+                query = item.get("query") or item.get("question") or item.get("prompt")
+                if not query:
+                    logging.warning(f"Skipping input line {line_number + 1} without a query")
+                    continue
+                yield {"id": str(item.get("id", line_number)), "query": query}
+    
+    @staticmethod
+    def completed_ids(output_path: str) -> Set[str]:
+        """
+        Collect the ids already answered in a partial output file.
+        A torn last line from an interrupted run is cut off so new results append cleanly.
+        
+        Args:
+            output_path: Path of the JSONL output
+        
+        Returns:
+            Ids of results written without an error
+        """
+        done = set()
+        if not os.path.exists(output_path):
+            return done
+        with open(output_path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        for line in data[:end].decode("utf-8").splitlines():
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get("error") is None and "id" in result:
+                done.add(str(result["id"]))
+        return done
+    
+    def build_pattern(self, query: str) -> ReactPattern:
+        if self.pattern_factory is not None:
+            return self.pattern_factory(query)
+        return ReactPattern(
+            user_prompt=query,
+            api_key=self.api_key,
+            max_iterations=self.max_iterations,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            response_cache=self.response_cache,
+            **self.pattern_kwargs
+        )
+    
+    def build_model(self) -> ModelFactory:
+        """
+        Build a model with the same provider, credentials and quota as the queries' patterns.
+        Provider clients are shared, so warming this model warms theirs.
+        """
+        return ModelFactory(
+            api_key=self.api_key,
+            provider=self.pattern_kwargs.get("provider", ProviderType.Groq),
+            model_name=ModelType.Llama3_3_70B_Versatile,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            model_options=self.pattern_kwargs.get("model_options", {})
+        )
+    
+    def run_query(self, item: Dict[str, str]) -> BatchResult:
+        """
+        Answer one query; failures are captured in the result instead of raised.
+        """
+        result = BatchResult(id=item["id"], query=item["query"])
+        start = time.perf_counter()
+        pattern = None
+        try:
+            pattern = self.build_pattern(item["query"])
+            result.response = pattern.run()
+        except Exception as e:
+            logging.error(f"Query {item['id']} failed: {str(e)}")
+            result.error = f"{type(e).__name__}: {str(e)}"
+        finally:
+            if pattern is not None:
+                usage = getattr(pattern, "last_usage", None)
+                result.usage = usage.to_dict() if usage is not None else None
+                pattern.close()
+        result.latency = time.perf_counter() - start
+        return result
+    
+    async def arun_query(self, item: Dict[str, str]) -> BatchResult:
+        """
+        Async variant of run_query.
+        """
+        result = BatchResult(id=item["id"], query=item["query"])
+        start = time.perf_counter()
+        pattern = None
+        try:
+            pattern = self.build_pattern(item["query"])
+            result.response = await pattern.arun()
+        except Exception as e:
+            logging.error(f"Query {item['id']} failed: {str(e)}")
+            result.error = f"{type(e).__name__}: {str(e)}"
+        finally:
+            if pattern is not None:
+                usage = getattr(pattern, "last_usage", None)
+                result.usage = usage.to_dict() if usage is not None else None
+                pattern.close()
+        result.latency = time.perf_counter() - start
+        return result
+    
+    def _pending(self, input_path: str, done: Set[str], report: BatchReport) -> Iterator[Dict[str, str]]:
+        for item in self.read_queries(input_path):
+            if item["id"] in done:
+                report.skipped += 1
+                continue
+            yield item
+    
+    @staticmethod
+    def _write(output: TextIO, result: BatchResult, report: BatchReport) -> None:
+        output.write(result.to_json() + "\n")
+        output.flush()
+        report.record(result)
+    
+    def run(self, input_path: str, output_path: str, resume: bool = True, on_result: Optional[Callable[[BatchResult], None]] = None) -> BatchReport:
+        """
+        Run every pending query of the input file.
+        
+        Args:
+            input_path: JSONL file of queries
+            output_path: JSONL file results are appended to
+            resume: Skip ids already answered in output_path; when False the output is overwritten
+            on_result: Optional callback invoked with each result as it is written
+        
+        Returns:
+            The run's BatchReport
+        """
+        if self.mode == "async":
+            return asyncio.run(self.arun(input_path, output_path, resume, on_result))
+        
+        if self.warm_up:
+            self.build_model().warm_up(self.concurrency)
+        report = BatchReport()
+        done = self.completed_ids(output_path) if resume else set()
+        pending = self._pending(input_path, done, report)
+        start = time.perf_counter()
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Keep at most `concurrency` queries submitted so the input is consumed lazily
+            in_flight = set()
+            
+            def drain() -> None:
+                nonlocal in_flight
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    self._write(output, result, report)
+                    if on_result:
+                        on_result(result)
+            
+            for item in pending:
+                if len(in_flight) >= self.concurrency:
+                    drain()
+                in_flight.add(executor.submit(self.run_query, item))
+            while in_flight:
+                drain()
+        report.elapsed = time.perf_counter() - start
+        return report
+    
+    async def arun(self, input_path: str, output_path: str, resume: bool = True, on_result: Optional[Callable[[BatchResult], None]] = None) -> BatchReport:
+        """
+        Run every pending query of the input file on the current event loop,
+        with `concurrency` worker tasks pulling from the input.
+        
+        Args:
+            input_path: JSONL file of queries
+            output_path: JSONL file results are appended to
+            resume: Skip ids already answered in output_path; when False the output is overwritten
+            on_result: Optional callback invoked with each result as it is written
+        
+        Returns:
+            The run's BatchReport
+        """
+        if self.warm_up:
+            await self.build_model().awarm_up(self.concurrency)
+        report = BatchReport()
+        done = self.completed_ids(output_path) if resume else set()
+        pending = self._pending(input_path, done, report)
+        start = time.perf_counter()
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+            async def worker():
+                # Workers share one iterator; the event loop makes next() safe
+                for item in pending:
+                    result = await self.arun_query(item)
+                    self._write(output, result, report)
+                    if on_result:
+                        on_result(result)
+            
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        report.elapsed = time.perf_counter() - start
+        return report
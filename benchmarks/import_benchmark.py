@@ -0,0 +1,87 @@
+"""
+Benchmark: cold import time of the tools package with lazy vs. eager tool discovery.
+
+Every measurement runs in a fresh interpreter, so nothing is cached in
+sys.modules. "lazy" is a plain `import tools`, which registers the bundled tools
+from tools/tool_manifest.json; "eager" additionally imports every tool module,
+as importing the package used to. "first use" resolves one lazily registered
+tool, paying for its module (and dependencies) only then.
+
+Run from the repository root:
+    python -m benchmarks.import_benchmark --repeat 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from batch import percentile
+
+
+SCENARIOS = {
+    "lazy": "import tools",
+    "eager": "import tools; tools.import_submodules()",
+    "first use": "import tools; tools.ToolsRegistry.get_tool_class('{tool}')",
+}
+
+CHILD = """
+import json, sys, time
+baseline = set(sys.modules)
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": len(set(sys.modules) - baseline)}}))
+"""
+
+
+def measure(statement: str, repeat: int) -> Dict[str, float]:
+    """
+    Time a statement in `repeat` fresh interpreters.
+    
+    Args:
+        statement: Python code to time
+        repeat: Number of interpreters to start
+    
+    Returns:
+        Mean, p50 and min in milliseconds, and the number of modules the statement imported
+    """
+    timings = []
+    modules = 0
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(statement=statement)],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"] * 1e3)
+        modules = result["modules"]
+    timings.sort()
+    return {
+        "mean_ms": sum(timings) / len(timings),
+        "p50_ms": percentile(timings, 50),
+        "min_ms": timings[0],
+        "modules": modules,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per scenario (default: 10)")
+    parser.add_argument("--tool", default="DuckDuckGoSearch", help="Tool resolved by the first-use scenario (default: DuckDuckGoSearch)")
+    args = parser.parse_args(argv)
+    
+    print(f"{'scenario':<12}{'mean ms':>10}{'p50 ms':>10}{'min ms':>10}{'modules':>10}")
+    results = {}
+    for name, statement in SCENARIOS.items():
+        results[name] = measure(statement.format(tool=args.tool), args.repeat)
+        result = results[name]
+        print(f"{name:<12}{result['mean_ms']:>10.2f}{result['p50_ms']:>10.2f}{result['min_ms']:>10.2f}{result['modules']:>10}")
+    print(f"lazy discovery saves {results['eager']['p50_ms'] - results['lazy']['p50_ms']:.2f} ms (p50) per cold start")
+
+
+if __name__ == "__main__":
+    main()
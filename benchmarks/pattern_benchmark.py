@@ -0,0 +1,295 @@
+"""
+Benchmark: framework overhead of ToolsPattern, ReactPattern and ReflectionPattern.
+
+Each pattern is driven by recorded model responses served by the local replay
+provider with zero latency, and by synthetic tools that return a recorded
+result, so the measured time is prompt construction, parsing, history handling
+and tool dispatch only. Scenarios grow the number of registered tools and the
+number of turns.
+
+Run from the repository root:
+    python -m benchmarks.pattern_benchmark --output pattern_benchmark.json
+    python -m benchmarks.pattern_benchmark --baseline pattern_benchmark.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from batch import percentile
+from model import ModelType, ProviderType, ReplayFixtures
+from react_pattern.react_pattern import ReactPattern
+from reflection_pattern import ReflectionPattern
+from tool_pattern.tool_pattern import ToolsPattern
+from tools import ToolsBase, ToolsRegistry
+
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures" / "pattern_responses.json"
+QUERY = "What are the top stories today and which one should I read first?"
+
+
+def load_fixtures(path: Path = FIXTURES_PATH) -> Dict[str, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_bench_tool(index: int, result: str) -> type:
+    """
+    Build a synthetic tool class that returns a recorded result without any I/O.
+    """
+    def init_tool(self, **kwargs):
+        pass
+    
+    def run(self, **kwargs):
+        return result
+    
+    def get_tool_parameters():
+        return {
+            "name": f"Bench Tool {index}",
+            "description": f"Looks up recorded results for benchmark scenario tool number {index}",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "What to look up"},
+                    "top_n": {"type": "integer", "description": "Number of results to return"}
+                },
+                "required": ["query"]
+            }
+        }
+    
+    return type(f"BenchTool{index}", (ToolsBase,), {
+        "__init__": lambda self: ToolsBase.__init__(self, name=f"Bench Tool {index}"),
+        "init_tool": init_tool,
+        "run": run,
+        "get_tool_parameters": staticmethod(get_tool_parameters),
+    })
+
+
+@contextmanager
+def bench_tools(count: int, result: str) -> Iterator[List[str]]:
+    """
+    Register `count` synthetic tools for the duration of a scenario.
+    """
+    tool_classes = [make_bench_tool(index, result) for index in range(count)]
+    for tool_class in tool_classes:
+        ToolsRegistry.register(tool_class)
+    try:
+        yield [tool_class.__name__ for tool_class in tool_classes]
+    finally:
+        for tool_class in tool_classes:
+            ToolsRegistry.unregister(tool_class.__name__)
+
+
+@dataclass
+class ScenarioResult:
+    pattern: str
+    tools: int
+    turns: int
+    registered_tools: int
+    model_calls: int
+    runs: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    min_ms: float
+    overhead_per_iteration_us: float
+    peak_kib: Optional[float] = None
+    retained_kib: Optional[float] = None
+    
+    @property
+    def key(self) -> str:
+        return f"{self.pattern}/tools={self.tools}/turns={self.turns}"
+
+
+def tools_pattern_run(fixtures: Dict[str, str], tool_names: List[str], turns: int) -> Callable[[], Any]:
+    script = [fixtures["tools_tool_turn"].replace("{tool}", tool_names[turn % len(tool_names)]) for turn in range(turns)]
+    script.append(fixtures["tools_final"])
+    
+    def run():
+        pattern = ToolsPattern(
+            groq_api_key="local",
+            provider=ProviderType.Local,
+            model_options={"fixtures": ReplayFixtures.from_script(script, loop=False)},
+            tool_cache=None
+        )
+        try:
+            return pattern.run(QUERY, max_iterations=turns + 1)
+        finally:
+            pattern.close()
+    return run
+
+
+def react_pattern_run(fixtures: Dict[str, str], tool_names: List[str], turns: int) -> Callable[[], Any]:
+    script = [fixtures["react_tool_turn"].replace("{tool}", tool_names[turn % len(tool_names)]) for turn in range(turns)]
+    script.append(fixtures["react_final"])
+    
+    def run():
+        pattern = ReactPattern(
+            user_prompt=QUERY,
+            api_key="local",
+            provider=ProviderType.Local,
+            model_options={"fixtures": ReplayFixtures.from_script(script, loop=False)},
+            max_iterations=turns + 1,
+            tool_cache=None
+        )
+        try:
+            return pattern.run()
+        finally:
+            pattern.close()
+    return run
+
+
+def reflection_pattern_run(fixtures: Dict[str, str], tool_names: List[str], turns: int) -> Callable[[], Any]:
+    # One generation, then `turns` rounds of critique and revision
+    script = [fixtures["reflection_generation"]]
+    for _ in range(turns):
+        script += [fixtures["reflection_critique"], fixtures["reflection_revision"]]
+    
+    def run():
+        pattern = ReflectionPattern(
+            provider=ProviderType.Local,
+            model_name=ModelType.Llama3_3_70B_Versatile,
+            generation_prompt="You are a pro python developer. Write a merge sort implementation in Python with documentation.",
+            reflection_prompt="You are an experienced code reviewer. Review the code and suggest improvements.",
+            api_key="local",
+            iterations=2 * (turns + 1),
+            model_options={"fixtures": ReplayFixtures.from_script(script, loop=False)}
+        )
+        return pattern.run()
+    return run
+
+
+PATTERNS = {
+    "tools": (tools_pattern_run, lambda turns: turns + 1),
+    "react": (react_pattern_run, lambda turns: turns + 1),
+    "reflection": (reflection_pattern_run, lambda turns: 2 * turns + 1),
+}
+
+
+def measure(pattern: str, run: Callable[[], Any], tools: int, turns: int, model_calls: int, repeat: int, warmup: int, allocations: bool) -> ScenarioResult:
+    for _ in range(warmup):
+        run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    result = ScenarioResult(
+        pattern=pattern,
+        tools=tools,
+        turns=turns,
+        registered_tools=len(ToolsRegistry.list_available_tools()),
+        model_calls=model_calls,
+        runs=repeat,
+        mean_ms=mean * 1e3,
+        p50_ms=percentile(timings, 50) * 1e3,
+        p95_ms=percentile(timings, 95) * 1e3,
+        min_ms=timings[0] * 1e3,
+        overhead_per_iteration_us=mean / model_calls * 1e6
+    )
+    if allocations:
+        # Separate pass: tracing allocations slows the run down
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.peak_kib = (peak - baseline) / 1024
+        result.retained_kib = (current - baseline) / 1024
+    return result
+
+
+def run_benchmarks(patterns: List[str], tool_counts: List[int], turn_counts: List[int], repeat: int = 20, warmup: int = 2, allocations: bool = True) -> List[ScenarioResult]:
+    fixtures = load_fixtures()
+    results = []
+    for tool_count in tool_counts:
+        with bench_tools(tool_count, fixtures["tool_result"]) as tool_names:
+            for pattern in patterns:
+                build, calls = PATTERNS[pattern]
+                for turns in turn_counts:
+                    if pattern == "reflection" and tool_count != tool_counts[0]:
+                        # Reflection uses no tools; measure it once
+                        continue
+                    result = measure(pattern, build(fixtures, tool_names, turns), tool_count, turns, calls(turns), repeat, warmup, allocations)
+                    results.append(result)
+                    print(f"{result.key:<34}{result.mean_ms:>10.2f}{result.p95_ms:>10.2f}{result.overhead_per_iteration_us:>14.1f}"
+                          + (f"{result.peak_kib:>12.1f}" if result.peak_kib is not None else ""))
+    return results
+
+
+def compare(results: List[ScenarioResult], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    :return: Descriptions of scenarios whose mean latency regressed beyond the tolerance
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            f"{entry['pattern']}/tools={entry['tools']}/turns={entry['turns']}": entry
+            for entry in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous and result.mean_ms > previous["mean_ms"] * (1 + tolerance):
+            regressions.append(f"{result.key}: {previous['mean_ms']:.2f}ms -> {result.mean_ms:.2f}ms")
+    return regressions
+
+
+def parse_counts(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pattern_benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patterns", default="tools,react,reflection", help="Comma-separated patterns to run (default: all)")
+    parser.add_argument("--tools", type=parse_counts, default=[1, 8, 32], help="Synthetic tool counts (default: 1,8,32)")
+    parser.add_argument("--turns", type=parse_counts, default=[1, 4, 8], help="Tool/critique turn counts (default: 1,4,8)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per scenario (default: 20)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per scenario (default: 2)")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", default="pattern_benchmark.json", help="JSON results file (default: pattern_benchmark.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare mean latency against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args(argv)
+    
+    patterns = [pattern for pattern in args.patterns.split(",") if pattern]
+    unknown = set(patterns) - set(PATTERNS)
+    if unknown:
+        parser.error(f"unknown patterns: {', '.join(sorted(unknown))}")
+    
+    print(f"{'scenario':<34}{'mean ms':>10}{'p95 ms':>10}{'us/iteration':>14}" + ("" if args.no_allocations else f"{'peak KiB':>12}"))
+    results = run_benchmarks(patterns, args.tools, args.turns, args.repeat, args.warmup, not args.no_allocations)
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "metadata": {
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "repeat": args.repeat,
+                "warmup": args.warmup
+            },
+            "results": [asdict(result) for result in results]
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
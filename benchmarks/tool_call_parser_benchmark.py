@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: shared single-pass tool-call parser vs. the previous regex approach.
+
+Run from the repository root:
+    python -m benchmarks.tool_call_parser_benchmark
+"""
+
+import json
+import re
+import timeit
+from typing import Any, Dict, List, Tuple
+
+from tools.tool_call_parser import parse_tool_calls
+
+
+def legacy_parse_tool_calls(response: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    The regex-based parser the patterns used before tools.tool_call_parser.
+    """
+    json_pattern = r'```json\n(.*?)\n```'
+    json_matches = re.findall(json_pattern, response, re.DOTALL)
+    
+    if not json_matches:
+        json_pattern = r'```\n(.*?)\n```'
+        json_matches = re.findall(json_pattern, response, re.DOTALL)
+        
+    if not json_matches:
+        json_pattern = r'{[\s\S]*?"tool"[\s\S]*?}'
+        json_matches = re.findall(json_pattern, response, re.DOTALL)
+    
+    tool_calls = []
+    for json_str in json_matches:
+        try:
+            parsed = json.loads(json_str)
+        except json.JSONDecodeError:
+            continue
+        candidates = parsed if isinstance(parsed, list) else [parsed]
+        for tool_call in candidates:
+            if isinstance(tool_call, dict) and "tool" in tool_call and "parameters" in tool_call:
+                tool_calls.append((tool_call["tool"], tool_call["parameters"]))
+    return tool_calls
+
+
+THOUGHT = "<thought>I need to look this up before answering. " + "Some reasoning. " * 40 + "</thought>\n"
+
+SCENARIOS = {
+    "fenced": THOUGHT + '```json\n{"tool": "WeatherTool", "parameters": {"location": "Bangalore"}}\n```',
+    "unfenced_nested": THOUGHT + '{"tool": "DuckDuckGoSearch", "parameters": {"query": "cats", "options": {"region": "in"}}}',
+    "fenced_list": THOUGHT + "```json\n" + json.dumps(
+        [{"tool": "WeatherTool", "parameters": {"location": city}} for city in ["Bangalore", "Delhi", "Pune", "Goa", "Agra"]]
+    ) + "\n```",
+    "no_tool_call": "<response>" + "It is 40 degrees in Bangalore. " * 60 + "</response>",
+}
+
+
+def main(number: int = 20000) -> None:
+    print(f"{'scenario':<18}{'legacy us':>12}{'shared us':>12}{'speedup':>10}  calls (legacy/shared)")
+    for name, response in SCENARIOS.items():
+        legacy = timeit.timeit(lambda: legacy_parse_tool_calls(response), number=number) / number * 1e6
+        shared = timeit.timeit(lambda: parse_tool_calls(response), number=number) / number * 1e6
+        calls = f"{len(legacy_parse_tool_calls(response))}/{len(parse_tool_calls(response))}"
+        print(f"{name:<18}{legacy:>12.2f}{shared:>12.2f}{legacy / shared:>9.1f}x  {calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Cache module for AI Agents project.
+This package provides size-bounded, TTL-aware caches shared by tools and models.
+"""
+
+from cache.cache_base import CacheBase, MISSING
+from cache.memory_cache import MemoryCache
+from cache.sqlite_cache import SqliteCache
+from cache.tiered_cache import TieredCache
+
+__all__ = ["CacheBase", "MISSING", "MemoryCache", "SqliteCache", "TieredCache"]
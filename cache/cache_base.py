@@ -0,0 +1,100 @@
+"""
+Common interface and hit/miss accounting for cache backends.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+import threading
+
+MISSING = object()
+
+
+@dataclass
+class CacheBase(ABC):
+    """
+    Base class for key/value caches with optional per-entry TTL.
+    
+    Subclasses implement the storage operations; this class keeps the
+    hit/miss counters so every backend reports them the same way.
+    """
+    max_size: int = 1024
+    default_ttl: Optional[float] = None
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    _lock: Any = field(default_factory=threading.RLock, init=False, repr=False)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a key, counting the hit or miss
+        
+        Args:
+            key: The cache key
+            default: Value returned when the key is missing or expired
+            
+        Returns:
+            The cached value, or default
+        """
+        value = self._get(key)
+        with self._lock:
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the hit/miss counters and current size
+        
+        Returns:
+            A dictionary with hits, misses and size
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+    
+    @abstractmethod
+    def _get(self, key: str) -> Any:
+        """
+        Fetch a live entry, or MISSING if absent or expired
+        """
+        pass
+    
+    def _get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        """
+        Fetch a live entry together with its remaining lifetime
+        
+        Returns:
+            Tuple of (value or MISSING, seconds until it expires or None if it never does).
+            Backends that expire entries override this so tiered caches can keep the expiry.
+        """
+        return self._get(key), None
+    
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+        
+        Args:
+            key: The cache key
+            value: The value to store
+            ttl: Seconds until the entry expires (falls back to default_ttl, None never expires)
+        """
+        pass
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a key if present
+        """
+        pass
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove every entry
+        """
+        pass
+    
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
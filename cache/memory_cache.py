@@ -0,0 +1,54 @@
+"""
+In-process LRU cache with per-entry TTL.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+import time
+
+from cache.cache_base import CacheBase, MISSING
+
+
+@dataclass
+class MemoryCache(CacheBase):
+    """
+    Thread-safe, size-bounded LRU cache held in memory.
+    """
+    _entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = field(default_factory=OrderedDict, init=False, repr=False)
+    
+    def _get(self, key: str) -> Any:
+        return self._get_with_ttl(key)[0]
+    
+    def _get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING, None
+            expires_at, value = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                return MISSING, None
+            self._entries.move_to_end(key)
+            return value, expires_at - now if expires_at is not None else None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
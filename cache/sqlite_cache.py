@@ -0,0 +1,88 @@
+"""
+On-disk LRU cache with per-entry TTL, backed by sqlite.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+import json
+import sqlite3
+import time
+
+from cache.cache_base import CacheBase, MISSING
+
+
+@dataclass
+class SqliteCache(CacheBase):
+    """
+    Size-bounded cache persisted in a sqlite database.
+    
+    Values are stored as JSON, so they must be JSON-serializable. Entries
+    survive process restarts and can be shared by processes on one host.
+    """
+    path: str = "agentic_cache.sqlite3"
+    table: str = "cache"
+    _conn: Any = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        """
+        Post-initialization method to open the database and create the table.
+        :return: None
+        """
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+    
+    def _get(self, key: str) -> Any:
+        return self._get_with_ttl(key)[0]
+    
+    def _get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISSING, None
+            value, expires_at = row
+            if expires_at is not None and now >= expires_at:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return MISSING, None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value), expires_at - now if expires_at is not None else None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), expires_at, now)
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+    
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+    
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+    
+    def close(self) -> None:
+        """
+        Close the database connection
+        """
+        self._conn.close()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
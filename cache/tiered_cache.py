@@ -0,0 +1,46 @@
+"""
+Cache that layers several backends, e.g. memory in front of sqlite.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from cache.cache_base import CacheBase, MISSING
+
+
+@dataclass
+class TieredCache(CacheBase):
+    """
+    Look entries up in each tier in order and backfill the faster tiers on
+    a hit further down, with the entry's remaining lifetime. Writes go to
+    every tier.
+    """
+    tiers: List[CacheBase] = field(default_factory=list)
+    
+    def _get(self, key: str) -> Any:
+        return self._get_with_ttl(key)[0]
+    
+    def _get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        for index, tier in enumerate(self.tiers):
+            value, ttl = tier._get_with_ttl(key)
+            if value is not MISSING:
+                for upper in self.tiers[:index]:
+                    upper.set(key, value, ttl=ttl)
+                return value, ttl
+        return MISSING, None
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        for tier in self.tiers:
+            tier.set(key, value, ttl=ttl)
+    
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+    
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+    
+    def __len__(self) -> int:
+        return max((len(tier) for tier in self.tiers), default=0)
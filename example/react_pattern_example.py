@@ -15,15 +15,14 @@ def main():
     # Get API key from EnvManager
     groq_api_key = env_manager.get_groq_api_key(raise_error=True)
 
-    # Create ReAct pattern instance
-    react_agent = ReactPattern(
+    # Create ReAct pattern instance; leaving the block releases its session-scoped tools
+    with ReactPattern(
         user_prompt="What's the weather in Bangalore and based on the temperature, suggest me a good place to visit?",
         verbose=True,
         api_key=groq_api_key
-    )
-    
-    # Run the ReAct pattern
-    output = react_agent.run()
+    ) as react_agent:
+        # Run the ReAct pattern
+        output = react_agent.run()
     
     print("\n===== FINAL OUTPUT =====")
     print(output)
@@ -15,12 +15,11 @@ def main():
     # Get API keys from EnvManager
     groq_api_key = env_manager.get_groq_api_key(raise_error=True)
 
-    output = ToolsPattern(
-     groq_api_key=groq_api_key,
-    ).run(
-        user_query="Images of cat dancing",
-        max_iterations=3,
-    )
+    with ToolsPattern(groq_api_key=groq_api_key) as tools_pattern:
+        output = tools_pattern.run(
+            user_query="Images of cat dancing",
+            max_iterations=3,
+        )
     print("\n===== FINAL OUTPUT =====")
     print(output)
 
@@ -2,5 +2,19 @@ from .model_factory import ModelFactory
 from .model_enums import RoleType, ProviderType, ModelType
 from .model_base import ModelBase
 from .groq import GroqModel  # Rename the class in groq.py
+from .conversation import ConversationLog
+from .rate_limiter import RateLimiter, TokenBucket
+from .errors import ModelError, ModelRateLimitError, ModelServerError, ModelConnectionError, ModelRequestError, CircuitOpenError
+from .retry import RetryPolicy, CircuitBreaker
+from .replay import ReplayFixtures, LatencyModel
+from .local_model import LocalModel
+from .local_server import LocalChatServer
+from .context_window import ContextWindow, ContextStrategy, TruncateObservations, DropOldestObservations, SummarizeOlderTurns
+from .usage import Usage, ModelResult, Pricing, PRICING, UsageBudget, UsageMeter
+from .client_registry import ClientRegistry
 
-__all__ = ["ModelFactory", "RoleType", "ProviderType", "ModelType", "ModelBase", "GroqModel"]
\ No newline at end of file
+__all__ = ["ModelFactory", "RoleType", "ProviderType", "ModelType", "ModelBase", "GroqModel", "ConversationLog", "RateLimiter", "TokenBucket",
+           "ModelError", "ModelRateLimitError", "ModelServerError", "ModelConnectionError", "ModelRequestError", "CircuitOpenError",
+           "RetryPolicy", "CircuitBreaker", "ReplayFixtures", "LatencyModel", "LocalModel", "LocalChatServer",
+           "ContextWindow", "ContextStrategy", "TruncateObservations", "DropOldestObservations", "SummarizeOlderTurns",
+           "Usage", "ModelResult", "Pricing", "PRICING", "UsageBudget", "UsageMeter", "ClientRegistry"]
\ No newline at end of file
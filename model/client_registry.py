@@ -0,0 +1,134 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import inspect
+import logging
+import threading
+import weakref
+
+from . import model_enums
+
+ClientKey = Tuple[str, str, Optional[str]]
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of provider SDK clients, keyed by provider, credentials and endpoint.
+    
+    Models built with the same key share one client, and with it one HTTP
+    connection pool, instead of each ModelFactory opening its own. Sync clients
+    are shared across threads. Async clients are bound to the event loop that
+    uses them, so one is kept per running loop and dropped with the loop.
+    Call close() (or aclose() from the loop) at shutdown to release connections.
+    """
+    _shared: Optional["ClientRegistry"] = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self):
+        self._clients: Dict[ClientKey, Any] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, Any]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls) -> "ClientRegistry":
+        """
+        Get the registry shared by every ModelFactory with share_clients=True.
+        :return: The process-wide ClientRegistry
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    @staticmethod
+    def key(provider: model_enums.ProviderType, api_key: Optional[str], base_url: Optional[str] = None) -> ClientKey:
+        """
+        :return: The registry key; the API key is stored only as a digest
+        """
+        digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        return provider.value, digest, base_url
+    
+    def client(self, key: ClientKey, factory: Callable[[], Any]) -> Any:
+        """
+        Get the sync client for a key, creating it on first use.
+        :param key: From ClientRegistry.key
+        :param factory: Builds a new client
+        :return: The shared client
+        """
+        # Looked up on every request, so skip the lock once the client exists
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = factory()
+                self._clients[key] = client
+            return client
+    
+    def async_client(self, key: ClientKey, factory: Callable[[], Any]) -> Any:
+        """
+        Get the async client for a key on the running event loop, creating it on first use.
+        Outside an event loop the client is created unshared.
+        :param key: From ClientRegistry.key
+        :param factory: Builds a new client
+        :return: The client for this loop
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return factory()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = factory()
+                clients[key] = client
+            return client
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients) + sum(len(clients) for clients in self._async_clients.values())
+    
+    def _matching(self, clients: Dict[ClientKey, Any], provider: Optional[model_enums.ProviderType]) -> Dict[ClientKey, Any]:
+        return {key: client for key, client in clients.items() if provider is None or key[0] == provider.value}
+    
+    def close(self, provider: Optional[model_enums.ProviderType] = None) -> None:
+        """
+        Close and forget the sync clients, optionally only those of one provider.
+        Models look their client up on every request, so they keep working on a
+        new client afterwards. Async clients are forgotten too; close them with
+        aclose() on their loop first to release their connections promptly.
+        :param provider: Limit to this provider
+        """
+        with self._lock:
+            closing = self._matching(self._clients, provider)
+            for key in closing:
+                del self._clients[key]
+            for clients in self._async_clients.values():
+                for key in self._matching(clients, provider):
+                    del clients[key]
+        for client in closing.values():
+            try:
+                client.close()
+            except Exception as e:
+                logging.warning(f"Failed to close {type(client).__name__}: {str(e)}")
+    
+    async def aclose(self, provider: Optional[model_enums.ProviderType] = None) -> None:
+        """
+        Close and forget the async clients of the running event loop.
+        :param provider: Limit to this provider
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.get(loop, {})
+            closing = self._matching(clients, provider)
+            for key in closing:
+                del clients[key]
+        for client in closing.values():
+            try:
+                result = client.close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logging.warning(f"Failed to close {type(client).__name__}: {str(e)}")
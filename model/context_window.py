@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from .model_base import MessageContent
+from . import model_enums
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (roughly four characters per token) plus a small per-message overhead.
+    :param text: Message content
+    :return: Estimated number of tokens
+    """
+    return len(text) // 4 + 4
+
+
+class ContextStrategy(ABC):
+    """
+    A way of shrinking the unpinned part of a conversation to fit a token budget.
+    """
+    
+    @abstractmethod
+    def apply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        """
+        Shrink the conversation.
+        :param window: The context window enforcing the budget
+        :param messages: The full conversation
+        :param pinned: Number of leading messages that must be kept unchanged
+        :return: The reduced conversation
+        """
+        pass
+    
+    async def aapply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        """
+        Async variant of apply, for strategies that call a model.
+        """
+        return self.apply(window, messages, pinned)
+
+
+@dataclass
+class TruncateObservations(ContextStrategy):
+    """
+    Cut oversized tool observations down to max_observation_tokens, oldest first.
+    """
+    max_observation_tokens: int = 1000
+    keep_recent: int = 1
+    # Text-protocol observations arrive as user messages, native ones as tool messages
+    observation_roles: Tuple[str, ...] = (model_enums.RoleType.Tool.value, "tool")
+    
+    def apply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        messages = list(messages)
+        max_chars = self.max_observation_tokens * 4
+        for index in range(pinned, len(messages) - self.keep_recent):
+            if window.fits(messages):
+                break
+            message = messages[index]
+            if message["role"] in self.observation_roles and len(message["content"] or "") > max_chars:
+                messages[index] = {**message, "content": message["content"][:max_chars] + "\n...[truncated]"}
+        return messages
+
+
+@dataclass
+class DropOldestObservations(ContextStrategy):
+    """
+    Drop the oldest unpinned turns: a model response together with the
+    observations that follow it, so native tool messages never lose their call.
+    Trimming stops when the next turn would start inside the most recent messages.
+    """
+    keep_recent: int = 2
+    
+    def apply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        messages = list(messages)
+        while not window.fits(messages) and len(messages) - pinned > self.keep_recent:
+            limit = len(messages) - self.keep_recent
+            end = pinned + 1
+            while end < limit and messages[end]["role"] != model_enums.RoleType.Assistant.value:
+                end += 1
+            # Only cut where a turn starts; anything else would orphan tool messages
+            if end < len(messages) and messages[end]["role"] != model_enums.RoleType.Assistant.value:
+                break
+            del messages[pinned:end]
+        return messages
+
+
+@dataclass
+class SummarizeOlderTurns(ContextStrategy):
+    """
+    Replace everything but the most recent turns with a short summary written by a model.
+    The model should be a cheap one; it is any object with generate/agenerate like ModelFactory.
+    """
+    model: object = None
+    keep_recent: int = 2
+    prompt: str = (
+        "Summarize the following agent steps and tool observations in a few sentences. "
+        "Keep every fact that may be needed to answer the original question.\n\n"
+    )
+    
+    def _split(self, messages: List[MessageContent], pinned: int):
+        cut = max(pinned, len(messages) - self.keep_recent)
+        # Never separate native tool results from the assistant message that requested them
+        while cut > pinned and cut < len(messages) and messages[cut]["role"] == "tool":
+            cut -= 1
+        older = messages[pinned:cut]
+        transcript = "\n".join(f"{message['role']}: {message.get('content') or ''}" for message in older)
+        return cut, older, transcript
+    
+    def _merge(self, messages: List[MessageContent], pinned: int, cut: int, summary: str) -> List[MessageContent]:
+        summary_message = {"role": model_enums.RoleType.User.value, "content": f"<summary>{summary}</summary>"}
+        return messages[:pinned] + [summary_message] + messages[cut:]
+    
+    def apply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        cut, older, transcript = self._split(messages, pinned)
+        if len(older) < 2:
+            return list(messages)
+        summary = self.model.generate(self.prompt + transcript, model_enums.RoleType.User)
+        return self._merge(messages, pinned, cut, summary)
+    
+    async def aapply(self, window: "ContextWindow", messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        cut, older, transcript = self._split(messages, pinned)
+        if len(older) < 2:
+            return list(messages)
+        summary = await self.model.agenerate(self.prompt + transcript, model_enums.RoleType.User)
+        return self._merge(messages, pinned, cut, summary)
+
+
+@dataclass
+class ContextWindow:
+    """
+    Keeps a conversation within an estimated token budget.
+    
+    The first `pinned` messages (system prompt and original question) are
+    never touched. When the budget is exceeded the strategies are applied in
+    order until the conversation fits again.
+    """
+    max_tokens: int = 16000
+    strategies: List[ContextStrategy] = field(default_factory=lambda: [TruncateObservations(), DropOldestObservations()])
+    token_estimator: Callable[[str], int] = estimate_tokens
+    _estimate: Optional[Callable[[str], int]] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        # Messages are resent every iteration, so remember their estimates
+        self._estimate = lru_cache(maxsize=4096)(self.token_estimator)
+    
+    def count(self, messages: List[MessageContent]) -> int:
+        """
+        Estimate the total number of tokens in a conversation.
+        :param messages: The conversation
+        :return: Estimated token count
+        """
+        return sum(self._estimate(message["content"] or "") for message in messages)
+    
+    def fits(self, messages: List[MessageContent]) -> bool:
+        return self.count(messages) <= self.max_tokens
+    
+    def fit(self, messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        """
+        Reduce a conversation until it fits the budget.
+        :param messages: The conversation
+        :param pinned: Number of leading messages that must be kept
+        :return: The same list when it already fits, otherwise a reduced copy
+        """
+        for strategy in self.strategies:
+            if self.fits(messages):
+                break
+            messages = strategy.apply(self, messages, pinned)
+        return messages
+    
+    async def afit(self, messages: List[MessageContent], pinned: int) -> List[MessageContent]:
+        """
+        Async variant of fit.
+        """
+        for strategy in self.strategies:
+            if self.fits(messages):
+                break
+            messages = await strategy.aapply(self, messages, pinned)
+        return messages
@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+from typing import Iterator, List
+
+from .model_base import MessageContent
+from . import model_enums
+
+
+@dataclass
+class ConversationLog:
+    """
+    Append-only list of chat messages.
+    
+    Each turn is appended in O(1) and view() hands the model the underlying
+    list without copying it, so long sessions stop paying to rebuild the
+    whole prompt on every iteration.
+    """
+    messages: List[MessageContent] = field(default_factory=list)
+    
+    def append(self, role: model_enums.RoleType, content: str) -> MessageContent:
+        """
+        Append a message to the end of the conversation.
+        :param role: Role of the message author
+        :param content: Message text
+        :return: The appended message
+        """
+        message = {"role": role.value, "content": content}
+        self.messages.append(message)
+        return message
+    
+    def append_message(self, message: MessageContent) -> MessageContent:
+        """
+        Append an already built message, e.g. an assistant message carrying tool calls.
+        :param message: The message to append
+        :return: The appended message
+        """
+        self.messages.append(message)
+        return message
+    
+    def view(self) -> List[MessageContent]:
+        """
+        Get the messages to send to the model. The returned list is shared
+        with the log and must not be modified by the caller.
+        :return: The list of messages
+        """
+        return self.messages
+    
+    def __len__(self) -> int:
+        return len(self.messages)
+    
+    def __iter__(self) -> Iterator[MessageContent]:
+        return iter(self.messages)
@@ -0,0 +1,56 @@
+from typing import Optional
+
+
+class ModelError(Exception):
+    """
+    Base class for failures raised by the model layer.
+    
+    :param message: Human readable description
+    :param provider: Name of the provider that failed
+    :param status_code: HTTP status returned by the provider, if any
+    :param retry_after: Seconds the provider asked us to wait, if it said
+    """
+    retryable: bool = False
+    # Whether the failure suggests the upstream itself is unhealthy
+    trips_breaker: bool = False
+    
+    def __init__(self, message: str, provider: Optional[str] = None, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ModelRateLimitError(ModelError):
+    """
+    The provider rejected the request because a quota was exceeded (HTTP 429).
+    """
+    retryable = True
+
+
+class ModelServerError(ModelError):
+    """
+    The provider failed to serve the request (HTTP 5xx).
+    """
+    retryable = True
+    trips_breaker = True
+
+
+class ModelConnectionError(ModelError):
+    """
+    The provider could not be reached or timed out.
+    """
+    retryable = True
+    trips_breaker = True
+
+
+class ModelRequestError(ModelError):
+    """
+    The provider rejected the request itself (other HTTP 4xx); retrying will not help.
+    """
+
+
+class CircuitOpenError(ModelError):
+    """
+    Raised without calling the provider while its circuit breaker is open.
+    """
@@ -1,26 +1,123 @@
 from . import model_base
 from . import model_enums
 from groq import Groq as GroqClient
+from groq import AsyncGroq as AsyncGroqClient
+from groq import APIConnectionError, APIStatusError, RateLimitError
+from .errors import ModelError, ModelRateLimitError, ModelServerError, ModelConnectionError, ModelRequestError
+from .client_registry import ClientRegistry
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, ClassVar, Iterator, AsyncIterator, Any, Dict, List
 
 class GroqModel(model_base.ModelBase):
     """
     Groq model implementation that inherits from ModelBase.
     """
+    provider: ClassVar[model_enums.ProviderType] = model_enums.ProviderType.Groq
+    supports_tools: ClassVar[bool] = True
+    
+    def _new_client(self) -> GroqClient:
+        # Retries are handled by call_with_retry so they share the circuit breaker
+        return GroqClient(api_key=self.api_key, max_retries=0, base_url=self.base_url)
+    
+    def _new_async_client(self) -> AsyncGroqClient:
+        return AsyncGroqClient(api_key=self.api_key, max_retries=0, base_url=self.base_url)
     
     def init_model(self) -> bool:
         """
-        Initialize the Groq client with the API key.
+        Initialize the Groq clients (sync and async) with the API key.
+        With a client registry the clients are shared and looked up on every
+        request, so a client closed through the registry is recreated on next use.
         :return: True if initialization was successful, False otherwise
         """
         try:
-            self.model = GroqClient(api_key=self.api_key)
+            if self.client_registry is not None:
+                self.client_key = ClientRegistry.key(self.provider, self.api_key, self.base_url)
+                self.client_registry.client(self.client_key, self._new_client)
+                self.model = None
+                self.async_model = None
+            else:
+                self.model = self._new_client()
+                self.async_model = self._new_async_client()
             return True
         except Exception as e:
             logging.error(f"Failed to initialize Groq client: {str(e)}")
             return False
     
+    def client(self) -> GroqClient:
+        """
+        :return: The sync client to use for the next request
+        """
+        if self.client_registry is None:
+            return self.model
+        return self.client_registry.client(self.client_key, self._new_client)
+    
+    def async_client(self) -> AsyncGroqClient:
+        """
+        :return: The async client to use on the running event loop
+        """
+        if self.client_registry is None:
+            return self.async_model
+        return self.client_registry.async_client(self.client_key, self._new_async_client)
+    
+    def warm_up(self, connections: int = 1) -> bool:
+        """
+        Open connections in the client's pool with lightweight model-list requests,
+        so the first completions skip connection and TLS setup.
+        :param connections: Number of connections to open concurrently
+        :return: True if every request succeeded
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(lambda _: self.client().models.list(), range(connections)))
+            return True
+        except Exception as e:
+            logging.warning(f"Groq warm-up failed: {str(self.translate_error(e))}")
+            return False
+    
+    async def awarm_up(self, connections: int = 1) -> bool:
+        """
+        Async variant of warm_up, for the async client of the running event loop.
+        :param connections: Number of connections to open concurrently
+        :return: True if every request succeeded
+        """
+        client = self.async_client()
+        try:
+            await asyncio.gather(*(client.models.list() for _ in range(connections)))
+            return True
+        except Exception as e:
+            logging.warning(f"Groq warm-up failed: {str(self.translate_error(e))}")
+            return False
+    
+    def translate_error(self, error: Exception) -> ModelError:
+        """
+        Classify a Groq SDK exception.
+        :param error: The exception raised by the Groq client
+        :return: The structured error
+        """
+        if isinstance(error, ModelError):
+            return error
+        provider = self.provider.value
+        if isinstance(error, APIConnectionError):
+            # Also covers APITimeoutError
+            return ModelConnectionError(str(error), provider=provider)
+        if isinstance(error, APIStatusError):
+            status_code = error.status_code
+            retry_after = None
+            try:
+                retry_after = float(error.response.headers.get("retry-after"))
+            except (AttributeError, TypeError, ValueError):
+                pass
+            if isinstance(error, RateLimitError) or status_code == 429:
+                error_type = ModelRateLimitError
+            elif status_code >= 500:
+                error_type = ModelServerError
+            else:
+                error_type = ModelRequestError
+            return error_type(str(error), provider=provider, status_code=status_code, retry_after=retry_after)
+        return super().translate_error(error)
+    
     def generate(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Optional[str]:
         """
         Generate a response using the Groq API.
@@ -29,7 +126,8 @@ class GroqModel(model_base.ModelBase):
                      If a string is provided, it will be wrapped in a message object with the specified role.
                      If a list is provided, it should contain properly formatted message objects.
         :param role: Role type for the request (used only if prompt is a string)
-        :return: Generated text response or None if there's an error
+        :return: Generated text response, or None for an empty prompt
+        :raises ModelError: If the request fails after retries
         """
         if not prompt:
             logging.warning("Empty prompt provided to generate method")
@@ -38,20 +136,244 @@ class GroqModel(model_base.ModelBase):
         if self.verbose:
             print(f"Generating response for prompt: {prompt}")
             
+        messages = self.build_messages(prompt, role)
+        
+        def call():
+            estimated_tokens = self.acquire_rate_limit(messages)
+            response = self.client().chat.completions.create(
+                messages=messages,
+                model=self.model_name.value,
+                **self.sampling_params
+            )
+            self.record_rate_limit_usage(estimated_tokens, response)
+            return response
+        
         try:
-            # Handle both string prompts and message arrays
-            if isinstance(prompt, str):
-                if role is None:
-                    role = model_enums.RoleType.User
-                messages = [{"role": role.value, "content": prompt}]
-            else:
-                messages = prompt
-                
-            response = self.model.chat.completions.create(
+            response = self.call_with_retry(call)
+        except ModelError as e:
+            logging.error(f"Error during Groq API call: {str(e)}")
+            raise
+        return response.choices[0].message.content
+    
+    async def agenerate(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Optional[str]:
+        """
+        Generate a response using the async Groq API without blocking the event loop.
+        
+        :param prompt: Text prompt or list of message objects to send to the model.
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: Generated text response, or None for an empty prompt
+        :raises ModelError: If the request fails after retries
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to agenerate method")
+            return None
+            
+        if self.verbose:
+            print(f"Generating response for prompt: {prompt}")
+            
+        messages = self.build_messages(prompt, role)
+        
+        async def call():
+            estimated_tokens = await self.aacquire_rate_limit(messages)
+            response = await self.async_client().chat.completions.create(
+                messages=messages,
+                model=self.model_name.value,
+                **self.sampling_params
+            )
+            self.record_rate_limit_usage(estimated_tokens, response)
+            return response
+        
+        try:
+            response = await self.acall_with_retry(call)
+        except ModelError as e:
+            logging.error(f"Error during Groq API call: {str(e)}")
+            raise
+        return response.choices[0].message.content
+    
+    def generate_stream(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Iterator[str]:
+        """
+        Stream a response from the Groq API as text chunks.
+        Closing the generator early closes the HTTP stream, cancelling the rest of the completion.
+        
+        :param prompt: Text prompt or list of message objects to send to the model.
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: Iterator over generated text chunks
+        :raises ModelError: If opening the stream fails after retries, or the stream breaks
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to generate_stream method")
+            return
+            
+        if self.verbose:
+            print(f"Streaming response for prompt: {prompt}")
+            
+        messages = self.build_messages(prompt, role)
+        
+        estimated_tokens = 0
+        
+        def call():
+            nonlocal estimated_tokens
+            estimated_tokens = self.acquire_rate_limit(messages)
+            return self.client().chat.completions.create(
+                messages=messages,
+                model=self.model_name.value,
+                stream=True,
+                **self.sampling_params
+            )
+        
+        try:
+            stream = self.call_with_retry(call)
+        except ModelError as e:
+            logging.error(f"Error during Groq API call: {str(e)}")
+            raise
+        
+        # Chunks may already have been yielded, so a broken stream is not retried
+        completion_chars = 0
+        try:
+            for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    completion_chars += len(content)
+                    yield content
+        except Exception as e:
+            logging.error(f"Error while streaming from Groq API: {str(e)}")
+            raise self.translate_error(e) from e
+        finally:
+            stream.close()
+            self.record_stream_rate_limit_usage(estimated_tokens, messages, completion_chars)
+    
+    async def agenerate_stream(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> AsyncIterator[str]:
+        """
+        Stream a response from the async Groq API as text chunks.
+        Closing the generator early closes the HTTP stream, cancelling the rest of the completion.
+        
+        :param prompt: Text prompt or list of message objects to send to the model.
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: Async iterator over generated text chunks
+        :raises ModelError: If opening the stream fails after retries, or the stream breaks
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to agenerate_stream method")
+            return
+            
+        if self.verbose:
+            print(f"Streaming response for prompt: {prompt}")
+            
+        messages = self.build_messages(prompt, role)
+        
+        estimated_tokens = 0
+        
+        async def call():
+            nonlocal estimated_tokens
+            estimated_tokens = await self.aacquire_rate_limit(messages)
+            return await self.async_client().chat.completions.create(
                 messages=messages,
-                model=self.model_name.value
+                model=self.model_name.value,
+                stream=True,
+                **self.sampling_params
             )
-            return response.choices[0].message.content
+        
+        try:
+            stream = await self.acall_with_retry(call)
+        except ModelError as e:
+            logging.error(f"Error during Groq API call: {str(e)}")
+            raise
+        
+        completion_chars = 0
+        try:
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    completion_chars += len(content)
+                    yield content
         except Exception as e:
+            logging.error(f"Error while streaming from Groq API: {str(e)}")
+            raise self.translate_error(e) from e
+        finally:
+            await stream.close()
+            self.record_stream_rate_limit_usage(estimated_tokens, messages, completion_chars)
+    
+    @staticmethod
+    def _to_message(message: Any) -> Dict[str, Any]:
+        """
+        Convert a chat-completions response message into a plain assistant message dict.
+        """
+        result = {"role": model_enums.RoleType.Assistant.value, "content": message.content}
+        if message.tool_calls:
+            result["tool_calls"] = [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+                }
+                for tool_call in message.tool_calls
+            ]
+        return result
+    
+    def generate_with_tools(self, prompt: model_base.PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Generate a response with the tool definitions passed through the chat-completions tools parameter.
+        
+        :param prompt: Text prompt or list of message objects to send to the model.
+        :param tools: Tool definitions in chat-completions "tools" format
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The assistant message, with structured "tool_calls" when the model called tools
+        :raises ModelError: If the request fails after retries
+        """
+        if self.verbose:
+            print(f"Generating response with tools for prompt: {prompt}")
+            
+        messages = self.build_messages(prompt, role)
+        
+        def call():
+            estimated_tokens = self.acquire_rate_limit(messages)
+            response = self.client().chat.completions.create(
+                messages=messages,
+                model=self.model_name.value,
+                tools=tools,
+                tool_choice="auto",
+                **self.sampling_params
+            )
+            self.record_rate_limit_usage(estimated_tokens, response)
+            return response
+        
+        try:
+            response = self.call_with_retry(call)
+        except ModelError as e:
+            logging.error(f"Error during Groq API call: {str(e)}")
+            raise
+        return self._to_message(response.choices[0].message)
+    
+    async def agenerate_with_tools(self, prompt: model_base.PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Async variant of generate_with_tools.
+        
+        :param prompt: Text prompt or list of message objects to send to the model.
+        :param tools: Tool definitions in chat-completions "tools" format
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The assistant message, with structured "tool_calls" when the model called tools
+        :raises ModelError: If the request fails after retries
+        """
+        if self.verbose:
+            print(f"Generating response with tools for prompt: {prompt}")
+            
+        messages = self.build_messages(prompt, role)
+        
+        async def call():
+            estimated_tokens = await self.aacquire_rate_limit(messages)
+            response = await self.async_client().chat.completions.create(
+                messages=messages,
+                model=self.model_name.value,
+                tools=tools,
+                tool_choice="auto",
+                **self.sampling_params
+            )
+            self.record_rate_limit_usage(estimated_tokens, response)
+            return response
+        
+        try:
+            response = await self.acall_with_retry(call)
+        except ModelError as e:
             logging.error(f"Error during Groq API call: {str(e)}")
-            return f"Error: {str(e)}"
\ No newline at end of file
+            raise
+        return self._to_message(response.choices[0].message)
@@ -0,0 +1,144 @@
+from . import model_base
+from . import model_enums
+from .replay import ReplayFixtures, LatencyModel
+from .context_window import estimate_tokens
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional, ClassVar, Iterator, AsyncIterator, Any, Dict, List
+import asyncio
+import logging
+import time
+
+@dataclass
+class LocalModel(model_base.ModelBase):
+    """
+    Deterministic in-process stand-in provider that answers from recorded fixtures.
+    It goes through the same rate limiting, retry and circuit breaking as a real
+    provider, so pattern overhead, concurrency and caching can be measured
+    without network access.
+    """
+    fixtures: ReplayFixtures = field(default_factory=ReplayFixtures)
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    chunk_size: int = 16
+    provider: ClassVar[model_enums.ProviderType] = model_enums.ProviderType.Local
+    supports_tools: ClassVar[bool] = True
+    
+    def init_model(self) -> bool:
+        """
+        Nothing to connect to; the fixtures are the model.
+        :return: True
+        """
+        self.model = self.fixtures
+        self.async_model = self.fixtures
+        return True
+    
+    def _usage(self, messages: List[model_base.MessageContent], message: Dict[str, Any]) -> SimpleNamespace:
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = estimate_tokens(message.get("content") or "")
+        return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, total_tokens=prompt_tokens + completion_tokens)
+    
+    def _respond(self, messages: List[model_base.MessageContent], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        estimated_tokens = self.acquire_rate_limit(messages)
+        self.latency.wait()
+        message = self.fixtures.respond(messages, tools)
+        self.record_rate_limit_usage(estimated_tokens, SimpleNamespace(usage=self._usage(messages, message)))
+        return message
+    
+    async def _arespond(self, messages: List[model_base.MessageContent], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        estimated_tokens = await self.aacquire_rate_limit(messages)
+        await self.latency.asleep()
+        message = self.fixtures.respond(messages, tools)
+        self.record_rate_limit_usage(estimated_tokens, SimpleNamespace(usage=self._usage(messages, message)))
+        return message
+    
+    def _chunks(self, content: Optional[str]) -> List[str]:
+        content = content or ""
+        return [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+    
+    def generate(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Optional[str]:
+        """
+        Answer from the fixtures after the simulated latency.
+        
+        :param prompt: Text prompt or list of message objects
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The recorded response text, or None for an empty prompt
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to generate method")
+            return None
+        messages = self.build_messages(prompt, role)
+        return self.call_with_retry(lambda: self._respond(messages))["content"]
+    
+    async def agenerate(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Optional[str]:
+        """
+        Async variant of generate; the simulated latency does not block the event loop.
+        
+        :param prompt: Text prompt or list of message objects
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The recorded response text, or None for an empty prompt
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to agenerate method")
+            return None
+        messages = self.build_messages(prompt, role)
+        return (await self.acall_with_retry(lambda: self._arespond(messages)))["content"]
+    
+    def generate_stream(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> Iterator[str]:
+        """
+        Stream the recorded response in chunk_size pieces, waiting latency.per_chunk between them.
+        
+        :param prompt: Text prompt or list of message objects
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: Iterator over text chunks
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to generate_stream method")
+            return
+        messages = self.build_messages(prompt, role)
+        message = self.call_with_retry(lambda: self._respond(messages))
+        for index, chunk in enumerate(self._chunks(message["content"])):
+            if index and self.latency.per_chunk:
+                time.sleep(self.latency.per_chunk)
+            yield chunk
+    
+    async def agenerate_stream(self, prompt: model_base.PromptType, role: Optional[model_enums.RoleType] = None) -> AsyncIterator[str]:
+        """
+        Async variant of generate_stream.
+        
+        :param prompt: Text prompt or list of message objects
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: Async iterator over text chunks
+        """
+        if not prompt:
+            logging.warning("Empty prompt provided to agenerate_stream method")
+            return
+        messages = self.build_messages(prompt, role)
+        message = await self.acall_with_retry(lambda: self._arespond(messages))
+        for index, chunk in enumerate(self._chunks(message["content"])):
+            if index and self.latency.per_chunk:
+                await asyncio.sleep(self.latency.per_chunk)
+            yield chunk
+    
+    def generate_with_tools(self, prompt: model_base.PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Answer from the fixtures, including any scripted tool calls.
+        
+        :param prompt: Text prompt or list of message objects
+        :param tools: Tool definitions in chat-completions "tools" format
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The assistant message, with "tool_calls" when the fixture has them
+        """
+        messages = self.build_messages(prompt, role)
+        return self.call_with_retry(lambda: self._respond(messages, tools))
+    
+    async def agenerate_with_tools(self, prompt: model_base.PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Async variant of generate_with_tools.
+        
+        :param prompt: Text prompt or list of message objects
+        :param tools: Tool definitions in chat-completions "tools" format
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: The assistant message, with "tool_calls" when the fixture has them
+        """
+        messages = self.build_messages(prompt, role)
+        return await self.acall_with_retry(lambda: self._arespond(messages, tools))
@@ -0,0 +1,197 @@
+"""
+A local HTTP server that mimics the chat-completions API from recorded fixtures.
+
+Point GroqModel at it to exercise the real client stack without network access:
+    ModelFactory(api_key="local", model_options={"base_url": server.base_url})
+
+Or run it standalone from the repository root:
+    python -m model.local_server --fixtures fixtures.jsonl --port 8000 --latency lognormal:0.4:0.3
+"""
+
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+import argparse
+import json
+import threading
+import time
+import uuid
+
+from .replay import ReplayFixtures, LatencyModel
+from .context_window import estimate_tokens
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep benchmark output clean
+        pass
+    
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Request body is not JSON", "type": "invalid_request_error"}})
+            return
+        messages = request.get("messages") or []
+        local = self.server.local
+        local.latency.wait()
+        message = local.fixtures.respond(messages, request.get("tools"))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = request.get("model", "local")
+        if request.get("stream"):
+            self._stream(message, completion_id, created, model)
+            return
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = estimate_tokens(message.get("content") or "")
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+    
+    def _stream(self, message: Dict[str, Any], completion_id: str, created: int, model: str) -> None:
+        local = self.server.local
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        content = message.get("content") or ""
+        pieces = [content[i:i + local.chunk_size] for i in range(0, len(content), local.chunk_size)]
+        try:
+            for index, piece in enumerate(pieces):
+                if index and local.latency.per_chunk:
+                    time.sleep(local.latency.per_chunk)
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            done = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early
+            pass
+        self.close_connection = True
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    local: "LocalChatServer"
+
+
+@dataclass
+class LocalChatServer:
+    """
+    Serve recorded fixtures over HTTP in the chat-completions format, with
+    simulated latency and optional streaming. Port 0 picks a free port.
+    Usable as a context manager.
+    """
+    fixtures: ReplayFixtures = field(default_factory=ReplayFixtures)
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    host: str = "127.0.0.1"
+    port: int = 0
+    chunk_size: int = 16
+    _server: Optional[_Server] = field(default=None, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, repr=False)
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> "LocalChatServer":
+        """
+        Start serving on a background thread.
+        :return: self, with port set to the bound port
+        """
+        if self._server is not None:
+            return self
+        self._server = _Server((self.host, self.port), _ChatCompletionsHandler)
+        self._server.local = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-chat-server", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+    
+    def __enter__(self) -> "LocalChatServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def parse_latency(spec: str, seed: Optional[int] = None) -> LatencyModel:
+    """
+    Parse "distribution:mean[:spread[:per_chunk]]", e.g. "fixed:0.2" or "lognormal:0.4:0.3".
+    """
+    parts = spec.split(":")
+    values = [float(part) for part in parts[1:]]
+    return LatencyModel(parts[0], *values, seed=seed)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m model.local_server", description="Serve recorded chat-completions fixtures over HTTP.")
+    parser.add_argument("--fixtures", help="JSONL fixtures file; without it every request gets the default response")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0", help="distribution:mean[:spread[:per_chunk]] in seconds (default: fixed:0)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency")
+    args = parser.parse_args(argv)
+    fixtures = ReplayFixtures.load(args.fixtures) if args.fixtures else ReplayFixtures()
+    server = LocalChatServer(fixtures=fixtures, latency=parse_latency(args.latency, args.seed), host=args.host, port=args.port).start()
+    print(f"Serving chat completions on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
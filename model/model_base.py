@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Optional, Any, Union, Dict, List, TypedDict
+from dataclasses import dataclass, field
+from typing import Optional, Any, Union, Dict, List, TypedDict, ClassVar, Iterator, AsyncIterator, Callable, Awaitable
+import asyncio
+import hashlib
+import json
+import logging
+import time
 
 from . import model_enums
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker
+from .client_registry import ClientRegistry
+from .errors import ModelError, ModelRequestError, ModelRateLimitError
+from .usage import report_usage
+from tracing import Tracer, current_span
 
 class MessageContent(TypedDict):
     role: str
@@ -17,7 +28,18 @@ class ModelBase(ABC):
     model_name: model_enums.ModelType
     verbose: bool = False
     model: any = None
+    async_model: any = None
     role: Optional[model_enums.RoleType] = None
+    sampling_params: Dict[str, Any] = field(default_factory=dict)
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy: Optional[RetryPolicy] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    # Override the provider endpoint, e.g. to point a client at a LocalChatServer
+    base_url: Optional[str] = None
+    # Share SDK clients (and their connection pools) with other models using the same credentials
+    client_registry: Optional[ClientRegistry] = None
+    provider: ClassVar[Optional[model_enums.ProviderType]] = None
+    supports_tools: ClassVar[bool] = False
     
     def __post_init__(self):
         """
@@ -28,6 +50,208 @@ class ModelBase(ABC):
         if self.verbose:
             print(f"Model initialized with name: {self.model_name}, role: {self.role}")
     
+    def build_messages(self, prompt: PromptType, role: Optional[model_enums.RoleType] = None) -> List[MessageContent]:
+        """
+        Normalize a prompt into a list of message objects.
+        :param prompt: Text prompt or list of message objects
+        :param role: Role type for the request (used only if prompt is a string)
+        :return: List of message objects
+        """
+        if isinstance(prompt, str):
+            if role is None:
+                role = model_enums.RoleType.User
+            return [{"role": role.value, "content": prompt}]
+        return prompt
+    
+    def cache_key(self, prompt: PromptType, role: Optional[model_enums.RoleType] = None) -> str:
+        """
+        Stable hash identifying a request, used to key the response cache.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: Hex digest of (provider, model, messages, sampling params)
+        """
+        payload = {
+            "provider": self.provider.value if self.provider else type(self).__name__,
+            "model": self.model_name.value,
+            "messages": self.build_messages(prompt, role),
+            "sampling": self.sampling_params,
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def estimate_request_tokens(self, messages: List[MessageContent]) -> int:
+        """
+        Rough token cost of a request, used to reserve rate-limit quota before the call.
+        :param messages: The messages being sent
+        :return: Estimated prompt tokens plus the completion budget, if one is set
+        """
+        prompt_chars = sum(len(message.get("content") or "") for message in messages)
+        return prompt_chars // 4 + 4 * len(messages) + self.sampling_params.get("max_tokens", 0)
+    
+    def acquire_rate_limit(self, messages: List[MessageContent]) -> int:
+        """
+        Wait until the rate limiter admits the request.
+        :param messages: The messages being sent
+        :return: The number of tokens reserved
+        """
+        if self.rate_limiter is None:
+            return 0
+        estimated_tokens = self.estimate_request_tokens(messages)
+        self.rate_limiter.acquire(estimated_tokens)
+        return estimated_tokens
+    
+    async def aacquire_rate_limit(self, messages: List[MessageContent]) -> int:
+        """
+        Wait on the event loop until the rate limiter admits the request.
+        :param messages: The messages being sent
+        :return: The number of tokens reserved
+        """
+        if self.rate_limiter is None:
+            return 0
+        estimated_tokens = self.estimate_request_tokens(messages)
+        await self.rate_limiter.aacquire(estimated_tokens)
+        return estimated_tokens
+    
+    def record_rate_limit_usage(self, estimated_tokens: int, response: Any) -> None:
+        """
+        Reconcile the reserved tokens with the usage reported in a response,
+        and report that usage to the calling ModelFactory and the current trace span.
+        :param estimated_tokens: Tokens reserved before the call
+        :param response: The provider response, read for usage.total_tokens
+        """
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            total_tokens = getattr(usage, "total_tokens", None)
+            report_usage(prompt_tokens, completion_tokens, total_tokens)
+            if Tracer.shared().enabled:
+                current_span().set_attributes(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, total_tokens=total_tokens)
+        if self.rate_limiter is None:
+            return
+        self.rate_limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+    
+    def record_stream_rate_limit_usage(self, estimated_tokens: int, messages: List[MessageContent], completion_chars: int) -> None:
+        """
+        Reconcile the tokens reserved for a stream, which reports no usage, with an
+        estimate of the prompt and of the completion actually received.
+        :param estimated_tokens: Tokens reserved before the call
+        :param messages: The messages that were sent
+        :param completion_chars: Characters streamed back before the stream ended or was closed
+        """
+        if self.rate_limiter is None:
+            return
+        prompt_tokens = self.estimate_request_tokens(messages) - self.sampling_params.get("max_tokens", 0)
+        self.rate_limiter.record_usage(estimated_tokens, prompt_tokens + completion_chars // 4)
+    
+    def translate_error(self, error: Exception) -> ModelError:
+        """
+        Map a provider exception onto the ModelError hierarchy.
+        Providers override this to classify rate limits, server and connection errors.
+        :param error: The exception raised by the provider client
+        :return: The structured error
+        """
+        if isinstance(error, ModelError):
+            return error
+        return ModelError(str(error), provider=self.provider.value if self.provider else None)
+    
+    def _handle_failure(self, error: Exception, attempt: int, trial: bool = False) -> Optional[float]:
+        """
+        Classify a failed attempt and decide whether to retry.
+        :param trial: Whether the attempt was the circuit breaker's half-open trial
+        :return: Seconds to wait before retrying, or None to give up
+        """
+        model_error = self.translate_error(error)
+        if self.circuit_breaker is not None:
+            if model_error.trips_breaker:
+                self.circuit_breaker.record_failure()
+            elif isinstance(model_error, (ModelRequestError, ModelRateLimitError)) and model_error.status_code is not None:
+                # The upstream answered, so it is healthy even if it refused this call
+                self.circuit_breaker.record_success()
+            elif trial:
+                # Failed before reaching the upstream; the trial proved nothing
+                self.circuit_breaker.release_trial()
+        if self.retry_policy is None or not model_error.retryable or attempt + 1 >= self.retry_policy.max_attempts:
+            return None
+        delay = self.retry_policy.delay(attempt, model_error.retry_after)
+        logging.warning(f"Retrying {type(self).__name__} call in {delay:.2f}s after: {model_error}")
+        return delay
+    
+    def call_with_retry(self, call: Callable[[], Any]) -> Any:
+        """
+        Run a provider call under the circuit breaker and retry policy.
+        :param call: Callable performing one attempt
+        :return: The call's result
+        :raises ModelError: When the call fails and is not (or no longer) retryable
+        """
+        attempt = 0
+        while True:
+            trial = self.circuit_breaker.before_call() if self.circuit_breaker is not None else False
+            try:
+                result = call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, trial)
+                if delay is None:
+                    raise self.translate_error(e) from e
+                current_span().set_attribute("retries", attempt + 1)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted mid-call: free the trial so the circuit can recover
+                if trial:
+                    self.circuit_breaker.release_trial()
+                raise
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return result
+    
+    async def acall_with_retry(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of call_with_retry; backoff waits on the event loop.
+        :param call: Callable returning an awaitable for one attempt
+        :return: The call's result
+        :raises ModelError: When the call fails and is not (or no longer) retryable
+        """
+        attempt = 0
+        while True:
+            trial = self.circuit_breaker.before_call() if self.circuit_breaker is not None else False
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, trial)
+                if delay is None:
+                    raise self.translate_error(e) from e
+                current_span().set_attribute("retries", attempt + 1)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled or interrupted mid-call: free the trial so the circuit can recover
+                if trial:
+                    self.circuit_breaker.release_trial()
+                raise
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return result
+    
+    def warm_up(self, connections: int = 1) -> bool:
+        """
+        Open connections to the provider ahead of the first request, e.g. at service start.
+        Providers without a network connection have nothing to warm up.
+        :param connections: Number of connections to open concurrently
+        :return: True if the provider answered
+        """
+        return True
+    
+    async def awarm_up(self, connections: int = 1) -> bool:
+        """
+        Async variant of warm_up, for the async client of the running event loop.
+        :param connections: Number of connections to open concurrently
+        :return: True if the provider answered
+        """
+        return True
+    
     @abstractmethod
     def init_model(self):
         """
@@ -44,4 +268,57 @@ class ModelBase(ABC):
         :param role: The role type for the request (used only if prompt is a string).
         :return: The generated response.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    async def agenerate(self, prompt: PromptType = None, role: Optional[model_enums.RoleType] = None):
+        """
+        Asynchronously generate a response from the model.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: The generated response.
+        """
+        pass
+
+    
+    @abstractmethod
+    def generate_stream(self, prompt: PromptType = None, role: Optional[model_enums.RoleType] = None) -> Iterator[str]:
+        """
+        Stream a response from the model as text chunks. Closing the iterator
+        early stops reading and releases the underlying request.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: An iterator over text chunks.
+        """
+        pass
+    
+    @abstractmethod
+    def agenerate_stream(self, prompt: PromptType = None, role: Optional[model_enums.RoleType] = None) -> AsyncIterator[str]:
+        """
+        Asynchronously stream a response from the model as text chunks.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: An async iterator over text chunks.
+        """
+        pass
+    
+    def generate_with_tools(self, prompt: PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Generate a response using the provider's native function-calling API.
+        Only available when supports_tools is True.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param tools: Tool definitions in chat-completions "tools" format.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: The assistant message, including "tool_calls" when the model called tools.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support native tool calling")
+    
+    async def agenerate_with_tools(self, prompt: PromptType, tools: List[Dict[str, Any]], role: Optional[model_enums.RoleType] = None) -> Dict[str, Any]:
+        """
+        Asynchronously generate a response using the provider's native function-calling API.
+        :param prompt: The prompt to generate a response for. Can be a string or a list of message objects.
+        :param tools: Tool definitions in chat-completions "tools" format.
+        :param role: The role type for the request (used only if prompt is a string).
+        :return: The assistant message, including "tool_calls" when the model called tools.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support native tool calling")
\ No newline at end of file
@@ -8,6 +8,7 @@ class RoleType(Enum):
 
 class ProviderType(Enum):
     Groq: str = "groq"
+    Local: str = "local"
 
 
 class ModelType(Enum):
@@ -1,7 +1,18 @@
 from . import model_enums
 from . import groq
+from . import local_model
 from .model_base import ModelBase
-from dataclasses import dataclass
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker
+from .client_registry import ClientRegistry
+from .replay import ReplayFixtures
+from .usage import Usage, ModelResult, Pricing, PRICING, UsageMeter, collect_call_usage
+from .context_window import estimate_tokens
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import time
+from cache import CacheBase, MISSING
+from tracing import Tracer, NOOP_SPAN, span
 
 @dataclass
 class ModelFactory:
@@ -10,21 +21,296 @@ class ModelFactory:
     model_name: model_enums.ModelType = model_enums.ModelType.Llama3_3_70B_Versatile
     verbose: bool = False
     model: any = None
+    sampling_params: Dict[str, Any] = field(default_factory=dict)
+    response_cache: Optional[CacheBase] = None
+    cache_ttl: Optional[float] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    retry_policy: Optional[RetryPolicy] = field(default_factory=RetryPolicy)
+    use_circuit_breaker: bool = True
+    # Provider-specific keyword arguments, e.g. base_url for Groq or fixtures/latency for Local
+    model_options: Dict[str, Any] = field(default_factory=dict)
+    # Record every request/response pair, to replay later with ProviderType.Local
+    recorder: Optional[ReplayFixtures] = None
+    # Prices used for cost accounting; defaults to the list price of model_name
+    pricing: Optional[Pricing] = None
+    # Reuse provider clients, and their connection pools, across factories with the same credentials
+    share_clients: bool = True
     
     def __post_init__(self)-> ModelBase:
-        if self.provider == model_enums.ProviderType.Groq:
-            self.model = groq.GroqModel(
+        if self.pricing is None:
+            self.pricing = PRICING.get(self.model_name)
+        # Factories sharing a provider and API key share one quota
+        rate_limiter = None
+        if self.requests_per_minute or self.tokens_per_minute:
+            rate_limiter = RateLimiter.shared(self.provider, self.api_key, self.requests_per_minute, self.tokens_per_minute)
+        circuit_breaker = CircuitBreaker.shared(self.provider) if self.use_circuit_breaker else None
+        model_class = {
+            model_enums.ProviderType.Groq: groq.GroqModel,
+            model_enums.ProviderType.Local: local_model.LocalModel,
+        }.get(self.provider)
+        if model_class is not None:
+            self.model = model_class(
                 model_name=self.model_name,
                 api_key=self.api_key,
-                verbose=self.verbose
+                verbose=self.verbose,
+                sampling_params=self.sampling_params,
+                rate_limiter=rate_limiter,
+                retry_policy=self.retry_policy,
+                circuit_breaker=circuit_breaker,
+                client_registry=ClientRegistry.shared() if self.share_clients else None,
+                **self.model_options
             )
         return self.model
     
-    def generate(self, prompt: list, role: model_enums.RoleType):
+    def deterministic_sampling(self) -> bool:
+        """
+        Whether identical requests can be expected to produce identical responses.
+        Sampling with a temperature above zero is only repeatable when a seed is set;
+        an unset temperature is treated as deterministic.
+        :return: False when the configured sampling is non-deterministic
+        """
+        if self.sampling_params.get("seed") is not None:
+            return True
+        return not self.sampling_params.get("temperature", 0)
+    
+    def _cached_response(self, prompt: list, role: model_enums.RoleType, use_cache: bool):
+        """
+        Look a request up in the response cache.
+        Non-deterministic sampling bypasses the cache, otherwise one sample would be replayed forever.
+        :return: Tuple of (cache key or None when caching is off, cached response or MISSING)
+        """
+        if self.response_cache is None or not use_cache or not self.deterministic_sampling():
+            return None, MISSING
+        key = self.model.cache_key(prompt, role)
+        return key, self.response_cache.get(key, MISSING)
+    
+    def _store_response(self, key: Optional[str], response: Any) -> None:
+        if key is None or not isinstance(response, str):
+            return
+        self.response_cache.set(key, response, ttl=self.cache_ttl)
+    
+    def _record(self, prompt: list, role: Optional[model_enums.RoleType], response: Any, tools: Optional[List[Dict[str, Any]]] = None) -> None:
+        if self.recorder is None or response is None:
+            return
+        if isinstance(response, dict):
+            response = {"content": response.get("content"), "tool_calls": response.get("tool_calls") or []}
+        self.recorder.record(self.model.build_messages(prompt, role), response, tools)
+    
+    def _span(self, name: str, prompt: Any, **attributes: Any):
+        """
+        Start a span for a model call, tagged with the provider, model and message count.
+        """
+        if not Tracer.shared().enabled:
+            return NOOP_SPAN
+        return span(
+            name,
+            provider=self.provider.value,
+            model=self.model_name.value,
+            messages=len(prompt) if isinstance(prompt, list) else 1,
+            **attributes
+        )
+    
+    def _result(self, prompt: list, role: Optional[model_enums.RoleType], content: Optional[str], usage: Usage, started: float, cached: bool = False, message: Optional[Dict[str, Any]] = None) -> ModelResult:
+        """
+        Finish the accounting for one call and record it in the active UsageMeter.
+        Token counts are estimated when the provider did not report any.
+        """
+        usage.calls = 1
+        usage.latency = time.perf_counter() - started
+        if cached:
+            usage.cached_calls = 1
+        else:
+            if not usage.total_tokens:
+                usage.prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in self.model.build_messages(prompt, role))
+                usage.completion_tokens = estimate_tokens(content or "")
+                usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+            if self.pricing is not None:
+                usage.cost = self.pricing.cost(usage.prompt_tokens, usage.completion_tokens)
+        UsageMeter.record_current(usage)
+        return ModelResult(content=content, usage=usage, latency=usage.latency, cached=cached, message=message)
+    
+    def _metered_stream(self, stream: Iterator[str], prompt: list, role: Optional[model_enums.RoleType]) -> Iterator[str]:
+        # Not activated: the consumer runs between chunks, outside the model call
+        stream_span = self._span("model.generate_stream", prompt)
+        started = time.perf_counter()
+        chunks = []
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            stream_span.record_error(e)
+            raise
+        finally:
+            stream_span.set_attribute("chunks", len(chunks))
+            stream_span.end()
+            self._result(prompt, role, "".join(chunks), Usage(), started)
+    
+    async def _ametered_stream(self, stream: AsyncIterator[str], prompt: list, role: Optional[model_enums.RoleType]) -> AsyncIterator[str]:
+        stream_span = self._span("model.generate_stream", prompt)
+        started = time.perf_counter()
+        chunks = []
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            stream_span.record_error(e)
+            raise
+        finally:
+            stream_span.set_attribute("chunks", len(chunks))
+            stream_span.end()
+            self._result(prompt, role, "".join(chunks), Usage(), started)
+    
+    def generate_result(self, prompt: list, role: model_enums.RoleType, use_cache: bool = True) -> ModelResult:
+        """
+        Generate a response with its token usage, cost and latency.
+        When a response cache is configured, identical requests are served from it unless
+        the sampling is non-deterministic; pass use_cache=False to bypass it explicitly.
+        """
+        if self.model:
+            started = time.perf_counter()
+            with self._span("model.generate", prompt) as model_span:
+                key, response = self._cached_response(prompt, role, use_cache)
+                model_span.set_attribute("cache_hit", response is not MISSING)
+                if response is not MISSING:
+                    return self._result(prompt, role, response, Usage(), started, cached=True)
+                with collect_call_usage() as usage:
+                    response = self.model.generate(prompt, role)
+                self._store_response(key, response)
+                self._record(prompt, role, response)
+                return self._result(prompt, role, response, usage, started)
+        else:
+            raise ValueError("Model is not initialized")
+    
+    async def agenerate_result(self, prompt: list, role: model_enums.RoleType, use_cache: bool = True) -> ModelResult:
+        """
+        Async variant of generate_result.
+        """
+        if self.model:
+            started = time.perf_counter()
+            with self._span("model.generate", prompt) as model_span:
+                key, response = self._cached_response(prompt, role, use_cache)
+                model_span.set_attribute("cache_hit", response is not MISSING)
+                if response is not MISSING:
+                    return self._result(prompt, role, response, Usage(), started, cached=True)
+                with collect_call_usage() as usage:
+                    response = await self.model.agenerate(prompt, role)
+                self._store_response(key, response)
+                self._record(prompt, role, response)
+                return self._result(prompt, role, response, usage, started)
+        else:
+            raise ValueError("Model is not initialized")
+    
+    def generate(self, prompt: list, role: model_enums.RoleType, use_cache: bool = True):
         """
         Delegate the generate method call to the underlying model.
+        Returns only the response text; see generate_result for usage and latency.
+        """
+        return self.generate_result(prompt, role, use_cache).content
+    
+    async def agenerate(self, prompt: list, role: model_enums.RoleType, use_cache: bool = True):
+        """
+        Delegate the agenerate method call to the underlying model.
+        Uses the response cache the same way as generate.
+        """
+        return (await self.agenerate_result(prompt, role, use_cache)).content
+    
+    def generate_stream(self, prompt: list, role: model_enums.RoleType) -> Iterator[str]:
+        """
+        Delegate the generate_stream method call to the underlying model.
+        Streams are never served from or written to the response cache, nor recorded.
+        Their usage is estimated from the text, as providers do not report it for streams.
+        """
+        if self.model:
+            stream = self.model.generate_stream(prompt, role)
+            if Tracer.shared().enabled or UsageMeter.active():
+                return self._metered_stream(stream, prompt, role)
+            return stream
+        else:
+            raise ValueError("Model is not initialized")
+    
+    def agenerate_stream(self, prompt: list, role: model_enums.RoleType) -> AsyncIterator[str]:
+        """
+        Delegate the agenerate_stream method call to the underlying model.
+        """
+        if self.model:
+            stream = self.model.agenerate_stream(prompt, role)
+            if Tracer.shared().enabled or UsageMeter.active():
+                return self._ametered_stream(stream, prompt, role)
+            return stream
+        else:
+            raise ValueError("Model is not initialized")
+    
+    def warm_up(self, connections: int = 1) -> bool:
+        """
+        Pre-open provider connections, e.g. at service start. With shared clients
+        later factories using the same credentials start warm too.
+        :param connections: Number of connections to open concurrently
+        :return: True if the provider answered
         """
         if self.model:
-            return self.model.generate(prompt, role)
+            return self.model.warm_up(connections)
         else:
             raise ValueError("Model is not initialized")
+    
+    async def awarm_up(self, connections: int = 1) -> bool:
+        """
+        Async variant of warm_up, for the async client of the running event loop.
+        :param connections: Number of connections to open concurrently
+        :return: True if the provider answered
+        """
+        if self.model:
+            return await self.model.awarm_up(connections)
+        else:
+            raise ValueError("Model is not initialized")
+    
+    @property
+    def supports_tools(self) -> bool:
+        """
+        Whether the underlying model supports native function calling.
+        """
+        return bool(self.model) and self.model.supports_tools
+    
+    def generate_with_tools_result(self, prompt: list, tools: List[Dict[str, Any]], role: model_enums.RoleType = None) -> ModelResult:
+        """
+        Call the model with native tool definitions; the assistant message is in result.message.
+        """
+        if self.model:
+            started = time.perf_counter()
+            with self._span("model.generate_with_tools", prompt, tools=len(tools)) as model_span:
+                with collect_call_usage() as usage:
+                    message = self.model.generate_with_tools(prompt, tools, role)
+                model_span.set_attribute("tool_calls", len(message.get("tool_calls") or []))
+                self._record(prompt, role, message, tools)
+                return self._result(prompt, role, message.get("content"), usage, started, message=message)
+        else:
+            raise ValueError("Model is not initialized")
+    
+    async def agenerate_with_tools_result(self, prompt: list, tools: List[Dict[str, Any]], role: model_enums.RoleType = None) -> ModelResult:
+        """
+        Async variant of generate_with_tools_result.
+        """
+        if self.model:
+            started = time.perf_counter()
+            with self._span("model.generate_with_tools", prompt, tools=len(tools)) as model_span:
+                with collect_call_usage() as usage:
+                    message = await self.model.agenerate_with_tools(prompt, tools, role)
+                model_span.set_attribute("tool_calls", len(message.get("tool_calls") or []))
+                self._record(prompt, role, message, tools)
+                return self._result(prompt, role, message.get("content"), usage, started, message=message)
+        else:
+            raise ValueError("Model is not initialized")
+    
+    def generate_with_tools(self, prompt: list, tools: List[Dict[str, Any]], role: model_enums.RoleType = None) -> Dict[str, Any]:
+        """
+        Delegate the generate_with_tools method call to the underlying model.
+        """
+        return self.generate_with_tools_result(prompt, tools, role).message
+    
+    async def agenerate_with_tools(self, prompt: list, tools: List[Dict[str, Any]], role: model_enums.RoleType = None) -> Dict[str, Any]:
+        """
+        Delegate the agenerate_with_tools method call to the underlying model.
+        """
+        return (await self.agenerate_with_tools_result(prompt, tools, role)).message
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import threading
+import time
+
+from . import model_enums
+
+
+@dataclass
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per `period` seconds.
+    
+    Callers reserve capacity up front; the bucket may go negative, in which
+    case the caller is told how long to wait. Reservation happens under a
+    lock but waiting does not, so the same bucket serves threads and event
+    loops alike.
+    """
+    capacity: float
+    period: float = 60.0
+    tokens: float = field(default=None)
+    updated: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def __post_init__(self):
+        if self.tokens is None:
+            self.tokens = self.capacity
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+        self.updated = now
+    
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` from the bucket.
+        :param amount: Capacity to consume (clamped to the bucket size)
+        :return: Seconds the caller must wait before using the reservation
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * self.period / self.capacity
+    
+    def adjust(self, amount: float) -> None:
+        """
+        Correct an earlier reservation once the real cost is known.
+        :param amount: Extra capacity to consume (negative to give some back)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+@dataclass
+class RateLimiter:
+    """
+    Client-side limiter for requests per minute and tokens per minute.
+    
+    One limiter is shared by every model using the same provider and API key
+    (see RateLimiter.shared), so concurrent agents coordinate on one quota
+    and only wait when it is actually exhausted.
+    """
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    request_bucket: Optional[TokenBucket] = field(default=None, init=False)
+    token_bucket: Optional[TokenBucket] = field(default=None, init=False)
+    
+    _registry = {}
+    _registry_lock = threading.Lock()
+    
+    def __post_init__(self):
+        if self.requests_per_minute:
+            self.request_bucket = TokenBucket(capacity=self.requests_per_minute)
+        if self.tokens_per_minute:
+            self.token_bucket = TokenBucket(capacity=self.tokens_per_minute)
+    
+    @classmethod
+    def shared(cls, provider: model_enums.ProviderType, api_key: str, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> "RateLimiter":
+        """
+        Get the limiter shared by all models using this provider and API key.
+        The limits given by the first caller are kept.
+        :param provider: The model provider
+        :param api_key: The API key whose quota is being limited
+        :param requests_per_minute: Request quota, None for unlimited
+        :param tokens_per_minute: Token quota, None for unlimited
+        :return: The shared RateLimiter
+        """
+        key = (provider.value, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest())
+        with cls._registry_lock:
+            limiter = cls._registry.get(key)
+            if limiter is None:
+                limiter = cls(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+                cls._registry[key] = limiter
+            return limiter
+    
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+        return wait
+    
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        """
+        Block the calling thread until the request fits the quota.
+        :param estimated_tokens: Expected tokens for the request
+        """
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def aacquire(self, estimated_tokens: int = 0) -> None:
+        """
+        Wait on the event loop until the request fits the quota.
+        :param estimated_tokens: Expected tokens for the request
+        """
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Reconcile the token bucket with the usage reported by the provider.
+        :param estimated_tokens: Tokens reserved by acquire
+        :param actual_tokens: Tokens the provider actually counted, None if unknown
+        """
+        if self.token_bucket is not None and actual_tokens is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
@@ -0,0 +1,213 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+
+# A recorded response: plain text, or {"content": ..., "tool_calls": [{"name": ..., "arguments": ...}]}
+FixtureResponse = Union[str, Dict[str, Any]]
+
+
+def request_key(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Stable hash of a chat request, used to match it against recorded fixtures.
+    Only roles, contents and tool calls of the messages and the names of the tools count.
+    :param messages: The request messages
+    :param tools: Tool definitions sent with the request, if any
+    :return: Hex digest
+    """
+    payload = {
+        "messages": [
+            {"role": message.get("role"), "content": message.get("content"), "tool_calls": message.get("tool_calls")}
+            for message in messages
+        ],
+        "tools": sorted(tool.get("function", {}).get("name", "") for tool in tools or []),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def normalize_response(response: FixtureResponse) -> Dict[str, Any]:
+    """
+    Turn a fixture response into an assistant message dict with chat-completions style tool calls.
+    :param response: Plain text or a {"content", "tool_calls"} dict
+    :return: The assistant message
+    """
+    if isinstance(response, str):
+        return {"role": "assistant", "content": response}
+    message = {"role": "assistant", "content": response.get("content")}
+    tool_calls = []
+    for index, tool_call in enumerate(response.get("tool_calls") or []):
+        function = tool_call.get("function", tool_call)
+        arguments = function.get("arguments", function.get("parameters", {}))
+        tool_calls.append({
+            "id": tool_call.get("id", f"call_{index}"),
+            "type": "function",
+            "function": {
+                "name": function["name"],
+                "arguments": arguments if isinstance(arguments, str) else json.dumps(arguments)
+            }
+        })
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return message
+
+
+@dataclass
+class ReplayFixtures:
+    """
+    Recorded chat responses served by the local provider.
+    
+    Fixtures recorded with their request are matched by request_key; identical
+    requests recorded several times are answered in recording order. Fixtures
+    without a request form a script that answers every unmatched request in
+    order, wrapping around when `loop` is set and falling back to `default`
+    once exhausted otherwise. Safe to share between threads and models.
+    """
+    keyed: Dict[str, List[FixtureResponse]] = field(default_factory=dict)
+    script: List[FixtureResponse] = field(default_factory=list)
+    default: FixtureResponse = "<response>OK</response>"
+    loop: bool = True
+    hits: int = 0
+    misses: int = 0
+    _positions: Dict[str, int] = field(default_factory=dict, repr=False)
+    _script_position: int = field(default=0, repr=False)
+    # Requests seen by record(), so save() can write them next to their responses
+    _requests: Dict[str, Dict[str, Any]] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    @classmethod
+    def from_script(cls, responses: List[FixtureResponse], **kwargs) -> "ReplayFixtures":
+        return cls(script=list(responses), **kwargs)
+    
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "ReplayFixtures":
+        """
+        Load fixtures from a JSONL file of {"request": {"messages", "tools"}, "response": ...} records;
+        records without "request" go to the script.
+        :param path: Path of the JSONL file
+        :return: The fixtures
+        """
+        fixtures = cls(**kwargs)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                request = record.get("request")
+                if request is None:
+                    fixtures.script.append(record["response"])
+                else:
+                    key = request_key(request["messages"], request.get("tools"))
+                    fixtures.keyed.setdefault(key, []).append(record["response"])
+                    fixtures._requests.setdefault(key, request)
+        return fixtures
+    
+    def record(self, messages: List[Dict[str, Any]], response: FixtureResponse, tools: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Add a response for a request, e.g. while recording a real provider through ModelFactory(recorder=...).
+        """
+        key = request_key(messages, tools)
+        with self._lock:
+            self.keyed.setdefault(key, []).append(response)
+            self._requests.setdefault(key, {"messages": messages, "tools": tools})
+    
+    def save(self, path: str) -> None:
+        """
+        Write the fixtures as JSONL, in the format load() reads.
+        :param path: Path of the JSONL file
+        """
+        with self._lock, open(path, "w", encoding="utf-8") as f:
+            for key, responses in self.keyed.items():
+                if key not in self._requests:
+                    continue
+                for response in responses:
+                    f.write(json.dumps({"request": self._requests[key], "response": response}, ensure_ascii=False) + "\n")
+            for response in self.script:
+                f.write(json.dumps({"response": response}, ensure_ascii=False) + "\n")
+    
+    def respond(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Answer a request from the fixtures.
+        :param messages: The request messages
+        :param tools: Tool definitions sent with the request, if any
+        :return: The assistant message
+        """
+        with self._lock:
+            if self.keyed:
+                key = request_key(messages, tools)
+                responses = self.keyed.get(key)
+                if responses:
+                    position = self._positions.get(key, 0)
+                    self._positions[key] = position + 1
+                    self.hits += 1
+                    return normalize_response(responses[min(position, len(responses) - 1)])
+            self.misses += 1
+            if not self.script or (not self.loop and self._script_position >= len(self.script)):
+                return normalize_response(self.default)
+            response = self.script[self._script_position % len(self.script)]
+            self._script_position += 1
+            return normalize_response(response)
+    
+    def reset(self) -> None:
+        """
+        Rewind every fixture so a scenario can be replayed from the start.
+        """
+        with self._lock:
+            self._positions.clear()
+            self._script_position = 0
+            self.hits = 0
+            self.misses = 0
+
+
+@dataclass
+class LatencyModel:
+    """
+    Simulated response latency.
+    
+    distribution is one of "fixed" (always `mean`), "uniform" (mean ± spread),
+    "normal" (standard deviation `spread`, clipped at zero) or "lognormal"
+    (median `mean`, shape `spread`). `per_chunk` is added between streamed
+    chunks. A seed makes the sequence of delays reproducible.
+    """
+    distribution: str = "fixed"
+    mean: float = 0.0
+    spread: float = 0.0
+    per_chunk: float = 0.0
+    seed: Optional[int] = None
+    _random: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def __post_init__(self):
+        if self.distribution not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{self.distribution}'")
+        self._random = random.Random(self.seed)
+    
+    def sample(self) -> float:
+        """
+        :return: The next delay in seconds
+        """
+        if self.distribution == "fixed" or self.spread <= 0:
+            return max(self.mean, 0.0)
+        with self._lock:
+            if self.distribution == "uniform":
+                return max(self._random.uniform(self.mean - self.spread, self.mean + self.spread), 0.0)
+            if self.distribution == "normal":
+                return max(self._random.gauss(self.mean, self.spread), 0.0)
+            return self._random.lognormvariate(math.log(self.mean), self.spread) if self.mean > 0 else 0.0
+    
+    def wait(self) -> None:
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def asleep(self) -> None:
+        delay = self.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
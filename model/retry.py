@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import random
+import threading
+import time
+
+from . import model_enums
+from .errors import CircuitOpenError
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for retryable model errors.
+    A Retry-After hint from the provider takes precedence over the computed delay.
+    """
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+        :param attempt: Zero-based number of the attempt that just failed
+        :param retry_after: Wait requested by the provider, if any
+        :return: The delay in seconds
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Fails fast while a provider is down.
+    
+    After `failure_threshold` consecutive upstream failures the circuit opens
+    and calls raise CircuitOpenError immediately. Once `recovery_timeout`
+    seconds have passed a single trial call is let through; its success
+    closes the circuit and its failure opens it again. A trial that ends
+    without an upstream answer (cancelled, or failed locally) is released
+    so the next call can try again.
+    """
+    name: str = "default"
+    failure_threshold: int = 5
+    recovery_timeout: float = 30.0
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial_in_flight: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    _registry = {}
+    _registry_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, provider: model_enums.ProviderType) -> "CircuitBreaker":
+        """
+        Get the breaker shared by every model of a provider.
+        :param provider: The model provider
+        :return: The shared CircuitBreaker
+        """
+        with cls._registry_lock:
+            breaker = cls._registry.get(provider.value)
+            if breaker is None:
+                breaker = cls(name=provider.value)
+                cls._registry[provider.value] = breaker
+            return breaker
+    
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+    
+    def before_call(self) -> bool:
+        """
+        Admit a call or fail fast.
+        :return: True if the call is the half-open trial; it must end in record_success, record_failure or release_trial
+        :raises CircuitOpenError: If the circuit is open and no trial call is due
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if not self.trial_in_flight and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.trial_in_flight = True
+                return True
+            retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"Circuit for '{self.name}' is open", provider=self.name, retry_after=retry_after)
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+    
+    def release_trial(self) -> None:
+        """
+        End a trial call that says nothing about the upstream, keeping the circuit open.
+        """
+        with self._lock:
+            self.trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
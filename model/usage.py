@@ -0,0 +1,179 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+import threading
+
+from . import model_enums
+
+
+@dataclass
+class Usage:
+    """
+    Token counts, wall-clock latency and cost of one or more model calls.
+    """
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    calls: int = 0
+    cached_calls: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+    
+    def add(self, other: "Usage") -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.total_tokens += other.total_tokens
+        self.calls += other.calls
+        self.cached_calls += other.cached_calls
+        self.latency += other.latency
+        self.cost += other.cost
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Pricing:
+    """
+    Provider list price in USD per million tokens.
+    """
+    prompt_per_million: float
+    completion_per_million: float
+    
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.prompt_per_million + completion_tokens * self.completion_per_million) / 1_000_000
+
+
+# Groq on-demand prices; pass ModelFactory(pricing=...) for other rates
+PRICING: Dict[model_enums.ModelType, Pricing] = {
+    model_enums.ModelType.Llama3_3_70B_Versatile: Pricing(prompt_per_million=0.59, completion_per_million=0.79),
+}
+
+
+@dataclass
+class ModelResult:
+    """
+    A model response together with what it cost.
+    :param content: The response text
+    :param usage: Tokens and cost of this call (zero tokens when served from the response cache)
+    :param latency: Seconds spent in the call, including rate-limit waits and retries
+    :param cached: Whether the response came from the response cache
+    :param message: The assistant message, for calls made with native tool definitions
+    """
+    content: Optional[str]
+    usage: Usage
+    latency: float
+    cached: bool = False
+    message: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class UsageBudget:
+    """
+    Limits on the accumulated usage of a run; None disables a limit.
+    """
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    
+    def exceeded(self, usage: Usage) -> Optional[str]:
+        """
+        :return: "token_budget" or "cost_budget" once the usage goes over that limit, otherwise None
+        """
+        if self.max_tokens is not None and usage.total_tokens > self.max_tokens:
+            return "token_budget"
+        if self.max_cost is not None and usage.cost > self.max_cost:
+            return "cost_budget"
+        return None
+
+
+_active_meter: ContextVar[Optional["UsageMeter"]] = ContextVar("active_usage_meter", default=None)
+_call_usage: ContextVar[Optional[Usage]] = ContextVar("call_usage", default=None)
+
+
+class UsageMeter:
+    """
+    Accumulates the usage of every model call made while it is active.
+    
+    Activation is scoped with a context variable, so calls made by sub-models,
+    asyncio tasks and threads started with contextvars.copy_context() are all
+    counted. Meters nest: usage recorded in an inner meter is also added to
+    the meter that was active when it was entered.
+    
+        with UsageMeter(UsageBudget(max_tokens=20_000)) as meter:
+            ...
+            if meter.exceeded():
+                ...
+    """
+    
+    def __init__(self, budget: Optional[UsageBudget] = None):
+        self.budget = budget
+        self.usage = Usage()
+        self._parent: Optional["UsageMeter"] = None
+        self._token = None
+        self._lock = threading.Lock()
+    
+    def record(self, usage: Usage) -> None:
+        with self._lock:
+            self.usage.add(usage)
+        if self._parent is not None:
+            self._parent.record(usage)
+    
+    def exceeded(self) -> Optional[str]:
+        """
+        :return: Name of the exceeded budget, or None
+        """
+        if self.budget is None:
+            return None
+        return self.budget.exceeded(self.usage)
+    
+    @staticmethod
+    def record_current(usage: Usage) -> None:
+        """
+        Record usage in the active meter, if any.
+        """
+        meter = _active_meter.get()
+        if meter is not None:
+            meter.record(usage)
+    
+    @staticmethod
+    def active() -> bool:
+        return _active_meter.get() is not None
+    
+    def __enter__(self) -> "UsageMeter":
+        self._parent = _active_meter.get()
+        self._token = _active_meter.set(self)
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        _active_meter.reset(self._token)
+        self._token = None
+
+
+class collect_call_usage:
+    """
+    Collect the usage providers report (through report_usage) during one call.
+    
+        with collect_call_usage() as usage:
+            response = model.generate(prompt, role)
+    """
+    __slots__ = ("usage", "_token")
+    
+    def __enter__(self) -> Usage:
+        self.usage = Usage()
+        self._token = _call_usage.set(self.usage)
+        return self.usage
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        _call_usage.reset(self._token)
+
+
+def report_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int], total_tokens: Optional[int]) -> None:
+    """
+    Add a provider-reported usage block to the call being collected, if any.
+    """
+    usage = _call_usage.get()
+    if usage is None:
+        return
+    usage.prompt_tokens += prompt_tokens or 0
+    usage.completion_tokens += completion_tokens or 0
+    usage.total_tokens += total_tokens or (prompt_tokens or 0) + (completion_tokens or 0)
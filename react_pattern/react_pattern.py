@@ -1,14 +1,21 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, List, Optional, Tuple
-from model.model_enums import RoleType, ProviderType, ModelType
+from model.model_enums import RoleType, ProviderType
 from tools.tools_registry import ToolsRegistry
+from tools.tool_cache import ToolResultCache
+from tools.tool_agent import ToolAgentMixin
+from tools.tool_call_parser import build_tool_messages
 from config.env_manager import EnvManager
 from model.model_factory import ModelFactory
-import json
+from model.context_window import ContextWindow, SummarizeOlderTurns
+from model.usage import Usage, UsageMeter
+from cache import CacheBase
+from tracing import span, traced
 import re
+import uuid
 
 @dataclass
-class ReactPattern:
+class ReactPattern(ToolAgentMixin):
     user_prompt: str
     api_key: str
     user_history: List[Dict[str, str]] = field(default_factory=list)
@@ -19,34 +26,52 @@ class ReactPattern:
     env_manager: EnvManager = EnvManager()
     model: ModelFactory = None
     max_iterations: int = 5
+    max_parallel_tools: int = 4
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    tool_cache: Optional[ToolResultCache] = field(default_factory=ToolResultCache.shared)
+    response_cache: Optional[CacheBase] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    context_window: Optional[ContextWindow] = field(default_factory=ContextWindow)
+    pinned_messages: int = field(init=False, default=0)
+    stream: bool = False
+    native_tools: bool = False
+    provider: ProviderType = ProviderType.Groq
+    model_options: Dict[str, Any] = field(default_factory=dict)
+    # Stop a run once its model calls go over these totals
+    token_budget: Optional[int] = None
+    cost_budget: Optional[float] = None
+    # Usage of the latest run, and "token_budget", "cost_budget" or "iterations" if it ended early
+    last_usage: Optional[Usage] = None
+    stop_reason: Optional[str] = None
     
     def __post_init__(self):
-        list_of_tools = ToolsRegistry.list_available_tools()
-        for tool in list_of_tools:
-            tool_parameters = ToolsRegistry.get_tool_class(tool).get_tool_parameters()
-            self.available_tools[tool] = tool_parameters
-        self.model = ModelFactory(
-            api_key=self.api_key,
-            provider=ProviderType.Groq,
-            model_name=ModelType.Llama3_3_70B_Versatile,
-            verbose=self.verbose
-        )
+        self.init_agent(self.api_key)
+        self.available_tools.update(ToolsRegistry.get_tools_parameters())
         self.conversation_history = self.construct_prompt()
+        # The system prompt, earlier turns and the question are never trimmed
+        self.pinned_messages = len(self.conversation_history)
+        if self.context_window is not None and any(isinstance(strategy, SummarizeOlderTurns) and strategy.model is None for strategy in self.context_window.strategies):
+            # Summarize with this pattern's model on a copy, so a window shared across patterns is left as given
+            self.context_window = replace(self.context_window, strategies=[
+                replace(strategy, model=self.model) if isinstance(strategy, SummarizeOlderTurns) and strategy.model is None else strategy
+                for strategy in self.context_window.strategies
+            ])
     
-    def construct_prompt(self):
-        system_prompt = {
-            "role": RoleType.System.value,
-            "content": """You are a helpful assistant that can use tools to answer user queries. You operate by running a loop with the following steps: Thought, Act, Observation. 
+    @staticmethod
+    def render_system_prompt() -> str:
+        """
+        Render the ReAct system prompt with the tool definitions and usage instructions
+        
+        Returns:
+            The system prompt text
+        """
+        content = """You are a helpful assistant that can use tools to answer user queries. You operate by running a loop with the following steps: Thought, Act, Observation. 
 You have access to the following tools:
 
 """
-        }
-        for tool_name, tool_params in self.available_tools.items():
-            system_prompt["content"] += f"Tool: {tool_name}\n"
-            system_prompt["content"] += f"Description: {tool_params.get('description', 'No description provided')}\n"
-            system_prompt["content"] += f"Parameters: {json.dumps(tool_params.get('parameters', {}), indent=2)}\n\n"
-        
-        system_prompt["content"] += """
+        content += ToolsRegistry.render_tool_descriptions()
+        content += """
         
 Pay special attention to the type of the parameters.
 To use a tool, respond with:
@@ -80,9 +105,38 @@ You then output:
 
 
 
-If you need to use multiple tools, use them one at a time. Wait for the result of one tool before using another.
+If you need several independent tool calls (for example the weather in several cities), send them together as a JSON list in one response:
+```json
+[
+  {"tool": "ToolName", "parameters": {"param1": "value1"}},
+  {"tool": "ToolName", "parameters": {"param1": "value2"}}
+]
+```
+All results will be returned to you in a single message. If a tool call depends on the result of another, use them one at a time and wait for the result before continuing.
 If you can answer the user's query without using tools, just respond normally.
 """
+        return content
+    
+    @staticmethod
+    def render_native_system_prompt() -> str:
+        """
+        Render the ReAct system prompt used with native function calling, where
+        tool definitions travel in the request's tools parameter instead of the prompt
+        
+        Returns:
+            The system prompt text
+        """
+        return """You are a helpful assistant that can use tools to answer user queries. You operate by running a loop with the following steps: Thought, Act, Observation.
+Write your reasoning inside <thought></thought> tags, then call the provided tools to act. Independent tool calls can be made together in one turn.
+You will get the tool results back. Observe them and think about what to do next.
+When you can answer the question, output the answer inside <response></response> tags.
+"""
+    
+    def construct_prompt(self):
+        system_prompt = {
+            "role": RoleType.System.value,
+            "content": self.render_native_system_prompt() if self.uses_native_tools() else self.get_system_prompt()
+        }
         conversation = [system_prompt]
         
         for i in range(len(self.user_history)):
@@ -96,129 +150,161 @@ If you can answer the user's query without using tools, just respond normally.
 
     def parse_tags(self, response: str, tag: str) -> Optional[str]:
         """
-        Parse the response to extract tags
+        Parse the response to extract the content of a tag; an unclosed tag runs to the end of the response
         
         Args:
             response: The response from the model
+            tag: The tag name, e.g. "response"
             
         Returns:
-            The parsed tag or None if not found
+            The content of the first such tag or None if not found
         """
-        tag_pattern = fr'<({tag})>'
-        tag_matches = re.findall(tag_pattern, response)
+        tag_pattern = fr'<{tag}>(.*?)(?:</{tag}>|$)'
+        tag_matches = re.findall(tag_pattern, response, re.DOTALL)
         
         if tag_matches:
             return tag_matches[0]
         
         return None
     
-    def parse_tool_call(self, response: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    def record_tool_turn(self, response: str, tool_results: List[str], message: Optional[Dict[str, Any]] = None) -> None:
         """
-        Parse the response to extract tool calls
+        Append a model response and the observations of the tools it called to the conversation
         
         Args:
             response: The response from the model
-            
-        Returns:
-            A tuple of (tool_name, parameters) or (None, None) if no tool call found
+            tool_results: The results of the tool calls made in the response
+            message: The assistant message as returned by the model, when it carries native tool calls
         """
-        json_pattern = r'```json\n(.*?)\n```'
-        json_matches = re.findall(json_pattern, response, re.DOTALL)
+        if message is not None and message.get("tool_calls"):
+            self.conversation_history.append(message)
+            self.conversation_history.extend(build_tool_messages(message, tool_results))
+            return
         
-        if not json_matches:
-            json_pattern = r'```\n(.*?)\n```'
-            json_matches = re.findall(json_pattern, response, re.DOTALL)
-            
-        if not json_matches:
-            json_pattern = r'{[\s\S]*?"tool"[\s\S]*?}'
-            json_matches = re.findall(json_pattern, response, re.DOTALL)
-        
-        for json_str in json_matches:
-            try:
-                tool_call = json.loads(json_str)
-                if "tool" in tool_call and "parameters" in tool_call:
-                    return tool_call["tool"], tool_call["parameters"]
-            except json.JSONDecodeError:
-                continue
-        
-        return None, None
+        self.conversation_history.append({
+            "role": RoleType.Assistant.value,
+            "content": response
+        })
+        
+        tool_result = "\n\n".join(tool_results)
+        observation = f"<observation>{tool_result}</observation>"
+        self.conversation_history.append({
+            "role": RoleType.User.value,
+            "content": observation
+        })
     
-    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+    def fit_context(self) -> List[Dict[str, str]]:
         """
-        Execute a tool with the given parameters
+        Trim the conversation history to the context window's token budget
         
-        Args:
-            tool_name: The name of the tool to execute
-            parameters: The parameters for the tool
-            
         Returns:
-            The result of the tool execution as a string
+            The conversation history to send to the model
+        """
+        if self.context_window is not None:
+            self.conversation_history = self.context_window.fit(self.conversation_history, self.pinned_messages)
+        return self.conversation_history
+    
+    async def afit_context(self) -> List[Dict[str, str]]:
         """
-        if tool_name not in ToolsRegistry.list_available_tools():
-            return f"Error: Tool '{tool_name}' not found"
+        Trim the conversation history to the context window's token budget without blocking the event loop
         
-        try:
-            tool_instance = ToolsRegistry.create_tool(tool_name)
-            result = tool_instance.run(**parameters)
-            return f"Tool: {tool_name}\nResult: {result}"
-        except Exception as e:
-            return f"Error executing tool '{tool_name}': {str(e)}"
+        Returns:
+            The conversation history to send to the model
+        """
+        if self.context_window is not None:
+            self.conversation_history = await self.context_window.afit(self.conversation_history, self.pinned_messages)
+        return self.conversation_history
     
+    def observe_response(self, iteration_span, iteration: int, response: str, tool_calls: List[Tuple[str, Dict[str, Any]]], final_response: str) -> str:
+        """
+        Trace and log a model response and pick up any answer it gives
+        
+        Returns:
+            The answer inside <response> tags, or final_response when there is none
+        """
+        super().observe_response(iteration_span, iteration, response, tool_calls)
+        if "<response>" in response:
+            parsed_response = self.parse_tags(response, "response")
+            final_response = parsed_response.strip() if parsed_response else ""
+        return final_response
+    
+    def request_final_answer(self) -> None:
+        """
+        Ask for the final answer once every iteration or the budget was spent on tool calls
+        """
+        self.stop_reason = self.stop_reason or "iterations"
+        self.conversation_history.append({
+            "role": RoleType.User.value, 
+            "content": "You've used up all your tool calls. Please provide your final answer based on the information collected."
+        })
+    
+    def parse_final_answer(self, response: str) -> str:
+        parsed_response = self.parse_tags(response, "response")
+        if parsed_response:
+            return parsed_response.strip()
+        return response
+    
+    def finish_run(self, meter: UsageMeter, iterations: int, final_response: str) -> str:
+        self.agent_history.append({"content": final_response})
+        return super().finish_run(meter, iterations, final_response)
+    
+    @traced("ReactPattern.run", lambda self: {"session_id": self.session_id})
     def run(self):
+        """
+        Run the ReAct loop
         
-        iteration = 0
-        final_response = ""
-        while(iteration < self.max_iterations):
-            response = self.model.generate(self.conversation_history, RoleType.Assistant)
-            if self.verbose:
-                print(f"\nIteration {iteration + 1} response:\n{response}")
-            
-
-            if "<response>" in response:
-                parsed_response = self.parse_tags(response, "response")
-                final_response = parsed_response.strip() if parsed_response else ""
-            
-            
-            tool_name, parameters = self.parse_tool_call(response)
-            
-            if tool_name:
-                tool_result = self.execute_tool(tool_name, parameters)
-                
-                self.conversation_history.append({
-                    "role": RoleType.Assistant.value,
-                    "content": response
-                })
-                
-                observation = f"<observation>{tool_result}</observation>"
-                self.conversation_history.append({
-                    "role": RoleType.User.value,
-                    "content": observation
-                })
-                
-                iteration += 1
-            else:
-                # No tool call found, treat as final response
-                final_response = response
-                break
-        
-        if not final_response and iteration == self.max_iterations:
-            self.conversation_history.append({
-                "role": RoleType.User.value, 
-                "content": "You've used up all your tool calls. Please provide your final answer based on the information collected."
-            })
-            
-            response = self.model.generate(self.conversation_history, RoleType.Assistant)
+        Returns:
+            The final response from the assistant; usage is in last_usage
+        """
+        with self.start_usage_meter() as meter:
+            iteration = 0
+            final_response = ""
+            while iteration < self.max_iterations:
+                if self.over_budget(meter):
+                    # Over budget: stop calling tools and ask for the final answer
+                    break
+                with span("iteration", index=iteration) as iteration_span:
+                    response, tool_calls, message = self.generate_response(self.fit_context())
+                    final_response = self.observe_response(iteration_span, iteration, response, tool_calls, final_response)
+                    if not tool_calls:
+                        # No tool call found, treat as final response
+                        final_response = response
+                        break
+                    self.record_tool_turn(response, self.execute_tools(tool_calls), message)
+                    iteration += 1
             
-            response_matches = self.parse_tags(response, "response")
-            if response_matches:
-                final_response = response_matches[0].strip()
-            else:
-                final_response = response
-        
-        self.agent_history.append({"content": final_response})
+            if self.needs_final_answer(final_response, iteration, self.max_iterations):
+                self.request_final_answer()
+                final_response = self.parse_final_answer(self.generate_final_answer(self.fit_context()))
+            return self.finish_run(meter, iteration, final_response)
+    
+    @traced("ReactPattern.arun", lambda self: {"session_id": self.session_id})
+    async def arun(self):
+        """
+        Run the ReAct loop on the event loop.
+        Model calls are awaited and tools run in a worker thread, so many
+        agents can share a single loop. Apart from the awaited calls this
+        is the same loop as run.
         
-        return final_response
-
-
-
-
+        Returns:
+            The final response from the assistant; usage is in last_usage
+        """
+        with self.start_usage_meter() as meter:
+            iteration = 0
+            final_response = ""
+            while iteration < self.max_iterations:
+                if self.over_budget(meter):
+                    break
+                with span("iteration", index=iteration) as iteration_span:
+                    response, tool_calls, message = await self.agenerate_response(await self.afit_context())
+                    final_response = self.observe_response(iteration_span, iteration, response, tool_calls, final_response)
+                    if not tool_calls:
+                        final_response = response
+                        break
+                    self.record_tool_turn(response, await self.aexecute_tools(tool_calls), message)
+                    iteration += 1
+            
+            if self.needs_final_answer(final_response, iteration, self.max_iterations):
+                self.request_final_answer()
+                final_response = self.parse_final_answer(await self.agenerate_final_answer(await self.afit_context()))
+            return self.finish_run(meter, iteration, final_response)
@@ -1,4 +1,6 @@
-from .reflection_pattern import ReflectionPattern
+from .reflection_pattern import ReflectionPattern, Candidate
+from .stopping import StoppingCriterion, ReflectionState, DoneCritique, OutputSimilarity, TokenBudget, LatencyBudget, is_done
 
 
-__all__ = ["ReflectionPattern"]
\ No newline at end of file
+__all__ = ["ReflectionPattern", "Candidate", "StoppingCriterion", "ReflectionState", "DoneCritique", "OutputSimilarity",
+           "TokenBudget", "LatencyBudget", "is_done"]
\ No newline at end of file
@@ -1,15 +1,21 @@
 from colorama import Fore, Back, Style
+from typing import Any, Dict, Optional
 from model import ModelFactory, RoleType, ProviderType, ModelType
+from cache import CacheBase
 
 class Generation:
-    def __init__(self, prompt: str, provider: ProviderType = ProviderType.Groq, model_name: ModelType = ModelType.Llama3_3_70B_Versatile, api_key: str = None, verbose: bool = False):
+    def __init__(self, prompt: str, provider: ProviderType = ProviderType.Groq, model_name: ModelType = ModelType.Llama3_3_70B_Versatile, api_key: str = None, verbose: bool = False, response_cache: Optional[CacheBase] = None, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None, model_options: Optional[Dict[str, Any]] = None):
         self.prompt = prompt
         self.role = RoleType.System
         self.model = ModelFactory(
             api_key=api_key,
             provider=provider, 
             model_name=model_name, 
-            verbose=verbose
+            verbose=verbose,
+            response_cache=response_cache,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            model_options=model_options or {}
         )
         self.generate_history = []
         self.generate_history.append({"role": self.role.value, "content": prompt})
@@ -35,6 +41,20 @@ class Generation:
         self.generate_history.append({"role": "assistant", "content": output})
         return output
     
+    async def agenerate(self, prompt: str = None):
+        current_prompt = prompt if prompt is not None else self.prompt
+        
+        if prompt is not None:
+            self.generate_history.append({"role": self.role.value, "content": current_prompt})
+        
+        output = await self.model.agenerate(current_prompt, self.role)
+        
+        if self.verbose:
+            self.print_generation_log(output)
+            
+        self.generate_history.append({"role": "assistant", "content": output})
+        return output
+    
     def get_generation_history(self):
         return self.generate_history
 
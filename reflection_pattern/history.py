@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from difflib import unified_diff
+from typing import Dict, List, Optional, Tuple
+
+
+def summarize_change(previous: str, current: str, max_chars: int = 2000) -> str:
+    """
+    Describe how one version of an artifact became the next as a unified diff.
+    :param previous: The earlier version
+    :param current: The later version
+    :param max_chars: Diffs longer than this are cut and marked as truncated
+    :return: The diff text, or a short note when nothing changed
+    """
+    diff = "\n".join(unified_diff(previous.splitlines(), current.splitlines(), lineterm="", n=1))
+    if not diff:
+        return "(no changes)"
+    if len(diff) > max_chars:
+        cut = diff.rfind("\n", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        remaining = diff.count("\n", cut)
+        diff = diff[:cut] + f"\n... ({remaining} more diff lines omitted)"
+    return diff
+
+
+@dataclass
+class CompactHistory:
+    """
+    A critique conversation that keeps only the latest artifact in full.
+    
+    Each earlier version is stored as the diff that turned it into the next one,
+    next to the critique that prompted the change. Only the last `window` of
+    those revisions are sent to the model, so the prompt stays roughly constant
+    in size instead of growing with every round.
+    """
+    system_message: Dict[str, str]
+    window: int = 2
+    max_diff_chars: int = 2000
+    latest: Optional[str] = None
+    # (critique, diff applied in response) for every earlier version, oldest first
+    revisions: List[Tuple[str, str]] = field(default_factory=list)
+    pending_critique: Optional[str] = None
+    
+    def add_version(self, output: str) -> None:
+        if self.latest is not None:
+            self.revisions.append((self.pending_critique or "", summarize_change(self.latest, output, self.max_diff_chars)))
+        self.latest = output
+        self.pending_critique = None
+    
+    def add_critique(self, critique: str) -> None:
+        self.pending_critique = critique
+    
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        Build the prompt: system message, the windowed revisions, then the latest version in full.
+        """
+        messages = [self.system_message]
+        shown = self.revisions[-self.window:] if self.window > 0 else []
+        omitted = len(self.revisions) - len(shown)
+        if shown:
+            note = "Earlier versions are shown as the diffs made in response to your critiques; the current version follows in full."
+            if omitted:
+                note += f" {omitted} older revision(s) omitted."
+            messages.append({"role": "user", "content": note})
+        for index, (critique, diff) in enumerate(shown):
+            messages.append({"role": "assistant", "content": critique})
+            content = f"Changes made in response:\n```diff\n{diff}\n```"
+            if index == len(shown) - 1:
+                content += f"\n\nCurrent version:\n{self.latest}"
+            messages.append({"role": "user", "content": content})
+        if not shown:
+            messages.append({"role": "user", "content": self.latest or ""})
+        return messages
@@ -1,9 +1,16 @@
 from colorama import Fore, Back, Style
+from typing import Any, Dict, Optional, Tuple
 from model import ModelFactory, RoleType, ProviderType, ModelType
+from cache import CacheBase
+from .history import CompactHistory
+import re
 
 
 class Reflection:
-    def __init__(self, provider: ProviderType, model_name: str, critique_prompt: str, api_key:str, verbose:bool = False):
+    SCORE_INSTRUCTION = "\n\nStart your reply with a line of the form 'Score: N/10' rating the current answer, then give your critique."
+    SCORE_PATTERN = re.compile(r"^\s*\**score\**\s*[:=]\s*\**\s*(\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?[^\n]*\n?", re.IGNORECASE)
+    
+    def __init__(self, provider: ProviderType, model_name: str, critique_prompt: str, api_key:str, verbose:bool = False, response_cache: Optional[CacheBase] = None, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None, model_options: Optional[Dict[str, Any]] = None, scored: bool = False, history_mode: str = "full", history_window: int = 2):
         self.system_role = RoleType.System
         self.user_role = RoleType.User
         self.assistant_role = RoleType.Assistant
@@ -12,27 +19,81 @@ class Reflection:
             api_key=api_key,
             provider= provider ,
             model_name=model_name, 
-            verbose=verbose
+            verbose=verbose,
+            response_cache=response_cache,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            model_options=model_options or {}
         )
         self.verbose = verbose
         self.reflection_history = [{
             "role":self.system_role.value,
-            "content": critique_prompt+ "\n\nIf you see that all the issues are fixed, please reply with 'Done' only."
+            "content": critique_prompt+ (self.SCORE_INSTRUCTION if scored else "") + "\n\nIf you see that all the issues are fixed, please reply with 'Done' only."
         }]
+        self.scored = scored
+        if history_mode not in ("full", "compact"):
+            raise ValueError(f"Unknown history mode '{history_mode}', expected 'full' or 'compact'")
+        # In compact mode reflection_history is still the full log, but the model
+        # only sees the latest output in full and earlier ones as diffs
+        self.compact_history = CompactHistory(self.reflection_history[0], window=history_window) if history_mode == "compact" else None
     
     def print_reflection_logs(self, data: str):
         print(Fore.RED + data + Style.RESET_ALL)
     
+    def build_prompt(self, last_generated_info: str):
+        """
+        Messages to send for critiquing the given output.
+        
+        :param last_generated_info: The output to critique, already appended to reflection_history
+        :return: The whole history, or its compact form in compact mode
+        """
+        if self.compact_history is None:
+            return self.reflection_history
+        self.compact_history.add_version(last_generated_info)
+        return self.compact_history.messages()
+    
     def reflect(self, last_generated_info: str):
         self.reflection_history.append({"role": self.user_role.value, "content": last_generated_info})
         critique = self.model.generate(
-            prompt=self.reflection_history,
+            prompt=self.build_prompt(last_generated_info),
             role=self.user_role
         )
         if self.verbose:
             self.print_reflection_logs(critique)
         self.reflection_history.append({"role": self.assistant_role.value, "content": critique})
+        if self.compact_history is not None:
+            self.compact_history.add_critique(critique)
         return critique
     
+    async def areflect(self, last_generated_info: str):
+        self.reflection_history.append({"role": self.user_role.value, "content": last_generated_info})
+        critique = await self.model.agenerate(
+            prompt=self.build_prompt(last_generated_info),
+            role=self.user_role
+        )
+        if self.verbose:
+            self.print_reflection_logs(critique)
+        self.reflection_history.append({"role": self.assistant_role.value, "content": critique})
+        if self.compact_history is not None:
+            self.compact_history.add_critique(critique)
+        return critique
+    
+    @classmethod
+    def parse_score(cls, critique: str) -> Tuple[Optional[float], str]:
+        """
+        Split a scored critique into its score and the remaining critique text.
+        
+        :param critique: Critique produced with scored=True
+        :return: Tuple of (score normalised to 0..1 or None if missing, critique without the score line)
+        """
+        if not critique:
+            return None, critique
+        match = cls.SCORE_PATTERN.match(critique)
+        if not match:
+            return None, critique
+        scale = float(match.group(2)) if match.group(2) else 10.0
+        score = float(match.group(1)) / scale if scale else None
+        return score, critique[match.end():].strip()
+    
     def return_reflect_history(self):
         return self.reflection_history
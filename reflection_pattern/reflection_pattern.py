@@ -1,40 +1,329 @@
 from . import generation
 from . import reflection
-from time import sleep
-from model import ProviderType, ModelType
+from .stopping import StoppingCriterion, ReflectionState, DoneCritique, first_fired, is_done
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from model import ProviderType, ModelType, Usage, UsageBudget, UsageMeter
+from cache import CacheBase
+from tracing import span, current_span, traced
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+
+
+@dataclass
+class Candidate:
+    """
+    One independent generation/critique chain explored by best-of-N.
+    Its state is checked against the stopping criteria like a serial run.
+    """
+    gen: generation.Generation
+    reflect: reflection.Reflection
+    output: Optional[str] = None
+    critique: Optional[str] = None
+    score: Optional[float] = None
+    state: ReflectionState = field(default_factory=ReflectionState)
+    
+    @property
+    def done(self) -> bool:
+        return is_done(self.critique)
 
 
 class ReflectionPattern:
-    def __init__(self, provider: ProviderType, model_name: ModelType, generation_prompt: str, reflection_prompt: str, api_key: str, iterations: int = 3, verbose: bool = False):
+    def __init__(self, provider: ProviderType, model_name: ModelType, generation_prompt: str, reflection_prompt: str, api_key: str, iterations: int = 3, verbose: bool = False, response_cache: Optional[CacheBase] = None, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None, candidates: int = 1, top_k: int = 1, stopping_criteria: Optional[List[StoppingCriterion]] = None, history_mode: str = "full", history_window: int = 2, model_options: Optional[Dict[str, Any]] = None, token_budget: Optional[int] = None, cost_budget: Optional[float] = None):
         self.generation_prompt = generation_prompt
         self.reflection_prompt = reflection_prompt
+        # Cap on the generation history length (prompt, outputs and revision requests),
+        # applied to the single chain or to every best-of-N candidate alike
         self.iterations = iterations
         self.verbose = verbose
+        self.provider = provider
+        self.model_name = model_name
+        self.api_key = api_key
+        self.response_cache = response_cache
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_options = model_options
+        # candidates > 1 switches run/arun to best-of-N
+        self.candidates = candidates
+        self.top_k = top_k
+        self.last_candidates: List[Candidate] = []
+        # Checked in order after every generation and critique, on top of `iterations`
+        self.stopping_criteria = stopping_criteria if stopping_criteria is not None else [DoneCritique()]
+        self.stop_reason: Optional[str] = None
+        # "compact" resends only the latest output in full to the critic
+        self.history_mode = history_mode
+        self.history_window = history_window
+        self.last_state: Optional[ReflectionState] = None
+        # Stop once the run's model calls, across all sub-models, go over these totals
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.last_usage: Optional[Usage] = None
+        self._meter: Optional[UsageMeter] = None
         self.gen = generation.Generation(
             prompt=generation_prompt, 
             model_name=model_name, 
             api_key=api_key, 
             verbose=verbose,
-            provider=provider
+            provider=provider,
+            response_cache=response_cache,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            model_options=model_options
         )
         self.reflect = reflection.Reflection(
             model_name=model_name, 
             critique_prompt=reflection_prompt, 
             api_key=api_key, 
             verbose=verbose,
-            provider=provider
+            provider=provider,
+            response_cache=response_cache,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            model_options=model_options,
+            history_mode=history_mode,
+            history_window=history_window
         )
-
+    
+    def new_candidate(self) -> Candidate:
+        """
+        Build an independent Generation/Reflection pair with its own histories.
+        Candidate generations bypass the response cache, otherwise every
+        candidate would replay the same cached first answer.
+        """
+        return Candidate(
+            gen=generation.Generation(
+                prompt=self.generation_prompt,
+                model_name=self.model_name,
+                api_key=self.api_key,
+                verbose=self.verbose,
+                provider=self.provider,
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute,
+                model_options=self.model_options
+            ),
+            reflect=reflection.Reflection(
+                model_name=self.model_name,
+                critique_prompt=self.reflection_prompt,
+                api_key=self.api_key,
+                verbose=self.verbose,
+                provider=self.provider,
+                response_cache=self.response_cache,
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute,
+                model_options=self.model_options,
+                scored=True,
+                history_mode=self.history_mode,
+                history_window=self.history_window
+            )
+        )
+    
+    @staticmethod
+    def record_critique(candidate: Candidate, critique: str) -> None:
+        candidate.score, candidate.critique = reflection.Reflection.parse_score(critique)
+        candidate.state.record_critique(candidate.critique)
+    
+    def select(self, candidates: List[Candidate]) -> List[Candidate]:
+        """
+        Keep the top_k candidates by critique score; unscored critiques rank last.
+        """
+        ranked = sorted(candidates, key=lambda c: c.score if c.score is not None else -1.0, reverse=True)
+        return ranked[:max(1, self.top_k)]
+    
+    def best(self, candidates: List[Candidate]) -> Candidate:
+        done = [c for c in candidates if c.done]
+        return self.select(done or candidates)[0]
+    
+    def start_usage_meter(self) -> UsageMeter:
+        """
+        Create the meter for one run; it counts the generation, critique and candidate models alike.
+        :return: The meter, whose running totals are also exposed as last_usage
+        """
+        self._meter = UsageMeter(UsageBudget(max_tokens=self.token_budget, max_cost=self.cost_budget))
+        self.last_usage = self._meter.usage
+        return self._meter
+    
+    def over_budget(self) -> Optional[str]:
+        """
+        :return: "token_budget" or "cost_budget" once the current run exceeds it, otherwise None
+        """
+        return self._meter.exceeded() if self._meter is not None else None
+    
+    def check_stop(self, state: ReflectionState, gen: Optional[generation.Generation] = None) -> Optional[str]:
+        """
+        :param state: Progress of the current run
+        :param gen: Generation whose history counts towards `iterations`, defaults to self.gen
+        :return: Name of the criterion that ends the run, or None to continue
+        """
+        gen = gen or self.gen
+        reason = first_fired(self.stopping_criteria, state) or self.over_budget()
+        if reason is None and len(gen.get_generation_history()) >= self.iterations:
+            reason = "iterations"
+        return reason
+    
+    def observe_output(self, state: ReflectionState, output: str) -> Optional[str]:
+        """
+        :return: The reason to stop after this generation, or None to critique it
+        """
+        state.record_output(output)
+        return self.check_stop(state)
+    
+    def observe_critique(self, state: ReflectionState, critique: str) -> Optional[str]:
+        """
+        :return: The reason to stop after this critique (e.g. it is "Done"), or None to revise
+        """
+        state.record_critique(critique)
+        return self.check_stop(state)
+    
+    def log_iteration(self) -> None:
+        if self.verbose:
+            print("Iteration: ", len(self.gen.get_generation_history()))
+    
+    def finish_run(self, reason: Optional[str], output: str) -> str:
+        self.stop_reason = reason
+        current_span().set_attribute("stop_reason", reason)
+        if self.verbose:
+            print(f"Stopped by: {reason}")
+        return output
+    
+    @traced("ReflectionPattern.run", lambda self: {"candidates": self.candidates})
     def run(self):
-        critique = None
-        output = self.gen.generate()
-        sleep(1)
-        while len(self.gen.get_generation_history()) < self.iterations and critique != "Done":
-            if self.verbose:
-                print("Iteration: ", len(self.gen.get_generation_history()))
-            critique = self.reflect.reflect(output)
-            sleep(1)
-            output = self.gen.generate(prompt=critique)
-            sleep(1)
+        with self.start_usage_meter():
+            if self.candidates > 1:
+                return self.run_best_of_n()
+            # Pacing is left to the shared rate limiter (requests_per_minute /
+            # tokens_per_minute), which only waits when the quota requires it
+            state = self.last_state = ReflectionState()
+            output = self.gen.generate()
+            reason = self.observe_output(state, output)
+            while reason is None:
+                self.log_iteration()
+                with span("iteration", index=len(state.critiques)):
+                    critique = self.reflect.reflect(output)
+                    # A "Done" critique ends the run before asking for another revision
+                    reason = self.observe_critique(state, critique)
+                    if reason is not None:
+                        break
+                    output = self.gen.generate(prompt=critique)
+                    reason = self.observe_output(state, output)
+            return self.finish_run(reason, output)
+    
+    @traced("ReflectionPattern.arun", lambda self: {"candidates": self.candidates})
+    async def arun(self):
+        # Same loop as run, with the model calls awaited
+        with self.start_usage_meter():
+            if self.candidates > 1:
+                return await self.arun_best_of_n()
+            state = self.last_state = ReflectionState()
+            output = await self.gen.agenerate()
+            reason = self.observe_output(state, output)
+            while reason is None:
+                self.log_iteration()
+                with span("iteration", index=len(state.critiques)):
+                    critique = await self.reflect.areflect(output)
+                    reason = self.observe_critique(state, critique)
+                    if reason is not None:
+                        break
+                    output = await self.gen.agenerate(prompt=critique)
+                    reason = self.observe_output(state, output)
+            return self.finish_run(reason, output)
+    
+    @staticmethod
+    def _map(executor: ThreadPoolExecutor, function, candidates: List[Candidate]):
+        # Each call runs in a copy of this context so its spans nest under the current round
+        contexts = [contextvars.copy_context() for _ in candidates]
+        return executor.map(lambda context, candidate: context.run(function, candidate), contexts, candidates)
+    
+    def check_candidates(self, candidates: List[Candidate]) -> Optional[str]:
+        """
+        :param candidates: The live candidates
+        :return: The reason the first candidate to meet a stopping criterion ends the run, or None to continue
+        """
+        for candidate in candidates:
+            reason = self.check_stop(candidate.state, candidate.gen)
+            if reason is not None:
+                return reason
+        return None
+    
+    def record_outputs(self, candidates: List[Candidate], outputs) -> Optional[str]:
+        """
+        Record the candidates' new outputs.
+        :return: The reason to stop after these generations, or None to critique them
+        """
+        for candidate, output in zip(candidates, outputs):
+            candidate.output = output
+            candidate.state.record_output(output)
+        return self.check_candidates(candidates)
+    
+    def start_round(self, round_number: int, alive: List[Candidate]) -> None:
+        if self.verbose:
+            print(f"Round {round_number + 1}: critiquing {len(alive)} candidate(s)")
+    
+    def finish_round(self, alive: List[Candidate], critiques) -> Optional[str]:
+        """
+        Record a round's critiques and decide whether the run ends.
+        :param alive: The candidates critiqued this round
+        :param critiques: Their critiques, in the same order
+        :return: The reason to stop after these critiques (e.g. one is "Done"), or None to revise
+        """
+        for candidate, critique in zip(alive, critiques):
+            self.record_critique(candidate, critique)
+        return self.check_candidates(alive)
+    
+    def finish_best_of_n(self, reason: Optional[str], alive: List[Candidate]) -> str:
+        winner = self.best(alive)
+        self.last_state = winner.state
+        return self.finish_run(reason, winner.output)
+    
+    def run_best_of_n(self, n: Optional[int] = None) -> str:
+        """
+        Explore n generation/critique chains concurrently on a thread pool.
+        
+        Every round all live candidates are critiqued in parallel with a scoring
+        critique, and only the top_k candidates by score are revised, again in
+        parallel. Each candidate is checked against the stopping criteria, the
+        budgets and `iterations` exactly like a serial run, and the run stops
+        as soon as any candidate meets one of them.
+        
+        :param n: Number of candidates, defaults to self.candidates
+        :return: The output of the best candidate
+        """
+        n = n or self.candidates
+        alive = [self.new_candidate() for _ in range(n)]
+        self.last_candidates = alive
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            reason = self.record_outputs(alive, self._map(executor, lambda c: c.gen.generate(), alive))
+            round_number = 0
+            while reason is None:
+                with span("iteration", index=round_number, candidates=len(alive)):
+                    self.start_round(round_number, alive)
+                    reason = self.finish_round(alive, self._map(executor, lambda c: c.reflect.reflect(c.output), alive))
+                    if reason is not None:
+                        break
+                    alive = self.select(alive)
+                    reason = self.record_outputs(alive, self._map(executor, lambda c: c.gen.generate(prompt=c.critique), alive))
+                round_number += 1
+        return self.finish_best_of_n(reason, alive)
+    
+    async def arun_best_of_n(self, n: Optional[int] = None) -> str:
+        """
+        Async variant of run_best_of_n; candidates run as concurrent tasks.
         
-        return output
\ No newline at end of file
+        :param n: Number of candidates, defaults to self.candidates
+        :return: The output of the best candidate
+        """
+        n = n or self.candidates
+        alive = [self.new_candidate() for _ in range(n)]
+        self.last_candidates = alive
+        reason = self.record_outputs(alive, await asyncio.gather(*(c.gen.agenerate() for c in alive)))
+        round_number = 0
+        while reason is None:
+            with span("iteration", index=round_number, candidates=len(alive)):
+                self.start_round(round_number, alive)
+                reason = self.finish_round(alive, await asyncio.gather(*(c.reflect.areflect(c.output) for c in alive)))
+                if reason is not None:
+                    break
+                alive = self.select(alive)
+                reason = self.record_outputs(alive, await asyncio.gather(*(c.gen.agenerate(prompt=c.critique) for c in alive)))
+            round_number += 1
+        return self.finish_best_of_n(reason, alive)
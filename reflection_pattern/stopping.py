@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import List, Optional
+from model.context_window import estimate_tokens
+import re
+import time
+
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def is_done(critique: Optional[str]) -> bool:
+    """
+    Whether a critique signals that nothing is left to fix.
+    Case, punctuation and markdown are ignored, so "Done.", "**DONE**" and "done!" all count.
+    :param critique: The critique text
+    :return: True if the critique is a bare "Done"
+    """
+    if not critique:
+        return False
+    return _NON_WORD.sub("", critique).lower() == "done"
+
+
+@dataclass
+class ReflectionState:
+    """
+    Progress of one reflection run, as seen by the stopping criteria.
+    """
+    outputs: List[str] = field(default_factory=list)
+    critiques: List[str] = field(default_factory=list)
+    estimated_tokens: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    
+    def record_output(self, output: Optional[str]) -> None:
+        self.outputs.append(output or "")
+        self.estimated_tokens += estimate_tokens(output or "")
+    
+    def record_critique(self, critique: Optional[str]) -> None:
+        self.critiques.append(critique or "")
+        self.estimated_tokens += estimate_tokens(critique or "")
+    
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+    
+    @property
+    def last_critique(self) -> Optional[str]:
+        return self.critiques[-1] if self.critiques else None
+
+
+class StoppingCriterion(ABC):
+    """
+    A condition that ends the reflection loop early.
+    The loop checks every criterion after each generation and each critique
+    and reports the name of the first one that fires.
+    """
+    name: str = "criterion"
+    
+    @abstractmethod
+    def should_stop(self, state: ReflectionState) -> bool:
+        """
+        :param state: Progress of the current run
+        :return: True to stop the loop
+        """
+        pass
+
+
+class DoneCritique(StoppingCriterion):
+    """
+    Stop when the latest critique is "Done", ignoring case, punctuation and markdown.
+    """
+    name = "done"
+    
+    def should_stop(self, state: ReflectionState) -> bool:
+        return len(state.critiques) > 0 and len(state.critiques) == len(state.outputs) and is_done(state.last_critique)
+
+
+class OutputSimilarity(StoppingCriterion):
+    """
+    Stop when two consecutive outputs are nearly identical, i.e. the model only makes trivial edits.
+    :param threshold: difflib similarity ratio (0..1) at or above which outputs count as converged
+    """
+    name = "similarity"
+    
+    def __init__(self, threshold: float = 0.95):
+        self.threshold = threshold
+    
+    def should_stop(self, state: ReflectionState) -> bool:
+        if len(state.outputs) < 2 or len(state.outputs) <= len(state.critiques):
+            return False
+        matcher = SequenceMatcher(None, state.outputs[-2], state.outputs[-1], autojunk=False)
+        # quick_ratio is a cheap upper bound; only compute the full ratio when it can pass
+        return matcher.quick_ratio() >= self.threshold and matcher.ratio() >= self.threshold
+
+
+class TokenBudget(StoppingCriterion):
+    """
+    Stop once the run's generated outputs and critiques reach an estimated token budget.
+    :param max_tokens: Budget in estimated tokens
+    """
+    name = "token_budget"
+    
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+    
+    def should_stop(self, state: ReflectionState) -> bool:
+        return state.estimated_tokens >= self.max_tokens
+
+
+class LatencyBudget(StoppingCriterion):
+    """
+    Stop once the run has taken longer than a wall-clock budget.
+    :param max_seconds: Budget in seconds
+    """
+    name = "latency_budget"
+    
+    def __init__(self, max_seconds: float):
+        self.max_seconds = max_seconds
+    
+    def should_stop(self, state: ReflectionState) -> bool:
+        return state.elapsed >= self.max_seconds
+
+
+def first_fired(criteria: List[StoppingCriterion], state: ReflectionState) -> Optional[str]:
+    """
+    :param criteria: Criteria to check, in order
+    :param state: Progress of the current run
+    :return: Name of the first criterion that fires, or None
+    """
+    for criterion in criteria:
+        if criterion.should_stop(state):
+            return criterion.name
+    return None
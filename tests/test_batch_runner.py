@@ -0,0 +1,68 @@
+import json
+
+from batch import BatchRunner
+
+
+class EchoPattern:
+    def __init__(self, query):
+        self.query = query
+        self.last_usage = None
+    
+    def run(self):
+        if self.query == "fail":
+            raise RuntimeError("boom")
+        return self.query.upper()
+    
+    async def arun(self):
+        return self.run()
+    
+    def close(self):
+        pass
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_read_queries_skips_blank_malformed_and_empty_lines(tmp_path):
+    input_path = tmp_path / "queries.jsonl"
+    write_lines(input_path, [
+        '{"id": "a", "query": "first"}',
+        "",
+        "{not json",
+        '"bare string"',
+        '{"question": "second"}',
+        "[1, 2]",
+        '{"id": "c"}',
+    ])
+    assert list(BatchRunner.read_queries(str(input_path))) == [
+        {"id": "a", "query": "first"},
+        {"id": "3", "query": "bare string"},
+        {"id": "4", "query": "second"},
+    ]
+
+
+def test_completed_ids_cuts_a_torn_last_line(tmp_path):
+    output_path = tmp_path / "results.jsonl"
+    output_path.write_text('{"id": "a", "error": null}\n{"id": "b", "error": "boom"}\n{"id": "c", "err', encoding="utf-8")
+    assert BatchRunner.completed_ids(str(output_path)) == {"a"}
+    assert output_path.read_text(encoding="utf-8").endswith('"boom"}\n')
+
+
+def test_resume_skips_answered_ids_and_retries_failures(tmp_path):
+    input_path = tmp_path / "queries.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    write_lines(input_path, ['{"id": "a", "query": "first"}', '{"id": "b", "query": "fail"}', '{"id": "c", "query": "third"}'])
+    output_path.write_text('{"id": "a", "query": "first", "response": "FIRST", "error": null}\n{"id": "b", "error": "RuntimeError: boom"}\n{"id": "c", "que', encoding="utf-8")
+    
+    report = BatchRunner(api_key="local", concurrency=2, pattern_factory=EchoPattern).run(str(input_path), str(output_path))
+    assert (report.skipped, report.completed, report.failed) == (1, 1, 1)
+    report = BatchRunner(api_key="local", concurrency=2, mode="async", pattern_factory=EchoPattern).run(str(input_path), str(output_path))
+    assert (report.skipped, report.completed, report.failed) == (2, 0, 1)
+    results = read_results(output_path)
+    assert [result["id"] for result in results if result["error"] is None] == ["a", "c"]
+    assert sum(1 for result in results if result["id"] == "b") == 3
@@ -0,0 +1,105 @@
+import pytest
+
+from cache import MemoryCache, SqliteCache, TieredCache
+from model import ModelFactory, ModelType, ProviderType, ReplayFixtures, RoleType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr("cache.memory_cache.time.monotonic", fake)
+    monkeypatch.setattr("cache.sqlite_cache.time.time", fake)
+    return fake
+
+
+def test_memory_cache_expires_entries(clock):
+    cache = MemoryCache(default_ttl=10.0)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=1.0)
+    clock.now += 5.0
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+    clock.now += 5.0
+    assert cache.get("default") is None
+    assert len(cache) == 0
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 0}
+
+
+def test_memory_cache_evicts_the_least_recently_used_entry():
+    cache = MemoryCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path, clock):
+    cache = SqliteCache(path=str(tmp_path / "cache.sqlite3"), max_size=2)
+    cache.set("a", {"value": 1}, ttl=1.0)
+    clock.now += 0.5
+    cache.set("b", [2])
+    clock.now += 0.5
+    assert cache.get("a") is None
+    cache.set("c", "three")
+    clock.now += 0.5
+    cache.get("b")
+    clock.now += 0.5
+    cache.set("d", 4)
+    assert cache.get("c") is None
+    assert cache.get("b") == [2] and cache.get("d") == 4
+    cache.close()
+
+
+def test_tiered_cache_backfills_with_the_remaining_lifetime(tmp_path, clock):
+    memory = MemoryCache()
+    disk = SqliteCache(path=str(tmp_path / "cache.sqlite3"))
+    cache = TieredCache(tiers=[memory, disk])
+    disk.set("key", "value", ttl=10.0)
+    clock.now += 4.0
+    assert cache.get("key") == "value"
+    assert memory.get("key") == "value"
+    clock.now += 6.0
+    assert memory.get("key") is None
+    assert cache.get("key") is None
+    disk.close()
+
+
+def local_factory(sampling_params) -> ModelFactory:
+    return ModelFactory(
+        api_key="local",
+        provider=ProviderType.Local,
+        model_name=ModelType.Llama3_3_70B_Versatile,
+        sampling_params=sampling_params,
+        response_cache=MemoryCache(),
+        use_circuit_breaker=False,
+        model_options={"fixtures": ReplayFixtures.from_script(["first", "second"])}
+    )
+
+
+def test_factory_serves_deterministic_requests_from_the_cache():
+    factory = local_factory({"temperature": 0})
+    assert factory.generate("question", RoleType.User) == "first"
+    assert factory.generate("question", RoleType.User) == "first"
+
+
+def test_factory_bypasses_the_cache_for_non_deterministic_sampling():
+    factory = local_factory({"temperature": 0.7})
+    assert factory.generate("question", RoleType.User) == "first"
+    assert factory.generate("question", RoleType.User) == "second"
+    assert len(factory.response_cache) == 0
+
+
+def test_factory_caches_seeded_sampling():
+    factory = local_factory({"temperature": 0.7, "seed": 1})
+    factory.generate("question", RoleType.User)
+    assert factory.generate("question", RoleType.User) == "first"
@@ -0,0 +1,48 @@
+from model.context_window import ContextWindow, DropOldestObservations, SummarizeOlderTurns
+
+
+class FixedSummary:
+    def generate(self, prompt, role):
+        return "summary"
+
+
+def native_conversation():
+    def call(call_id):
+        return {"role": "assistant", "content": None, "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "Calculator", "arguments": "{}"}}]}
+
+    def result(call_id):
+        return {"role": "tool", "tool_call_id": call_id, "content": "x" * 200}
+
+    return [
+        {"role": "system", "content": "system prompt"},
+        {"role": "user", "content": "question"},
+        call("a"), result("a"), result("a"),
+        call("b"), result("b"), result("b"),
+    ]
+
+
+def assert_no_orphaned_tool_messages(messages):
+    for index, message in enumerate(messages):
+        if message["role"] == "tool":
+            assert messages[index - 1]["role"] in ("assistant", "tool")
+            assert messages[index - 1]["role"] != "assistant" or messages[index - 1].get("tool_calls")
+
+
+def test_summarize_cuts_before_the_assistant_that_made_the_calls():
+    strategy = SummarizeOlderTurns(model=FixedSummary(), keep_recent=2)
+    messages = strategy.apply(ContextWindow(max_tokens=10), native_conversation(), pinned=2)
+    assert [message["role"] for message in messages] == ["system", "user", "user", "assistant", "tool", "tool"]
+    assert_no_orphaned_tool_messages(messages)
+
+
+def test_drop_oldest_only_cuts_on_turn_boundaries():
+    strategy = DropOldestObservations(keep_recent=2)
+    messages = strategy.apply(ContextWindow(max_tokens=150), native_conversation(), pinned=2)
+    assert [message["role"] for message in messages] == ["system", "user", "assistant", "tool", "tool"]
+    assert_no_orphaned_tool_messages(messages)
+
+
+def test_drop_oldest_stops_without_a_boundary():
+    strategy = DropOldestObservations(keep_recent=2)
+    messages = native_conversation()[:5]
+    assert strategy.apply(ContextWindow(max_tokens=10), messages, pinned=2) == messages
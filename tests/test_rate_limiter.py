@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from model import ProviderType, RateLimiter, TokenBucket
+
+
+def test_token_bucket_tells_callers_how_long_to_wait():
+    bucket = TokenBucket(capacity=60, period=60.0)
+    assert bucket.reserve(60) == 0.0
+    assert 9.9 < bucket.reserve(10) <= 10.0
+
+
+def test_token_bucket_clamps_oversized_requests():
+    bucket = TokenBucket(capacity=10, period=60.0)
+    assert bucket.reserve(1000) == 0.0
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_reservations_are_atomic_across_threads():
+    bucket = TokenBucket(capacity=50, period=3600.0)
+    waits = []
+    barrier = threading.Barrier(20)
+    
+    def reserve():
+        barrier.wait()
+        for _ in range(10):
+            waits.append(bucket.reserve(1))
+    
+    threads = [threading.Thread(target=reserve) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(1 for wait in waits if wait == 0.0) == 50
+    assert bucket.tokens == pytest.approx(-150, abs=1)
+
+
+def test_record_usage_reconciles_the_estimate():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.acquire(400)
+    limiter.record_usage(400, 100)
+    assert limiter.token_bucket.tokens == pytest.approx(900, abs=1)
+    limiter.record_usage(100, None)
+    assert limiter.token_bucket.tokens == pytest.approx(900, abs=1)
+
+
+def test_limiters_are_shared_per_provider_and_key():
+    first = RateLimiter.shared(ProviderType.Local, "shared-key", requests_per_minute=10)
+    assert RateLimiter.shared(ProviderType.Local, "shared-key", requests_per_minute=99) is first
+    assert first.requests_per_minute == 10
+    assert RateLimiter.shared(ProviderType.Local, "other-key") is not first
+    assert RateLimiter.shared(ProviderType.Groq, "shared-key") is not first
@@ -0,0 +1,41 @@
+from model import ModelType, ProviderType, ReplayFixtures
+from reflection_pattern import OutputSimilarity, ReflectionPattern
+
+
+def best_of_n(stopping_criteria=None, iterations=10) -> ReflectionPattern:
+    # Every generation and critique answers "Done", so outputs never change either
+    return ReflectionPattern(
+        provider=ProviderType.Local,
+        model_name=ModelType.Llama3_3_70B_Versatile,
+        generation_prompt="Write a haiku.",
+        reflection_prompt="Review the haiku.",
+        api_key="local",
+        iterations=iterations,
+        candidates=2,
+        stopping_criteria=stopping_criteria,
+        model_options={"fixtures": ReplayFixtures.from_script(["Done"])}
+    )
+
+
+def test_best_of_n_stops_on_a_done_critique_by_default():
+    pattern = best_of_n()
+    assert pattern.run() == "Done"
+    assert pattern.stop_reason == "done"
+    assert len(pattern.last_state.critiques) == 1
+
+
+def test_best_of_n_honours_the_stopping_criteria():
+    pattern = best_of_n(stopping_criteria=[OutputSimilarity()])
+    pattern.run()
+    assert pattern.stop_reason == "similarity"
+    assert len(pattern.last_state.outputs) == 2
+
+
+def test_best_of_n_counts_iterations_like_a_serial_run():
+    serial = best_of_n(stopping_criteria=[], iterations=4)
+    serial.candidates = 1
+    serial.run()
+    parallel = best_of_n(stopping_criteria=[], iterations=4)
+    parallel.run()
+    assert serial.stop_reason == parallel.stop_reason == "iterations"
+    assert len(parallel.last_state.outputs) == len(serial.last_state.outputs) == 2
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from model import CircuitBreaker, CircuitOpenError, LocalModel, ModelRequestError, ModelServerError, ModelType, RetryPolicy
+
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.0, **kwargs)
+    breaker.record_failure()
+    return breaker
+
+
+def local_model(breaker: CircuitBreaker, retry_policy=None) -> LocalModel:
+    return LocalModel(api_key="local", model_name=ModelType.Llama3_3_70B_Versatile, circuit_breaker=breaker, retry_policy=retry_policy)
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = open_breaker()
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.before_call() is False
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = open_breaker()
+    breaker.recovery_timeout = 60.0
+    breaker.opened_at -= 60.0
+    assert breaker.before_call() is True
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.trial_in_flight
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_cancelled_trial_is_released():
+    breaker = open_breaker()
+    model = local_model(breaker)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(model.acall_with_retry(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert breaker.is_open and not breaker.trial_in_flight
+    assert breaker.before_call() is True
+
+
+def test_interrupted_sync_trial_is_released():
+    breaker = open_breaker()
+    model = local_model(breaker)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        model.call_with_retry(interrupted)
+    assert breaker.is_open and not breaker.trial_in_flight
+
+
+def test_local_failure_does_not_close_the_circuit():
+    breaker = open_breaker()
+    model = local_model(breaker)
+
+    def broken():
+        raise KeyError("fixture")
+
+    with pytest.raises(Exception):
+        model.call_with_retry(broken)
+    assert breaker.is_open and not breaker.trial_in_flight
+
+
+def test_upstream_refusal_counts_as_healthy():
+    breaker = open_breaker()
+    model = local_model(breaker)
+
+    def refused():
+        raise ModelRequestError("bad request", provider="local", status_code=400)
+
+    with pytest.raises(ModelRequestError):
+        model.call_with_retry(refused)
+    assert not breaker.is_open
+
+
+def test_retries_retryable_errors_up_to_max_attempts():
+    model = local_model(None, RetryPolicy(max_attempts=3, base_delay=0.0))
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise ModelServerError("unavailable", provider="local", status_code=503)
+
+    with pytest.raises(ModelServerError):
+        model.call_with_retry(failing)
+    assert len(attempts) == 3
+
+
+def test_retry_delay_honours_retry_after_and_caps_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    assert policy.delay(0, retry_after=2.5) == 2.5
+    assert policy.delay(0, retry_after=60.0) == 5.0
+    assert all(0.0 <= policy.delay(attempt) <= min(5.0, 2 ** attempt) for attempt in range(6) for _ in range(20))
@@ -0,0 +1,50 @@
+import json
+
+from tools.tool_call_parser import ToolCallDetector, build_tool_messages, parse_native_tool_calls, parse_tool_calls
+
+NESTED = {"tool": "Search", "parameters": {"query": "weather {today}", "filters": {"region": ["in", "us"], "safe": True}}}
+
+
+def test_parses_a_fenced_call_with_nested_parameters():
+    response = f"I will search.\n```json\n{json.dumps(NESTED, indent=2)}\n```\nWaiting for the result."
+    assert parse_tool_calls(response) == [("Search", NESTED["parameters"])]
+
+
+def test_fenced_and_bare_calls_parse_alike():
+    bare = f"Let me check {json.dumps(NESTED)} now."
+    fenced = f"Let me check\n```json\n{json.dumps(NESTED)}\n```\nnow."
+    assert parse_tool_calls(bare) == parse_tool_calls(fenced) == [("Search", NESTED["parameters"])]
+
+
+def test_parses_a_list_of_independent_calls():
+    calls = [{"tool": "WeatherTool", "parameters": {"location": city}} for city in ("Bangalore", "Paris")]
+    response = f"```json\n{json.dumps(calls)}\n```"
+    assert parse_tool_calls(response) == [("WeatherTool", {"location": "Bangalore"}), ("WeatherTool", {"location": "Paris"})]
+
+
+def test_skips_invalid_json_and_objects_that_are_not_calls():
+    response = 'Sets look like {1, 2} and {"note": "no tool"} but ' + json.dumps({"tool": "Calc", "parameters": {}})
+    assert parse_tool_calls(response) == [("Calc", {})]
+    assert parse_tool_calls("") == []
+    assert parse_tool_calls("no json at all [") == []
+
+
+def test_detector_stops_once_a_streamed_call_is_complete():
+    text = "Thinking {about it}... " + json.dumps(NESTED) + " trailing text"
+    detector = ToolCallDetector()
+    tool_calls = []
+    for position in range(0, len(text), 7):
+        tool_calls = detector.feed(text[position:position + 7])
+        if tool_calls:
+            break
+    assert tool_calls == [("Search", NESTED["parameters"])]
+    assert detector.text.endswith("}") and "trailing" not in detector.text
+
+
+def test_native_tool_calls_round_trip_to_tool_messages():
+    message = {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "a", "type": "function", "function": {"name": "Calc", "arguments": '{"x": 1}'}},
+        {"id": "b", "type": "function", "function": {"name": "Calc", "arguments": "not json"}},
+    ]}
+    assert parse_native_tool_calls(message) == [("Calc", {"x": 1}), ("Calc", {})]
+    assert [m["tool_call_id"] for m in build_tool_messages(message, ["1", "2"])] == ["a", "b"]
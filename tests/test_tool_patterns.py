@@ -0,0 +1,26 @@
+import json
+
+from model import ProviderType, ReplayFixtures
+from react_pattern.react_pattern import ReactPattern
+from tool_pattern import ToolsPattern
+
+TOOL_CALL = "```json\n" + json.dumps({"tool": "MissingTool", "parameters": {}}) + "\n```"
+
+
+def fixtures() -> dict:
+    # Every tool turn is over a one-token budget; the final answer comes last
+    return {"fixtures": ReplayFixtures.from_script([TOOL_CALL, "<response>final answer</response>"], loop=False)}
+
+
+def test_tools_pattern_answers_without_tools_once_over_budget():
+    with ToolsPattern(groq_api_key="local", provider=ProviderType.Local, model_options=fixtures(), token_budget=1, tool_cache=None) as pattern:
+        response = pattern.run("question")
+    assert response == "<response>final answer</response>"
+    assert pattern.stop_reason == "token_budget"
+
+
+def test_react_pattern_answers_without_tools_once_over_budget():
+    with ReactPattern(user_prompt="question", api_key="local", provider=ProviderType.Local, model_options=fixtures(), token_budget=1, tool_cache=None) as pattern:
+        response = pattern.run()
+    assert response == "final answer"
+    assert pattern.stop_reason == "token_budget"
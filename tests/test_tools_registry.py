@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from tools.tools_base import ToolsBase, ToolScope
+from tools.tools_registry import ToolsRegistry
+
+
+class PooledTool(ToolsBase):
+    scope = ToolScope.Session
+    pool_size = 2
+    closed = []
+
+    def __init__(self):
+        super().__init__(name=type(self).__name__)
+
+    def init_tool(self):
+        pass
+
+    def run(self):
+        return id(self)
+
+    @staticmethod
+    def get_tool_parameters():
+        return {"description": "Test tool", "parameters": {}}
+
+    def close(self):
+        PooledTool.closed.append(id(self))
+
+
+@pytest.fixture
+def registered():
+    PooledTool.closed = []
+    ToolsRegistry.register(PooledTool)
+    yield "PooledTool"
+    ToolsRegistry.unregister("PooledTool")
+
+
+def pooled(session_id):
+    pool = ToolsRegistry._pools.get(("PooledTool", session_id))
+    return pool.idle if pool is not None else []
+
+
+def test_sequential_checkouts_reuse_one_instance(registered):
+    with ToolsRegistry.checkout(registered, "s") as first:
+        pass
+    with ToolsRegistry.checkout(registered, "s") as second:
+        pass
+    assert first is second
+    assert pooled("s") == [first]
+
+
+def test_concurrent_checkouts_never_share_an_instance(registered):
+    lent = []
+    barrier = threading.Barrier(4)
+
+    def call():
+        with ToolsRegistry.checkout(registered, "s") as tool:
+            lent.append(tool)
+            barrier.wait()
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(tool) for tool in lent}) == 4
+    # Only pool_size instances stay pooled; the surplus is closed on return
+    assert len(pooled("s")) == 2
+    assert len(PooledTool.closed) == 2
+
+
+def test_instances_lent_out_are_closed_on_return(registered):
+    with ToolsRegistry.checkout(registered, "s") as tool:
+        ToolsRegistry.close_session("s")
+        assert id(tool) not in PooledTool.closed
+    assert id(tool) in PooledTool.closed
+    assert pooled("s") == []
+
+
+def test_sessions_have_separate_pools(registered):
+    with ToolsRegistry.checkout(registered, "a") as first:
+        pass
+    with ToolsRegistry.checkout(registered, "b") as second:
+        pass
+    assert first is not second
+
+
+def test_session_scoped_tool_requires_a_session_id(registered):
+    with pytest.raises(ValueError):
+        with ToolsRegistry.checkout(registered):
+            pass
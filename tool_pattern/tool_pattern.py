@@ -1,65 +1,68 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Tuple
-import json
-import re
-from tools import ToolsRegistry
-from model import ModelFactory, RoleType, ProviderType, ModelType
+from typing import Dict, List, Any, Optional
+import uuid
+from tools import ToolsRegistry, ToolResultCache
+from tools.tool_agent import ToolAgentMixin
+from tools.tool_call_parser import build_tool_messages
+from model import ModelFactory, RoleType, ProviderType, ConversationLog, Usage
+from cache import CacheBase
+from tracing import span, traced
 
 
 @dataclass
-class ToolsPattern:
+class ToolsPattern(ToolAgentMixin):
     
     user_history: List[Dict[str, str]] = field(default_factory=list)
     agent_history: List[Dict[str, str]] = field(default_factory=list)
+    conversation: ConversationLog = field(default_factory=ConversationLog)
     tool_parameters: Dict[str, Any] = field(default_factory=dict)
     model: ModelFactory = None
     verbose: bool = False
     groq_api_key: str = None
+    max_parallel_tools: int = 4
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    tool_cache: Optional[ToolResultCache] = field(default_factory=ToolResultCache.shared)
+    response_cache: Optional[CacheBase] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    stream: bool = False
+    native_tools: bool = False
+    provider: ProviderType = ProviderType.Groq
+    model_options: Dict[str, Any] = field(default_factory=dict)
+    # Stop a run once its model calls go over these totals
+    token_budget: Optional[int] = None
+    cost_budget: Optional[float] = None
+    # Usage of the latest run, and "token_budget", "cost_budget" or "iterations" if it ended early
+    last_usage: Optional[Usage] = None
+    stop_reason: Optional[str] = None
     
     
     def __post_init__(self):
-        self.model = ModelFactory(
-            api_key= self.groq_api_key,
-            provider=ProviderType.Groq, 
-            model_name=ModelType.Llama3_3_70B_Versatile, 
-            verbose=self.verbose
-        )
+        self.init_agent(self.groq_api_key)
         self.construct_tool_parameters()
         if self.verbose:
             print(self.tool_parameters)
     
     def construct_tool_parameters(self) -> Dict:
-        for tool in ToolsRegistry.list_available_tools():
-            tool_class_params = ToolsRegistry.get_tool_class(tool).get_tool_parameters()
-            self.tool_parameters[tool] = tool_class_params
+        self.tool_parameters.update(ToolsRegistry.get_tools_parameters())
     
-    def construct_prompt(self, user_query: str) -> List[Dict[str, str]]:
+    @staticmethod
+    def render_system_prompt() -> str:
         """
-        Construct the prompt for the model with user query and tool definitions
+        Render the system prompt with the tool definitions and usage instructions
         
-        Args:
-            user_query: The user's query/question
-            
         Returns:
-            A list of messages for the model
+            The system prompt text
         """
-        # System prompt with tool definitions
-        system_prompt = {
-            "role": RoleType.System.value,
-            "content": """You are a helpful assistant that can use tools to answer user queries. 
+        content = """You are a helpful assistant that can use tools to answer user queries. 
 You have access to the following tools:
 
 """
-        }
-        
         # Add tool descriptions to system prompt
-        for tool_name, tool_params in self.tool_parameters.items():
-            system_prompt["content"] += f"Tool: {tool_name}\n"
-            system_prompt["content"] += f"Description: {tool_params.get('description', 'No description provided')}\n"
-            system_prompt["content"] += f"Parameters: {json.dumps(tool_params.get('parameters', {}), indent=2)}\n\n"
+        content += ToolsRegistry.render_tool_descriptions()
         
         # Add instructions on how to use tools
-        system_prompt["content"] += """
+        content += """
 To use a tool, respond with:
 ```json
 {
@@ -71,77 +74,85 @@ To use a tool, respond with:
 }
 ```
 
-If you need to use multiple tools, use them one at a time. Wait for the result of one tool before using another.
+If you need several independent tool calls (for example the weather in several cities), send them together as a JSON list in one response:
+```json
+[
+  {"tool": "ToolName", "parameters": {"param1": "value1"}},
+  {"tool": "ToolName", "parameters": {"param1": "value2"}}
+]
+```
+All results will be returned to you in a single message. If a tool call depends on the result of another, use them one at a time and wait for the result before continuing.
 If you can answer the user's query without using tools, just respond normally.
 """
+        return content
+    
+    @staticmethod
+    def render_native_system_prompt() -> str:
+        """
+        Render the system prompt used with native function calling, where tool
+        definitions travel in the request's tools parameter instead of the prompt
         
-        # Construct conversation history
-        conversation = [system_prompt]
-        
-        # Add conversation history
-        for i in range(len(self.user_history)):
-            conversation.append({"role": RoleType.User.value, "content": self.user_history[i]["content"]})
-            if i < len(self.agent_history):
-                conversation.append({"role": RoleType.Assistant.value, "content": self.agent_history[i]["content"]})
-        
-        # Add current query
-        conversation.append({"role": RoleType.User.value, "content": user_query})
-        
-        return conversation
+        Returns:
+            The system prompt text
+        """
+        return """You are a helpful assistant that can use tools to answer user queries.
+Call the provided tools when they help. Independent tool calls can be made together in one turn.
+If you can answer the user's query without using tools, just respond normally.
+"""
     
-    def parse_tool_call(self, response: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    def construct_prompt(self, user_query: str) -> List[Dict[str, str]]:
         """
-        Parse the response to extract tool calls
+        Append the user message to the conversation and return the prompt for the model.
+        The system prompt with tool definitions is added when the conversation starts.
         
         Args:
-            response: The response from the model
+            user_query: The user's query/question
             
         Returns:
-            A tuple of (tool_name, parameters) or (None, None) if no tool call found
+            A list of messages for the model
         """
-        json_pattern = r'```json\n(.*?)\n```'
-        json_matches = re.findall(json_pattern, response, re.DOTALL)
-        
-        if not json_matches:
-            json_pattern = r'```\n(.*?)\n```'
-            json_matches = re.findall(json_pattern, response, re.DOTALL)
-            
-        if not json_matches:
-            json_pattern = r'{[\s\S]*?"tool"[\s\S]*?}'
-            json_matches = re.findall(json_pattern, response, re.DOTALL)
+        if not self.conversation:
+            system_prompt = self.render_native_system_prompt() if self.uses_native_tools() else self.get_system_prompt()
+            self.conversation.append(RoleType.System, system_prompt)
         
-        print(json_matches)
-        for json_str in json_matches:
-            try:
-                tool_call = json.loads(json_str)
-                if "tool" in tool_call and "parameters" in tool_call:
-                    return tool_call["tool"], tool_call["parameters"]
-            except json.JSONDecodeError:
-                continue
-        
-        return None, None
+        self.user_history.append({"content": user_query})
+        self.conversation.append(RoleType.User, user_query)
+        return self.conversation.view()
     
-    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+    def record_response(self, response: str, tool_results: Optional[List[str]] = None, message: Optional[Dict[str, Any]] = None) -> None:
         """
-        Execute a tool with the given parameters
+        Append a model response, and the results of any tools it called, to the conversation
         
         Args:
-            tool_name: The name of the tool to execute
-            parameters: The parameters for the tool
-            
-        Returns:
-            The result of the tool execution as a string
+            response: The response from the model
+            tool_results: The results of the tool calls made in the response
+            message: The assistant message as returned by the model, when it carries native tool calls
         """
-        if tool_name not in ToolsRegistry.list_available_tools():
-            return f"Error: Tool '{tool_name}' not found"
+        self.agent_history.append({"content": response})
+        if message is not None and message.get("tool_calls") and tool_results:
+            self.conversation.append_message(message)
+            for tool_message in build_tool_messages(message, tool_results):
+                self.conversation.append_message(tool_message)
+            self.user_history.append({"content": "\n\n".join(tool_results)})
+            return
+        
+        self.conversation.append(RoleType.Assistant, response)
+        if tool_results:
+            tool_message = "\n\n".join(tool_results)
+            self.user_history.append({"content": tool_message})
+            self.conversation.append(RoleType.User, tool_message)
+    
+    def final_answer_prompt(self) -> List[Dict[str, str]]:
+        """
+        Ask for the final answer once every iteration or the budget was spent on tool calls
         
-        try:
-            tool_instance = ToolsRegistry.create_tool(tool_name)
-            result = tool_instance.run(**parameters)
-            return f"Tool: {tool_name}\nResult: {result}"
-        except Exception as e:
-            return f"Error executing tool '{tool_name}': {str(e)}"
+        Returns:
+            The prompt for the final model call
+        """
+        self.stop_reason = self.stop_reason or "iterations"
+        return self.construct_prompt("Please provide your final answer based on the tool results.")
     
+    @traced("ToolsPattern.run", lambda self, *args, **kwargs: {"session_id": self.session_id})
     def run(self, user_query: str, max_iterations: int = 5) -> str:
         """
         Run the tool pattern with the user query
@@ -151,46 +162,77 @@ If you can answer the user's query without using tools, just respond normally.
             max_iterations: Maximum number of iterations for tool use
             
         Returns:
-            The final response from the assistant
+            The final response from the assistant; usage is in last_usage
         """
-        self.user_history.append({"content": user_query})
-        
-        iteration = 0
-        final_response = ""
-        
-        while iteration < max_iterations:
-            # Construct prompt
-            prompt = self.construct_prompt(user_query if iteration == 0 else "")
+        with self.start_usage_meter() as meter:
+            prompt = self.construct_prompt(user_query)
+            iteration = 0
+            final_response = ""
             
-            # Generate response
-            response = self.model.generate(prompt, RoleType.Assistant)
+            while iteration < max_iterations:
+                if self.over_budget(meter):
+                    # Over budget: stop calling tools and ask for the final answer
+                    break
+                with span("iteration", index=iteration) as iteration_span:
+                    # Generate response from the conversation so far; when streaming,
+                    # reading stops as soon as a complete tool call has arrived
+                    response, tool_calls, message = self.generate_response(prompt)
+                    self.observe_response(iteration_span, iteration, response, tool_calls)
+                    if not tool_calls:
+                        final_response = response
+                        self.record_response(response)
+                        break
+                    # Independent tool calls from one turn run in parallel
+                    self.record_response(response, self.execute_tools(tool_calls), message)
+                    iteration += 1
             
-            if self.verbose:
-                print(f"\nIteration {iteration + 1} response:\n{response}")
+            if self.needs_final_answer(final_response, iteration, max_iterations):
+                final_response = self.generate_final_answer(self.final_answer_prompt())
+                self.record_response(final_response)
+            return self.finish_run(meter, iteration, final_response)
+    
+    @traced("ToolsPattern.arun", lambda self, *args, **kwargs: {"session_id": self.session_id})
+    async def arun(self, user_query: str, max_iterations: int = 5) -> str:
+        """
+        Run the tool pattern with the user query on the event loop.
+        Model calls are awaited and tools run in a worker thread, so many
+        agents can share a single loop. Apart from the awaited calls this
+        is the same loop as run.
+        
+        Args:
+            user_query: The user's query/question
+            max_iterations: Maximum number of iterations for tool use
             
-            # Parse tool calls
-            tool_name, parameters = self.parse_tool_call(response)
+        Returns:
+            The final response from the assistant; usage is in last_usage
+        """
+        with self.start_usage_meter() as meter:
+            prompt = self.construct_prompt(user_query)
+            iteration = 0
+            final_response = ""
             
-            if tool_name:
-                tool_result = self.execute_tool(tool_name, parameters)
-                self.agent_history.append({"content": response})
-                self.user_history.append({"content": tool_result})
-                iteration += 1
-            else:
-                final_response = response
-                self.agent_history.append({"content": response})
-                break
-        if not final_response and iteration == max_iterations:
-            prompt = self.construct_prompt("Please provide your final answer based on the tool results.")
-            final_response = self.model.generate(prompt, RoleType.Assistant)
-            self.agent_history.append({"content": final_response})
-        
-        return final_response
+            while iteration < max_iterations:
+                if self.over_budget(meter):
+                    break
+                with span("iteration", index=iteration) as iteration_span:
+                    response, tool_calls, message = await self.agenerate_response(prompt)
+                    self.observe_response(iteration_span, iteration, response, tool_calls)
+                    if not tool_calls:
+                        final_response = response
+                        self.record_response(response)
+                        break
+                    self.record_response(response, await self.aexecute_tools(tool_calls), message)
+                    iteration += 1
+            
+            if self.needs_final_answer(final_response, iteration, max_iterations):
+                final_response = await self.agenerate_final_answer(self.final_answer_prompt())
+                self.record_response(final_response)
+            return self.finish_run(meter, iteration, final_response)
 
 
 if __name__ == "__main__":
-    tools_pattern = ToolsPattern(verbose=True)
-    response = tools_pattern.run("What's the weather like in Bangalore today?")
+    with ToolsPattern(verbose=True) as tools_pattern:
+        response = tools_pattern.run("What's the weather like in Bangalore today?")
     print("\nFinal response:")
     print(response)
 
@@ -1,16 +1,34 @@
 from .tools_registry import ToolsRegistry, register_tool
-from .tools_base import ToolsBase
+from .tools_base import ToolsBase, ToolScope
+from .tool_cache import ToolResultCache
+from .tool_manifest import SUPPORT_MODULES, tool_modules, load_manifest, source_hash
 import importlib
 import pkgutil
 import os
 
-__all__ = ["ToolsRegistry", "ToolsBase", "register_tool"]
+__all__ = ["ToolsRegistry", "ToolsBase", "ToolScope", "ToolResultCache", "register_tool"]
 
 
 def import_submodules():
     package_dir = os.path.dirname(__file__)
     for _, module_name, is_pkg in pkgutil.iter_modules([package_dir]):
-        if module_name not in ['tools_registry', 'tools_base', '__pycache__']:
+        if module_name not in SUPPORT_MODULES:
             importlib.import_module(f"{__name__}.{module_name}")
 
-import_submodules()
\ No newline at end of file
+
+def discover_tools():
+    """
+    Register the bundled tools lazily from the manifest; a tool module is
+    imported the first time its class is needed. Modules missing from the
+    manifest, or changed since it was generated, are imported right away.
+    """
+    manifest = load_manifest()
+    for module_name in tool_modules():
+        entries = manifest.get(module_name)
+        if entries and all(entry.source_sha256 == source_hash(module_name) for entry in entries):
+            for entry in entries:
+                ToolsRegistry.register_lazy(entry.name, f"{__name__}.{module_name}", entry.parameters)
+        else:
+            importlib.import_module(f"{__name__}.{module_name}")
+
+discover_tools()
\ No newline at end of file
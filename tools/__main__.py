@@ -0,0 +1,12 @@
+"""
+Regenerate the lazy tool manifest (tools/tool_manifest.json).
+
+Run from the repository root after adding or changing a tool:
+    python -m tools
+"""
+
+from tools.tool_manifest import main
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from .tools_registry import register_tool
 from dataclasses import dataclass
-from .tools_base import ToolsBase
+from typing import ClassVar, Dict
+from .tools_base import ToolsBase, ToolScope
 from duckduckgo_search import DDGS
 @register_tool
 @dataclass
@@ -8,6 +9,7 @@ class DuckDuckGoSearch(ToolsBase):
     """ DuckDuckGo Search Tool
     """
     name: str = "DuckDuckGo Search"
+    scope: ClassVar[ToolScope] = ToolScope.Session
     
     def init_tool(self, **kwargs):
         self.ddgs = DDGS()
@@ -28,6 +30,10 @@ class DuckDuckGoSearch(ToolsBase):
                   result_str += f"{idx}. {item.get('title', 'No Title')}: {item.get('image', 'No image')} - {item.get('url', 'No link')}\n\n"
               return result_str
     
+    @staticmethod
+    def get_cache_policy() -> Dict:
+        return {"cacheable": True, "ttl": 3600}
+    
     @staticmethod
     def get_tool_parameters() -> dict:
         return {
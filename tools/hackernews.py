@@ -1,36 +1,97 @@
 from .tools_registry import register_tool
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import ClassVar, Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .tools_base import ToolsBase
-import requests
 import json
+import threading
+import time
 
 @register_tool
 @dataclass
 class HackerNews(ToolsBase):
     """ Fetches news from hackernews
 
+    Story items are fetched concurrently (bounded by max_fan_out). The top
+    stories list is cached for top_stories_ttl seconds and item payloads are
+    kept in an LRU cache shared by every instance, so repeat calls only fetch
+    ids that have not been seen before.
     """
     name: str = "HackerNews"
     top_news_url: str = "https://hacker-news.firebaseio.com/v0/topstories.json"
+    item_url: str = "https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
+    max_fan_out: int = 8
+    top_stories_ttl: float = 60.0
+    
+    item_cache_size: ClassVar[int] = 1024
+    _top_stories: ClassVar[Optional[List[int]]] = None
+    _top_stories_expiry: ClassVar[float] = 0.0
+    _item_cache: ClassVar["OrderedDict[int, Dict]"] = OrderedDict()
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()
     
     def init_tool(self, **kwargs):
         pass
     
+    def get_top_story_ids(self) -> List[int]:
+        """
+        Get the ids of the current top stories, served from cache while fresh
+        
+        Returns:
+            The list of top story ids
+        """
+        with HackerNews._cache_lock:
+            if HackerNews._top_stories is not None and time.monotonic() < HackerNews._top_stories_expiry:
+                return HackerNews._top_stories
+        
+        response = self.http.get(self.top_news_url)
+        response.raise_for_status()
+        top_stories_ids = response.json()
+        
+        with HackerNews._cache_lock:
+            HackerNews._top_stories = top_stories_ids
+            HackerNews._top_stories_expiry = time.monotonic() + self.top_stories_ttl
+        return top_stories_ids
+    
+    def get_story(self, story_id: int) -> Dict:
+        """
+        Get a story item, served from the LRU cache when already fetched
+        
+        Args:
+            story_id: The Hacker News item id
+            
+        Returns:
+            The item payload
+        """
+        with HackerNews._cache_lock:
+            story_info = HackerNews._item_cache.get(story_id)
+            if story_info is not None:
+                HackerNews._item_cache.move_to_end(story_id)
+                return story_info
+        
+        story_res = self.http.get(self.item_url.format(story_id=story_id))
+        story_res.raise_for_status()
+        story_info = story_res.json() or {}
+        
+        with HackerNews._cache_lock:
+            HackerNews._item_cache[story_id] = story_info
+            HackerNews._item_cache.move_to_end(story_id)
+            while len(HackerNews._item_cache) > HackerNews.item_cache_size:
+                HackerNews._item_cache.popitem(last=False)
+        return story_info
+    
     def run(self, no_of_stories: int) -> Dict[str, str]:
         try:
-            response = requests.get(self.top_news_url)
-            response.raise_for_status()
+            top_stories_ids = self.get_top_story_ids()[: int(no_of_stories)]
             
-            top_stories_ids = response.json()[: no_of_stories]
+            if len(top_stories_ids) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(top_stories_ids), self.max_fan_out)) as executor:
+                    stories = list(executor.map(self.get_story, top_stories_ids))
+            else:
+                stories = [self.get_story(story_id) for story_id in top_stories_ids]
             
             top_stories: List[Dict[str, str]] = []
-            for story_id in top_stories_ids:
-                story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                story_res = requests.get(story_url)
-                story_res.raise_for_status()
-                story_info: Dict = story_res.json()
-                
+            for story_info in stories:
                 top_stories.append({
                     'title': story_info.get("title", "No Title"),
                     'url': story_info.get("url", "https://google.com")
@@ -42,6 +103,10 @@ class HackerNews(ToolsBase):
             print(e)
             raise(e)
     
+    @staticmethod
+    def get_cache_policy() -> Dict:
+        return {"cacheable": True, "ttl": 60}
+    
     @staticmethod
     def get_tool_parameters()-> Dict:
         return {
@@ -51,10 +116,10 @@ class HackerNews(ToolsBase):
                 "type": "object",
                 "properties": {
                     "no_of_stories":{
-                        "type":"int",
+                        "type":"integer",
                         "description":"Number of stories you want to fetch"
                     }
                 },
                 "required":["no_of_stories"]
             }
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class HttpTransport:
+    """
+    Shared, keep-alive HTTP transport for network-bound tools.
+    
+    A single requests.Session is reused across calls so TCP/TLS connections
+    are pooled per host, and every request gets a default timeout. Up to
+    max_connections_per_host connections per host are kept alive; requests
+    beyond that never wait for a free one, they open a short-lived extra
+    connection that is discarded afterwards. An async httpx client is created
+    lazily for async callers; httpx has no per-host limit, so it only caps the
+    total number of connections.
+    """
+    timeout: float = 10.0
+    pool_connections: int = 10
+    max_connections_per_host: int = 10
+    max_retries: int = 0
+    session: Optional[requests.Session] = None
+    async_client: Optional[httpx.AsyncClient] = None
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __post_init__(self):
+        """
+        Post-initialization method to set up the pooled session.
+        :return: None
+        """
+        if self.session is None:
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.max_connections_per_host,
+                max_retries=self.max_retries
+            )
+            self.session = requests.Session()
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+    
+    @classmethod
+    def shared(cls) -> "HttpTransport":
+        """
+        Get the process-wide transport, creating it with defaults on first use
+        
+        Returns:
+            The shared HttpTransport instance
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+    
+    @classmethod
+    def configure(cls, **kwargs) -> "HttpTransport":
+        """
+        Replace the process-wide transport with one built from the given settings
+        
+        Args:
+            **kwargs: Arguments to pass to the HttpTransport constructor
+            
+        Returns:
+            The new shared HttpTransport instance
+        """
+        with cls._shared_lock:
+            previous = cls._shared
+            cls._shared = cls(**kwargs)
+        if previous is not None:
+            previous.close()
+        return cls._shared
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request over the pooled session
+        
+        Args:
+            method: HTTP method
+            url: Target URL
+            **kwargs: Extra arguments for requests.Session.request
+            
+        Returns:
+            The HTTP response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async client, creating it on first use. The client binds its
+        connections to the event loop it is first used on. Its only hard limit
+        is a global cap of pool_connections * max_connections_per_host
+        connections; max_connections_per_host bounds the idle keep-alive pool.
+        
+        Returns:
+            The pooled httpx.AsyncClient
+        """
+        if self.async_client is None:
+            self.async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_connections * self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host
+                )
+            )
+        return self.async_client
+    
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request over the pooled async client
+        
+        Args:
+            method: HTTP method
+            url: Target URL
+            **kwargs: Extra arguments for httpx.AsyncClient.request
+            
+        Returns:
+            The HTTP response
+        """
+        return await self.get_async_client().request(method, url, **kwargs)
+    
+    async def aget(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+    
+    def close(self) -> None:
+        """
+        Close the pooled session. The async client must be closed with aclose.
+        """
+        self.session.close()
+    
+    async def aclose(self) -> None:
+        """
+        Close both the pooled session and the async client
+        """
+        self.close()
+        if self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
@@ -0,0 +1,327 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import weakref
+from model.model_enums import RoleType, ModelType
+from model.model_factory import ModelFactory
+from model.usage import UsageBudget, UsageMeter
+from tools.tools_registry import ToolsRegistry
+from tools.tool_call_parser import ToolCall, ToolCallDetector, parse_tool_calls, parse_native_tool_calls
+from tracing import span, current_span
+
+
+class ToolAgentMixin:
+    """
+    Model and tool plumbing shared by the agent patterns that call tools.
+    
+    The pattern provides the prompts and the loop; this mixin generates the
+    responses, executes the tool calls, meters the run and releases the
+    session's tools. It expects the pattern to define render_system_prompt
+    and the fields model, provider, model_options, response_cache,
+    requests_per_minute, tokens_per_minute, verbose, session_id, tool_cache,
+    max_parallel_tools, stream, native_tools, token_budget, cost_budget,
+    last_usage and stop_reason.
+    """
+    
+    def init_agent(self, api_key: str) -> None:
+        """
+        Create the pattern's model and release its session-scoped tools
+        even if close() is never called
+        
+        Args:
+            api_key: The provider API key
+        """
+        self.model = ModelFactory(
+            api_key=api_key,
+            provider=self.provider,
+            model_name=ModelType.Llama3_3_70B_Versatile,
+            verbose=self.verbose,
+            response_cache=self.response_cache,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            model_options=self.model_options
+        )
+        weakref.finalize(self, ToolsRegistry.close_session, self.session_id)
+    
+    @classmethod
+    def get_system_prompt(cls) -> str:
+        """
+        Get the system prompt, rendered once per registry version and shared by all sessions
+        
+        Returns:
+            The system prompt text
+        """
+        return ToolsRegistry.memoize(f"{cls.__name__}.system_prompt", cls.render_system_prompt)
+    
+    def uses_native_tools(self) -> bool:
+        """
+        Whether tool calls go through the provider's function-calling API.
+        Falls back to the text protocol when the model does not support it.
+        """
+        return self.native_tools and self.model.supports_tools
+    
+    def parse_tool_calls(self, response: str) -> List[ToolCall]:
+        """
+        Parse the response to extract every tool call.
+        A JSON block may hold a single call object or a list of independent calls.
+        
+        Args:
+            response: The response from the model
+            
+        Returns:
+            A list of (tool_name, parameters) tuples, empty if no tool call found
+        """
+        with span("parse_tool_calls", chars=len(response or "")) as parse_span:
+            tool_calls = parse_tool_calls(response)
+            parse_span.set_attribute("tool_calls", len(tool_calls))
+            return tool_calls
+    
+    def parse_tool_call(self, response: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Parse the response to extract the first tool call
+        
+        Args:
+            response: The response from the model
+            
+        Returns:
+            A tuple of (tool_name, parameters) or (None, None) if no tool call found
+        """
+        tool_calls = self.parse_tool_calls(response)
+        if tool_calls:
+            return tool_calls[0]
+        return None, None
+    
+    def stream_response(self, prompt: List[Dict[str, str]]) -> Tuple[str, List[ToolCall]]:
+        """
+        Stream the model response and stop reading as soon as a complete tool call has arrived
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            A tuple of (response text received so far, tool calls)
+        """
+        detector = ToolCallDetector()
+        stream = self.model.generate_stream(prompt, RoleType.Assistant)
+        try:
+            for chunk in stream:
+                if detector.feed(chunk):
+                    break
+        finally:
+            stream.close()
+        return detector.text, detector.tool_calls or self.parse_tool_calls(detector.text)
+    
+    async def astream_response(self, prompt: List[Dict[str, str]]) -> Tuple[str, List[ToolCall]]:
+        """
+        Async variant of stream_response
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            A tuple of (response text received so far, tool calls)
+        """
+        detector = ToolCallDetector()
+        stream = self.model.agenerate_stream(prompt, RoleType.Assistant)
+        try:
+            async for chunk in stream:
+                if detector.feed(chunk):
+                    break
+        finally:
+            await stream.aclose()
+        return detector.text, detector.tool_calls or self.parse_tool_calls(detector.text)
+    
+    def generate_response(self, prompt: List[Dict[str, str]]) -> Tuple[str, List[ToolCall], Optional[Dict[str, Any]]]:
+        """
+        Get the next model response and the tool calls it contains
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            A tuple of (response, tool calls, assistant message from native tool calling or None)
+        """
+        if self.uses_native_tools():
+            message = self.model.generate_with_tools(prompt, ToolsRegistry.get_tool_schemas())
+            return message.get("content") or "", parse_native_tool_calls(message), message
+        if self.stream:
+            return (*self.stream_response(prompt), None)
+        response = self.model.generate(prompt, RoleType.Assistant)
+        return response, self.parse_tool_calls(response), None
+    
+    async def agenerate_response(self, prompt: List[Dict[str, str]]) -> Tuple[str, List[ToolCall], Optional[Dict[str, Any]]]:
+        """
+        Async variant of generate_response
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            A tuple of (response, tool calls, assistant message from native tool calling or None)
+        """
+        if self.uses_native_tools():
+            message = await self.model.agenerate_with_tools(prompt, ToolsRegistry.get_tool_schemas())
+            return message.get("content") or "", parse_native_tool_calls(message), message
+        if self.stream:
+            return (*(await self.astream_response(prompt)), None)
+        response = await self.model.agenerate(prompt, RoleType.Assistant)
+        return response, self.parse_tool_calls(response), None
+    
+    def generate_final_answer(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Ask for the final answer without offering the tools, so a model in
+        native mode cannot reply with tool calls only
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            The response text
+        """
+        return self.model.generate(prompt, RoleType.Assistant) or ""
+    
+    async def agenerate_final_answer(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Async variant of generate_final_answer
+        
+        Args:
+            prompt: The messages to send to the model
+            
+        Returns:
+            The response text
+        """
+        return await self.model.agenerate(prompt, RoleType.Assistant) or ""
+    
+    def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+        """
+        Execute a tool with the given parameters
+        
+        Args:
+            tool_name: The name of the tool to execute
+            parameters: The parameters for the tool
+            
+        Returns:
+            The result of the tool execution as a string
+        """
+        if tool_name not in ToolsRegistry.list_available_tools():
+            return f"Error: Tool '{tool_name}' not found"
+        
+        with span("tool.execute", tool=tool_name) as tool_span:
+            def run_tool() -> Any:
+                tool_span.set_attribute("cache_hit", False)
+                with ToolsRegistry.checkout(tool_name, self.session_id) as tool_instance:
+                    return tool_instance.run(**parameters)
+            
+            try:
+                if self.tool_cache is not None:
+                    tool_span.set_attribute("cache_hit", True)
+                    result = self.tool_cache.get_or_run(tool_name, parameters, run_tool)
+                else:
+                    result = run_tool()
+                return f"Tool: {tool_name}\nResult: {result}"
+            except Exception as e:
+                tool_span.record_error(e)
+                return f"Error executing tool '{tool_name}': {str(e)}"
+    
+    def execute_tools(self, tool_calls: List[ToolCall]) -> List[str]:
+        """
+        Execute independent tool calls concurrently on a bounded thread pool
+        
+        Args:
+            tool_calls: A list of (tool_name, parameters) tuples
+            
+        Returns:
+            The tool results, in the same order as the calls
+        """
+        if len(tool_calls) <= 1:
+            return [self.execute_tool(tool_name, parameters) for tool_name, parameters in tool_calls]
+        
+        max_workers = min(len(tool_calls), self.max_parallel_tools)
+        # Run each call in a copy of this context so its span nests under the current one
+        contexts = [contextvars.copy_context() for _ in tool_calls]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda context, call: context.run(self.execute_tool, *call), contexts, tool_calls))
+    
+    async def aexecute_tools(self, tool_calls: List[ToolCall]) -> List[str]:
+        """
+        Execute independent tool calls concurrently without blocking the event loop
+        
+        Args:
+            tool_calls: A list of (tool_name, parameters) tuples
+            
+        Returns:
+            The tool results, in the same order as the calls
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_tools)
+        
+        async def run_one(tool_name: str, parameters: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self.execute_tool, tool_name, parameters)
+        
+        return await asyncio.gather(*(run_one(tool_name, parameters) for tool_name, parameters in tool_calls))
+    
+    def start_usage_meter(self) -> UsageMeter:
+        """
+        Create the meter accounting one run's model calls against the budgets
+        
+        Returns:
+            The meter; its running totals are also exposed as last_usage
+        """
+        meter = UsageMeter(UsageBudget(max_tokens=self.token_budget, max_cost=self.cost_budget))
+        self.last_usage = meter.usage
+        self.stop_reason = None
+        return meter
+    
+    def over_budget(self, meter: UsageMeter) -> bool:
+        """
+        Check the run's budgets before the next model call
+        
+        Args:
+            meter: The run's usage meter
+            
+        Returns:
+            True if the run has to stop; stop_reason names the exceeded budget
+        """
+        self.stop_reason = meter.exceeded()
+        return self.stop_reason is not None
+    
+    def needs_final_answer(self, final_response: str, iteration: int, max_iterations: int) -> bool:
+        """
+        Whether the loop ended without an answer because it spent every iteration
+        or went over budget on tool calls. The final answer is then requested
+        without the tools, so a run never returns a bare tool call; that one
+        call may take the run past its budget.
+        
+        Args:
+            final_response: The answer found by the loop, if any
+            iteration: The number of iterations run
+            max_iterations: The iteration limit
+            
+        Returns:
+            True if the final answer has to be requested
+        """
+        return not final_response and (iteration == max_iterations or self.stop_reason is not None)
+    
+    def observe_response(self, iteration_span, iteration: int, response: str, tool_calls: List[ToolCall]) -> None:
+        iteration_span.set_attribute("tool_calls", len(tool_calls))
+        if self.verbose:
+            print(f"\nIteration {iteration + 1} response:\n{response}")
+    
+    def finish_run(self, meter: UsageMeter, iterations: int, final_response: str) -> str:
+        current_span().set_attributes(iterations=iterations, total_tokens=meter.usage.total_tokens, cost=meter.usage.cost, stop_reason=self.stop_reason)
+        return final_response
+    
+    def close(self) -> None:
+        """
+        Release the session-scoped tool instances held by this pattern.
+        Also done when the pattern is used as a context manager, and as a
+        fallback when it is garbage collected.
+        """
+        ToolsRegistry.close_session(self.session_id)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
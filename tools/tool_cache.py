@@ -0,0 +1,84 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import json
+import threading
+
+from cache import CacheBase, MemoryCache, MISSING
+from .tools_registry import ToolsRegistry
+
+
+@dataclass
+class ToolResultCache:
+    """
+    Caches tool results keyed by tool name and normalized parameters.
+    
+    Each tool opts in through get_cache_policy(); tools that do not declare
+    themselves cacheable always run. Any CacheBase backend can be used, e.g.
+    SqliteCache to share results across processes.
+    """
+    backend: CacheBase = field(default_factory=MemoryCache)
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls) -> "ToolResultCache":
+        """
+        Get the process-wide in-memory result cache
+        
+        Returns:
+            The shared ToolResultCache instance
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+    
+    @staticmethod
+    def make_key(tool_name: str, parameters: Dict[str, Any]) -> str:
+        """
+        Build a stable cache key, ignoring parameter order and surrounding whitespace
+        
+        Args:
+            tool_name: The name of the tool
+            parameters: The parameters for the tool
+            
+        Returns:
+            The cache key
+        """
+        normalized = {
+            name: value.strip() if isinstance(value, str) else value
+            for name, value in parameters.items()
+        }
+        return f"{tool_name}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)}"
+    
+    def get_or_run(self, tool_name: str, parameters: Dict[str, Any], run: Callable[[], Any]) -> Any:
+        """
+        Return a cached result for the call, or run it and cache the result
+        
+        Args:
+            tool_name: The name of the tool
+            parameters: The parameters for the tool
+            run: Callable that executes the tool and returns its result
+            
+        Returns:
+            The tool result
+        """
+        tool_class = ToolsRegistry.get_tool_class(tool_name)
+        policy = tool_class.get_cache_policy() if tool_class else {}
+        if not policy.get("cacheable", False):
+            return run()
+        
+        key = self.make_key(tool_name, parameters)
+        result = self.backend.get(key, MISSING)
+        if result is not MISSING:
+            return result
+        
+        result = run()
+        if result is not None:
+            self.backend.set(key, result, ttl=policy.get("ttl"))
+        return result
+    
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
@@ -0,0 +1,179 @@
+from typing import Any, Dict, List, Tuple
+import json
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+_DECODER = json.JSONDecoder()
+
+
+def extract_tool_calls(parsed: Any) -> List[ToolCall]:
+    """
+    Pull tool calls out of a decoded JSON value
+    
+    Args:
+        parsed: A single {"tool": ..., "parameters": ...} object or a list of them
+        
+    Returns:
+        A list of (tool_name, parameters) tuples
+    """
+    candidates = parsed if isinstance(parsed, list) else [parsed]
+    return [
+        (tool_call["tool"], tool_call["parameters"])
+        for tool_call in candidates
+        if isinstance(tool_call, dict) and "tool" in tool_call and "parameters" in tool_call
+    ]
+
+
+def parse_tool_calls(response: str) -> List[ToolCall]:
+    """
+    Find every tool call in a model response in a single pass
+    
+    Fenced (```json) and bare JSON are handled alike: each "{" or "[" is
+    tried as the start of a JSON value, and a value that decodes is skipped
+    over as a whole, so nested parameter objects parse correctly and no
+    text is scanned twice.
+    
+    Args:
+        response: The response from the model
+        
+    Returns:
+        A list of (tool_name, parameters) tuples, empty if no tool call found
+    """
+    tool_calls: List[ToolCall] = []
+    if not response:
+        return tool_calls
+    
+    # str.find is far cheaper than a regex character class, so track the
+    # next "{" and "[" separately and only look again once one is passed
+    length = len(response)
+    next_brace = response.find("{")
+    next_bracket = response.find("[")
+    position = 0
+    while True:
+        if 0 <= next_brace < position:
+            next_brace = response.find("{", position)
+        if 0 <= next_bracket < position:
+            next_bracket = response.find("[", position)
+        start = min(next_brace if next_brace >= 0 else length, next_bracket if next_bracket >= 0 else length)
+        if start == length:
+            return tool_calls
+        try:
+            parsed, end = _DECODER.raw_decode(response, start)
+        except json.JSONDecodeError:
+            position = start + 1
+            continue
+        tool_calls.extend(extract_tool_calls(parsed))
+        position = end
+
+
+def parse_native_tool_calls(message: Dict[str, Any]) -> List[ToolCall]:
+    """
+    Read structured tool calls from an assistant message returned by a native function-calling API
+    
+    Args:
+        message: The assistant message, with chat-completions style "tool_calls"
+        
+    Returns:
+        A list of (tool_name, parameters) tuples, one per entry in message["tool_calls"]
+    """
+    tool_calls: List[ToolCall] = []
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call["function"]
+        try:
+            parameters = json.loads(function.get("arguments") or "{}")
+        except json.JSONDecodeError:
+            parameters = {}
+        tool_calls.append((function["name"], parameters if isinstance(parameters, dict) else {}))
+    return tool_calls
+
+
+def build_tool_messages(message: Dict[str, Any], tool_results: List[str]) -> List[Dict[str, Any]]:
+    """
+    Build the "tool" role messages answering each native tool call in an assistant message
+    
+    Args:
+        message: The assistant message that carried the tool calls
+        tool_results: The results, in the same order as message["tool_calls"]
+        
+    Returns:
+        One tool message per call, linked by tool_call_id
+    """
+    return [
+        {"role": "tool", "tool_call_id": tool_call["id"], "content": tool_result}
+        for tool_call, tool_result in zip(message["tool_calls"], tool_results)
+    ]
+
+
+class ToolCallDetector:
+    """
+    Incrementally scans streamed model output for a complete JSON tool call.
+    
+    Text is fed chunk by chunk. The detector tracks bracket depth and JSON
+    strings, so as soon as a top-level object or list closes it can tell
+    whether a tool call has arrived, without re-scanning earlier text.
+    
+    Usage:
+        detector = ToolCallDetector()
+        for chunk in model.generate_stream(prompt):
+            tool_calls = detector.feed(chunk)
+            if tool_calls:
+                break
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.tool_calls: List[ToolCall] = []
+        self._position = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, chunk: str) -> List[ToolCall]:
+        """
+        Add a chunk of streamed text
+        
+        Args:
+            chunk: The next piece of model output
+            
+        Returns:
+            The tool calls once a complete tool block has been seen, otherwise an empty list
+        """
+        self.text += chunk
+        if self.tool_calls:
+            return self.tool_calls
+        
+        text = self.text
+        for position in range(self._position, len(text)):
+            char = text[position]
+            if self._depth == 0:
+                if char in "{[":
+                    self._start = position
+                    self._depth = 1
+                continue
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        self.tool_calls = extract_tool_calls(json.loads(text[self._start:position + 1]))
+                    except json.JSONDecodeError:
+                        self.tool_calls = []
+                    if self.tool_calls:
+                        self._position = position + 1
+                        self.text = text[:position + 1]
+                        return self.tool_calls
+        
+        self._position = len(text)
+        return []
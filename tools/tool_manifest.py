@@ -0,0 +1,109 @@
+"""
+Manifest of the bundled tools, so they can be registered without importing them.
+
+Each entry records a tool's class name, module, JSON schema and a hash of the
+module's source. ToolsRegistry lists and describes manifest tools from this
+data alone and imports a tool's module the first time its class is needed.
+A module whose source no longer matches its hash is imported eagerly instead,
+so a stale manifest never serves an outdated schema.
+
+Regenerate after adding or changing a tool, from the repository root:
+    python -m tools
+"""
+
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import hashlib
+import importlib
+import json
+import pkgutil
+
+from .tools_registry import ToolsRegistry
+
+PACKAGE_DIR = Path(__file__).parent
+MANIFEST_PATH = PACKAGE_DIR / "tool_manifest.json"
+# Modules of the tools package that define no tools
+SUPPORT_MODULES = ['tools_registry', 'tools_base', 'http_transport', 'tool_cache', 'tool_call_parser', 'tool_agent', 'tool_manifest', '__main__', '__pycache__']
+
+
+@dataclass
+class ManifestEntry:
+    name: str
+    module: str
+    source_sha256: str
+    parameters: Dict[str, Any]
+
+
+def tool_modules() -> List[str]:
+    """
+    Names of the tool modules in this package, found without importing them
+    
+    Returns:
+        Module names relative to the package, in import order
+    """
+    return [module_name for _, module_name, _ in pkgutil.iter_modules([str(PACKAGE_DIR)]) if module_name not in SUPPORT_MODULES]
+
+
+def source_hash(module_name: str) -> str:
+    return hashlib.sha256((PACKAGE_DIR / f"{module_name}.py").read_bytes()).hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, List[ManifestEntry]]:
+    """
+    Read the manifest
+    
+    Args:
+        path: Manifest file
+    
+    Returns:
+        Entries grouped by module name, or an empty mapping when the file is missing or unreadable
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    modules: Dict[str, List[ManifestEntry]] = {}
+    for entry in data.get("tools", []):
+        modules.setdefault(entry["module"], []).append(ManifestEntry(**entry))
+    return modules
+
+
+def build_manifest() -> List[ManifestEntry]:
+    """
+    Import every tool module and describe the tools it registers
+    
+    Returns:
+        One entry per tool class
+    """
+    entries = []
+    for module_name in tool_modules():
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        for tool_name in ToolsRegistry.list_available_tools():
+            tool_class = ToolsRegistry.get_tool_class(tool_name)
+            if tool_class is not None and tool_class.__module__ == module.__name__:
+                entries.append(ManifestEntry(
+                    name=tool_name,
+                    module=module_name,
+                    source_sha256=source_hash(module_name),
+                    parameters=tool_class.get_tool_parameters()
+                ))
+    return entries
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> List[ManifestEntry]:
+    entries = build_manifest()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"tools": [asdict(entry) for entry in entries]}, f, indent=2)
+        f.write("\n")
+    return entries
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tools", description="Regenerate the lazy tool manifest.")
+    parser.add_argument("--output", default=str(MANIFEST_PATH), help=f"Manifest file (default: {MANIFEST_PATH.name} in the tools package)")
+    args = parser.parse_args(argv)
+    entries = write_manifest(Path(args.output))
+    print(f"Wrote {len(entries)} tool(s) to {args.output}")
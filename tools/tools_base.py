@@ -1,11 +1,30 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
+from enum import Enum
+from typing import Any, ClassVar, Dict
+
+
+class ToolScope(Enum):
+    """
+    Lifetime of a pooled tool instance handed out by ToolsRegistry.checkout.
+    
+    Singleton instances are pooled process-wide and Session instances per
+    session_id. Each instance serves one call at a time, so concurrent calls
+    may create more; at most the tool's pool_size idle instances are kept per
+    pool and the rest are closed when returned. Call instances are never pooled.
+    """
+    Singleton: str = "singleton"
+    Session: str = "session"
+    Call: str = "call"
+
 
 @dataclass
 class ToolsBase(ABC):
     name: str
     tool: Any = None
+    scope: ClassVar[ToolScope] = ToolScope.Singleton
+    # Idle instances kept per pool; matches the patterns' default max_parallel_tools
+    pool_size: ClassVar[int] = 4
     
     def __post_init__(self):
         """
@@ -33,4 +52,28 @@ class ToolsBase(ABC):
         """
         Get the parameters of the tool
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @staticmethod
+    def get_cache_policy() -> Dict[str, Any]:
+        """
+        Declare whether results of this tool may be cached, and for how long.
+        Override with {"cacheable": True, "ttl": seconds} for idempotent tools.
+        """
+        return {"cacheable": False, "ttl": None}
+    
+    @property
+    def http(self):
+        """
+        Shared keep-alive HTTP transport for tools that call web APIs.
+        Imported lazily so tools without network access stay lightweight.
+        """
+        from .http_transport import HttpTransport
+        return HttpTransport.shared()
+    
+    def close(self):
+        """
+        Release any resources held by the tool. Called when the registry
+        evicts a pooled instance.
+        """
+        pass
@@ -1,15 +1,39 @@
-from typing import Dict, Any, Type, List, Optional
+from typing import Dict, Any, Type, List, Optional, Tuple, Iterator, Callable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import importlib
 import inspect
+import json
+import threading
 
 # Use relative import instead of absolute import with sys.path manipulation
-from .tools_base import ToolsBase
+from .tools_base import ToolsBase, ToolScope
+
+
+@dataclass
+class _InstancePool:
+    """
+    Idle instances of one pooled tool key. Each instance is lent to one caller
+    at a time; instances returned to a full or closed pool are closed instead.
+    """
+    idle: List[ToolsBase] = field(default_factory=list)
+    closed: bool = False
+
 
 class ToolsRegistry:
     """
     A registry for tool classes that can be used by AI agents.
     This registry allows for dynamic registration and retrieval of tool implementations.
+    
+    Tools can also be registered lazily from their schema and module name; the
+    module is imported the first time the tool class is looked up.
     """
     _registry: Dict[str, Type[ToolsBase]] = {}
+    _lazy: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    _pools: Dict[Tuple[str, Optional[str]], _InstancePool] = {}
+    _lock = threading.RLock()
+    _version: int = 0
+    _memo: Dict[str, Tuple[int, Any]] = {}
     
     @classmethod
     def register(cls, tool_class: Type[ToolsBase]) -> None:
@@ -19,12 +43,52 @@ class ToolsRegistry:
         Args:
             tool_class: The tool class to register (must inherit from ToolsBase)
         """
-        cls._registry[tool_class.__name__] = tool_class
+        with cls._lock:
+            if tool_class.__name__ in cls._registry:
+                cls._close_matching(lambda key: key[0] == tool_class.__name__)
+            previous = cls._registry.get(tool_class.__name__)
+            # Resolving a lazily registered tool does not change the tool set
+            resolving = previous is None and tool_class.__name__ in cls._lazy
+            if previous is not tool_class and not resolving:
+                cls._version += 1
+            cls._registry[tool_class.__name__] = tool_class
+    
+    @classmethod
+    def register_lazy(cls, tool_name: str, module: str, parameters: Dict[str, Any]) -> None:
+        """
+        Register a tool by name without importing it
+        
+        Args:
+            tool_name: The name of the tool class
+            module: Fully qualified module that registers the class when imported
+            parameters: The tool's get_tool_parameters() schema, served until it is imported
+        """
+        with cls._lock:
+            if tool_name in cls._registry or tool_name in cls._lazy:
+                return
+            cls._lazy[tool_name] = (module, parameters)
+            cls._version += 1
+    
+    @classmethod
+    def unregister(cls, tool_name: str) -> None:
+        """
+        Remove a tool class from the registry and close its pooled instances
+        
+        Args:
+            tool_name: The name of the tool class to remove
+        """
+        with cls._lock:
+            lazy = cls._lazy.pop(tool_name, None)
+            if cls._registry.pop(tool_name, None) is not None:
+                cls._close_matching(lambda key: key[0] == tool_name)
+                cls._version += 1
+            elif lazy is not None:
+                cls._version += 1
     
     @classmethod
     def get_tool_class(cls, tool_name: str) -> Optional[Type[ToolsBase]]:
         """
-        Get a tool class by name
+        Get a tool class by name, importing it first if it was registered lazily
         
         Args:
             tool_name: The name of the tool class to retrieve
@@ -32,17 +96,125 @@ class ToolsRegistry:
         Returns:
             The tool class if found, None otherwise
         """
-        return cls._registry.get(tool_name)
+        tool_class = cls._registry.get(tool_name)
+        if tool_class is None and tool_name in cls._lazy:
+            # Importing the module registers the class through @register_tool
+            importlib.import_module(cls._lazy[tool_name][0])
+            tool_class = cls._registry.get(tool_name)
+        return tool_class
+    
+    @classmethod
+    def is_loaded(cls, tool_name: str) -> bool:
+        """
+        Whether a tool's class has been imported
+        
+        Args:
+            tool_name: The name of the tool class
+            
+        Returns:
+            True once the class is registered, False while it is only known lazily or not at all
+        """
+        return tool_name in cls._registry
     
     @classmethod
     def list_available_tools(cls) -> List[str]:
         """
-        List all available tool names
+        List all available tool names, including lazily registered tools
         
         Returns:
             A list of tool class names that are registered
         """
-        return list(cls._registry.keys())
+        if not cls._lazy:
+            return list(cls._registry.keys())
+        # Lazily registered tools keep their position once imported
+        return list({**cls._lazy, **cls._registry}.keys())
+    
+    @classmethod
+    def version(cls) -> int:
+        """
+        Get the registry version, bumped whenever the set of tools changes
+        
+        Returns:
+            The current registry version
+        """
+        return cls._version
+    
+    @classmethod
+    def memoize(cls, key: str, builder: Callable[[], Any]) -> Any:
+        """
+        Build a value derived from the registered tools once per registry version
+        
+        Args:
+            key: Name identifying the derived value
+            builder: Callable producing the value from the current registry
+            
+        Returns:
+            The cached value, rebuilt only after the tool set changes
+        """
+        cached = cls._memo.get(key)
+        if cached is not None and cached[0] == cls._version:
+            return cached[1]
+        with cls._lock:
+            version = cls._version
+            value = builder()
+            cls._memo[key] = (version, value)
+        return value
+    
+    @classmethod
+    def get_tools_parameters(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the parameter schemas of every registered tool
+        
+        Returns:
+            A mapping of tool name to its get_tool_parameters() schema. The
+            mapping is shared, so callers must not modify it.
+        """
+        def build() -> Dict[str, Dict[str, Any]]:
+            parameters = {}
+            for tool_name in cls.list_available_tools():
+                tool_class = cls._registry.get(tool_name)
+                parameters[tool_name] = tool_class.get_tool_parameters() if tool_class is not None else cls._lazy[tool_name][1]
+            return parameters
+        return cls.memoize("tools_parameters", build)
+    
+    @classmethod
+    def get_tool_schemas(cls) -> List[Dict[str, Any]]:
+        """
+        Get the registered tools as chat-completions function definitions
+        
+        Returns:
+            A list of {"type": "function", "function": {...}} entries, keyed by tool class name
+        """
+        return cls.memoize("tool_schemas", lambda: [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool_name,
+                    "description": tool_params.get("description", "No description provided"),
+                    "parameters": tool_params.get("parameters", {"type": "object", "properties": {}})
+                }
+            }
+            for tool_name, tool_params in cls.get_tools_parameters().items()
+        ])
+    
+    @classmethod
+    def render_tool_descriptions(cls) -> str:
+        """
+        Render the tool catalog as text for inclusion in a system prompt
+        
+        Returns:
+            One "Tool / Description / Parameters" block per registered tool
+        """
+        def render() -> str:
+            blocks = []
+            for tool_name, tool_params in cls.get_tools_parameters().items():
+                blocks.append(
+                    f"Tool: {tool_name}\n"
+                    f"Description: {tool_params.get('description', 'No description provided')}\n"
+                    f"Parameters: {json.dumps(tool_params.get('parameters', {}), indent=2)}\n\n"
+                )
+            return "".join(blocks)
+        return cls.memoize("tool_descriptions", render)
     
     @classmethod
     def create_tool(cls, tool_name: str, **kwargs) -> Optional[ToolsBase]:
@@ -61,6 +233,95 @@ class ToolsRegistry:
             return tool_class(**kwargs)
         return None
     
+    @classmethod
+    @contextmanager
+    def checkout(cls, tool_name: str, session_id: Optional[str] = None) -> Iterator[Optional[ToolsBase]]:
+        """
+        Check out a pooled instance of a tool for the duration of a call
+        
+        Singleton-scoped tools are pooled process-wide, session-scoped tools
+        are pooled per session_id, and call-scoped tools are created for this
+        checkout and closed when it ends. A pooled instance is lent to one
+        caller at a time, so concurrent calls never share an instance; a new
+        one is created when every pooled instance is in use, and instances
+        beyond the tool's pool_size are closed when they are returned.
+        
+        Usage:
+            with ToolsRegistry.checkout("WeatherTool", session_id) as tool:
+                tool.run(location="Bangalore")
+        
+        Args:
+            tool_name: The name of the tool class to check out
+            session_id: Identifier of the calling session (required by session-scoped tools)
+            
+        Yields:
+            An initialized tool instance, or None if the tool wasn't found
+            
+        Raises:
+            ValueError: If a session-scoped tool is checked out without a session_id
+        """
+        tool_class = cls.get_tool_class(tool_name)
+        if tool_class is None:
+            yield None
+            return
+        
+        if tool_class.scope == ToolScope.Call:
+            tool_instance = tool_class()
+            try:
+                yield tool_instance
+            finally:
+                tool_instance.close()
+            return
+        
+        if tool_class.scope == ToolScope.Session and session_id is None:
+            # Its pool key would collide with the singleton pool
+            raise ValueError(f"Session-scoped tool '{tool_name}' needs a session_id")
+        key = (tool_name, session_id if tool_class.scope == ToolScope.Session else None)
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = _InstancePool()
+            tool_instance = pool.idle.pop() if pool.idle else None
+        if tool_instance is None:
+            tool_instance = tool_class()
+        try:
+            yield tool_instance
+        finally:
+            with cls._lock:
+                returned = not pool.closed and len(pool.idle) < tool_class.pool_size
+                if returned:
+                    pool.idle.append(tool_instance)
+            if not returned:
+                tool_instance.close()
+    
+    @classmethod
+    def close_session(cls, session_id: str) -> None:
+        """
+        Close and evict every pooled instance owned by a session.
+        Instances still checked out are closed when they are returned.
+        
+        Args:
+            session_id: Identifier of the session to tear down
+        """
+        with cls._lock:
+            cls._close_matching(lambda key: key[1] == session_id)
+    
+    @classmethod
+    def close_all(cls) -> None:
+        """
+        Close and evict every pooled tool instance
+        """
+        with cls._lock:
+            cls._close_matching(lambda key: True)
+    
+    @classmethod
+    def _close_matching(cls, predicate) -> None:
+        for key in [key for key in cls._pools if predicate(key)]:
+            pool = cls._pools.pop(key)
+            pool.closed = True
+            while pool.idle:
+                pool.idle.pop().close()
+    
    
 def register_tool(tool_class: Type[ToolsBase]) -> Type[ToolsBase]:
     """
@@ -1,7 +1,6 @@
 from tools.tools_base import ToolsBase
 from dataclasses import dataclass
 from typing import Any, Optional, Dict
-from requests import request
 from .tools_registry import register_tool
 from config.env_manager import EnvManager
 
@@ -39,13 +38,17 @@ class WeatherTool(ToolsBase):
         """
         
         url = f"{self.base_url}&q={location}"
-        response = request("GET", url)
+        response = self.http.get(url)
         if response.status_code == 200:
             data = response.json()
             return data.get("current", {}).get("temp_c", None)
         else:
             return None
     
+    @staticmethod
+    def get_cache_policy() -> Dict:
+        return {"cacheable": True, "ttl": 600}
+    
     @staticmethod
     def get_tool_parameters() -> Dict:
         return {
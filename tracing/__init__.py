@@ -0,0 +1,25 @@
+"""
+Lightweight tracing for the agent patterns.
+
+Spans cover each run, each iteration, every model call and every tool call.
+Tracing is disabled until an exporter is configured:
+
+    from tracing import Tracer, InMemoryExporter, JsonlExporter
+    Tracer.shared().configure(JsonlExporter("traces.jsonl"))
+"""
+
+from tracing.tracer import Span, Tracer, NOOP_SPAN, span, current_span, traced
+from tracing.exporters import SpanExporter, InMemoryExporter, JsonlExporter, OpenTelemetryExporter
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "NOOP_SPAN",
+    "span",
+    "current_span",
+    "traced",
+    "SpanExporter",
+    "InMemoryExporter",
+    "JsonlExporter",
+    "OpenTelemetryExporter",
+]
@@ -0,0 +1,105 @@
+"""
+Destinations for finished traces.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import json
+import threading
+
+from tracing.tracer import Span
+
+
+class SpanExporter(ABC):
+    """
+    Receives the spans of each finished trace, parents before children.
+    """
+    
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        pass
+    
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Keep finished spans in memory, for tests and benchmarks.
+    """
+    
+    def __init__(self):
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+    
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlExporter(SpanExporter):
+    """
+    Append one JSON object per span to a file.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """
+    Re-emit finished spans through an OpenTelemetry tracer, keeping their
+    timing, nesting, attributes and error status. Requires opentelemetry-api
+    (and an SDK with an exporter configured to actually ship them).
+    """
+    
+    def __init__(self, tracer_provider: Optional[Any] = None, instrumentation_name: str = "agentic-patterns"):
+        from opentelemetry import trace
+        
+        self._trace = trace
+        self._tracer = trace.get_tracer(instrumentation_name, tracer_provider=tracer_provider)
+    
+    @staticmethod
+    def _attribute_value(value: Any) -> Any:
+        if isinstance(value, (str, bool, int, float)):
+            return value
+        return str(value)
+    
+    def export(self, spans: List[Span]) -> None:
+        from opentelemetry.trace import Status, StatusCode
+        
+        contexts: Dict[str, Any] = {}
+        for span in spans:
+            parent = contexts.get(span.parent_id)
+            otel_span = self._tracer.start_span(
+                span.name,
+                context=self._trace.set_span_in_context(parent) if parent is not None else None,
+                attributes={key: self._attribute_value(value) for key, value in span.attributes.items() if value is not None},
+                start_time=span.start_time
+            )
+            if span.status == "error":
+                otel_span.set_status(Status(StatusCode.ERROR, span.error))
+            contexts[span.span_id] = otel_span
+        # End children before parents
+        for span in reversed(spans):
+            contexts[span.span_id].end(end_time=span.end_time)
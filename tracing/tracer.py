@@ -0,0 +1,246 @@
+"""
+Spans, the tracer that collects them, and the helpers the patterns use.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+import functools
+import inspect
+import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from tracing.exporters import SpanExporter
+
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation within a trace.
+    
+    Spans nest through a context variable, so a span started inside another
+    becomes its child, including across asyncio tasks and threads started with
+    contextvars.copy_context(). Use as a context manager, or call end() for
+    spans that are not activated (e.g. ones that stay open across a generator).
+    """
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_time", "end_time",
+                 "attributes", "status", "error", "_token")
+    
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._token = None
+    
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_time - self.start_time) / 1e6 if self.end_time is not None else None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+    
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+    
+    def end(self) -> None:
+        if self.end_time is None:
+            self.end_time = time.time_ns()
+            self.tracer._finish(self)
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self.record_error(exc)
+        _current_span.reset(self._token)
+        self._token = None
+        self.end()
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """
+    Returned while tracing is disabled; every operation is a no-op.
+    """
+    __slots__ = ()
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+    
+    def record_error(self, error: BaseException) -> None:
+        pass
+    
+    def end(self) -> None:
+        pass
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to the exporters.
+    
+    Tracing is off until exporters are configured; while off, span() returns a
+    shared no-op span, so instrumented code pays one attribute check per call.
+    Spans of a trace are buffered and exported together when the root span
+    ends, parents before children.
+    """
+    _shared: Optional["Tracer"] = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, exporters: Optional[List["SpanExporter"]] = None):
+        self.exporters: List["SpanExporter"] = list(exporters or [])
+        self.enabled = bool(self.exporters)
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls) -> "Tracer":
+        """
+        Get the process-wide tracer used by the instrumented patterns and models.
+        :return: The shared Tracer
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+    
+    def configure(self, *exporters: "SpanExporter") -> "Tracer":
+        """
+        Replace the exporters; passing none disables tracing.
+        :return: self
+        """
+        with self._lock:
+            self.exporters = list(exporters)
+            self.enabled = bool(self.exporters)
+            if not self.enabled:
+                self._pending.clear()
+        return self
+    
+    def span(self, name: str, **attributes: Any):
+        """
+        Start a span as a child of the current one. Use as a context manager.
+        :param name: Operation name, e.g. "model.generate"
+        :param attributes: Initial attributes
+        :return: The span, or a no-op span while tracing is disabled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+    
+    def start_span(self, name: str, **attributes: Any):
+        """
+        Start a span without making it current; the caller must call end().
+        """
+        return self.span(name, **attributes)
+    
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                return
+            del self._pending[span.trace_id]
+            exporters = list(self.exporters)
+        spans.sort(key=lambda s: s.start_time)
+        for exporter in exporters:
+            try:
+                exporter.export(spans)
+            except Exception:
+                # Tracing must never break the traced code
+                pass
+    
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+def current_span():
+    """
+    :return: The active span, or a no-op span when there is none
+    """
+    span = _current_span.get()
+    return span if span is not None else NOOP_SPAN
+
+
+def span(name: str, **attributes: Any):
+    """
+    Start a span on the shared tracer. Use as a context manager:
+        
+        with span("tool.execute", tool=tool_name) as s:
+            ...
+            s.set_attribute("cached", True)
+    """
+    tracer = Tracer.shared()
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return Span(tracer, name, _current_span.get(), attributes)
+
+
+def traced(name: str, attributes: Optional[Callable[..., Dict[str, Any]]] = None):
+    """
+    Decorator wrapping every call of a function or coroutine function in a span.
+    :param name: Span name
+    :param attributes: Optional callable receiving the call's arguments and returning span attributes
+    """
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                tracer = Tracer.shared()
+                if not tracer.enabled:
+                    return await function(*args, **kwargs)
+                with Span(tracer, name, _current_span.get(), attributes(*args, **kwargs) if attributes else {}):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = Tracer.shared()
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with Span(tracer, name, _current_span.get(), attributes(*args, **kwargs) if attributes else {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator